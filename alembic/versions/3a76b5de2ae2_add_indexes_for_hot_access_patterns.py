@@ -0,0 +1,64 @@
+"""add indexes for hot access patterns
+
+Tables are still created by Base.metadata.create_all, so this first revision
+only adds the secondary indexes the services filter and sort on. Databases
+created from the older models/models.py schema lack some of these columns;
+those indexes are skipped with a warning instead of failing the upgrade.
+
+Revision ID: 3a76b5de2ae2
+Revises: 
+Create Date: 2026-10-18 15:42:55.926451
+
+"""
+import logging
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3a76b5de2ae2'
+down_revision: Union[str, Sequence[str], None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+logger = logging.getLogger("alembic.runtime.migration")
+
+# (name, table, columns), matching the Index() declarations on the per-entity models
+INDEXES = [
+    ("ix_premiums_policy_id_due_date", "premiums", ["policy_id", "due_date"]),
+    ("ix_claims_policy_id", "claims", ["policy_id"]),
+    ("ix_claims_claim_date", "claims", ["claim_date"]),
+    ("ix_claims_status_claim_date", "claims", ["status", "claim_date"]),
+    ("ix_commissions_agent_id_commission_date", "commissions", ["agent_id", "commission_date"]),
+    ("ix_documents_related_entity", "documents", ["related_entity", "related_entity_id"]),
+    ("ix_audit_logs_entity_timestamp", "audit_logs", ["entity", "entity_id", "timestamp"]),
+    ("ix_ledger_entries_account_timestamp", "ledger_entries", ["account", "timestamp"]),
+]
+
+
+def _existing_columns() -> dict:
+    inspector = sa.inspect(op.get_bind())
+    return {table: {column["name"] for column in inspector.get_columns(table)} for table in inspector.get_table_names()}
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    columns = _existing_columns()
+    # CONCURRENTLY keeps Postgres tables writable while the index builds; it cannot run in a transaction
+    with op.get_context().autocommit_block():
+        for name, table, index_columns in INDEXES:
+            missing = set(index_columns) - columns.get(table, set())
+            if missing:
+                logger.warning("Skipping %s: %s has no column(s) %s", name, table, ", ".join(sorted(missing)))
+                continue
+            op.create_index(name, table, index_columns, if_not_exists=True, postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        for name, table, index_columns in reversed(INDEXES):
+            op.drop_index(name, table_name=table, if_exists=True, postgresql_concurrently=True)
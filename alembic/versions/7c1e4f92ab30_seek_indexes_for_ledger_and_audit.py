@@ -0,0 +1,71 @@
+"""seek indexes for ledger and audit
+
+The ledger and audit lists page on (timestamp, id). Each index the pages read
+ends in id so Postgres can walk it in that order too; SQLite already appends the
+rowid, so there the replaced indexes only change name.
+
+Revision ID: 7c1e4f92ab30
+Revises: 3a76b5de2ae2
+Create Date: 2026-10-18 21:04:12.318706
+
+"""
+import logging
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7c1e4f92ab30'
+down_revision: Union[str, Sequence[str], None] = '3a76b5de2ae2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+logger = logging.getLogger("alembic.runtime.migration")
+
+# (name, table, columns), matching the Index() declarations on LedgerEntry and AuditLog
+INDEXES = [
+    ("ix_ledger_entries_timestamp_id", "ledger_entries", ["timestamp", "id"]),
+    ("ix_ledger_entries_account_timestamp_id", "ledger_entries", ["account", "timestamp", "id"]),
+    ("ix_audit_logs_timestamp_id", "audit_logs", ["timestamp", "id"]),
+    ("ix_audit_logs_entity_timestamp_id", "audit_logs", ["entity", "entity_id", "timestamp", "id"]),
+]
+
+# Superseded by the *_id indexes above, which serve the same lookups
+REPLACED = [
+    ("ix_ledger_entries_account_timestamp", "ledger_entries", ["account", "timestamp"]),
+    ("ix_audit_logs_entity_timestamp", "audit_logs", ["entity", "entity_id", "timestamp"]),
+]
+
+
+def _existing_columns() -> dict:
+    inspector = sa.inspect(op.get_bind())
+    return {table: {column["name"] for column in inspector.get_columns(table)} for table in inspector.get_table_names()}
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    columns = _existing_columns()
+    with op.get_context().autocommit_block():
+        for name, table, index_columns in INDEXES:
+            missing = set(index_columns) - columns.get(table, set())
+            if missing:
+                logger.warning("Skipping %s: %s has no column(s) %s", name, table, ", ".join(sorted(missing)))
+                continue
+            op.create_index(name, table, index_columns, if_not_exists=True, postgresql_concurrently=True)
+        # Dropped only after their replacements exist, so account and entity lookups never lose an index
+        for name, table, index_columns in REPLACED:
+            op.drop_index(name, table_name=table, if_exists=True, postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    columns = _existing_columns()
+    with op.get_context().autocommit_block():
+        for name, table, index_columns in REPLACED:
+            if set(index_columns) <= columns.get(table, set()):
+                op.create_index(name, table, index_columns, if_not_exists=True, postgresql_concurrently=True)
+        for name, table, index_columns in reversed(INDEXES):
+            op.drop_index(name, table_name=table, if_exists=True, postgresql_concurrently=True)
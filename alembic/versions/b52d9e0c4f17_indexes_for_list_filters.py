@@ -0,0 +1,82 @@
+"""indexes for list filters
+
+Every column the list routes accept in ?filter= or ?sort= leads one of these
+(or an index from an earlier revision, a primary key or a unique constraint).
+They all end in id, since the pages seek on (column, id), or on id alone when
+only filtering, and the premium and policy UUID keys are not carried in a
+secondary index. The claim date indexes and the premium schedule index are
+replaced by such versions.
+
+Revision ID: b52d9e0c4f17
+Revises: 7c1e4f92ab30
+Create Date: 2026-10-18 22:37:40.502913
+
+"""
+import logging
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b52d9e0c4f17'
+down_revision: Union[str, Sequence[str], None] = '7c1e4f92ab30'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+logger = logging.getLogger("alembic.runtime.migration")
+
+# (name, table, columns), matching the Index() declarations on the per-entity models
+INDEXES = [
+    ("ix_claims_claim_date_id", "claims", ["claim_date", "id"]),
+    ("ix_claims_status_claim_date_id", "claims", ["status", "claim_date", "id"]),
+    ("ix_premiums_due_date_id", "premiums", ["due_date", "id"]),
+    ("ix_premiums_status_due_date_id", "premiums", ["status", "due_date", "id"]),
+    ("ix_premiums_policy_id_due_date_id", "premiums", ["policy_id", "due_date", "id"]),
+    ("ix_policies_client_id_id", "policies", ["client_id", "id"]),
+    ("ix_policies_product_id_id", "policies", ["product_id", "id"]),
+    ("ix_policies_issue_date_id", "policies", ["issue_date", "id"]),
+    ("ix_policies_status_issue_date_id", "policies", ["status", "issue_date", "id"]),
+    ("ix_customers_last_name_id", "customers", ["last_name", "id"]),
+    ("ix_agents_status", "agents", ["status"]),
+    ("ix_agents_last_name_id", "agents", ["last_name", "id"]),
+]
+
+# Superseded by the *_id indexes above, which serve the same lookups
+REPLACED = [
+    ("ix_claims_claim_date", "claims", ["claim_date"]),
+    ("ix_claims_status_claim_date", "claims", ["status", "claim_date"]),
+    ("ix_premiums_policy_id_due_date", "premiums", ["policy_id", "due_date"]),
+]
+
+
+def _existing_columns() -> dict:
+    inspector = sa.inspect(op.get_bind())
+    return {table: {column["name"] for column in inspector.get_columns(table)} for table in inspector.get_table_names()}
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    columns = _existing_columns()
+    with op.get_context().autocommit_block():
+        for name, table, index_columns in INDEXES:
+            missing = set(index_columns) - columns.get(table, set())
+            if missing:
+                logger.warning("Skipping %s: %s has no column(s) %s", name, table, ", ".join(sorted(missing)))
+                continue
+            op.create_index(name, table, index_columns, if_not_exists=True, postgresql_concurrently=True)
+        for name, table, index_columns in REPLACED:
+            op.drop_index(name, table_name=table, if_exists=True, postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    columns = _existing_columns()
+    with op.get_context().autocommit_block():
+        for name, table, index_columns in REPLACED:
+            if set(index_columns) <= columns.get(table, set()):
+                op.create_index(name, table, index_columns, if_not_exists=True, postgresql_concurrently=True)
+        for name, table, index_columns in reversed(INDEXES):
+            op.drop_index(name, table_name=table, if_exists=True, postgresql_concurrently=True)
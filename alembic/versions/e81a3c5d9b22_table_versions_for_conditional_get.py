@@ -0,0 +1,39 @@
+"""table versions for conditional get
+
+Creates table_versions, the per-table write counter behind the ETag and
+Last-Modified headers of the list and detail routes. create_all makes it
+too, so it is only created here when missing.
+
+Revision ID: e81a3c5d9b22
+Revises: b52d9e0c4f17
+Create Date: 2026-10-18 23:51:08.117264
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e81a3c5d9b22'
+down_revision: Union[str, Sequence[str], None] = 'b52d9e0c4f17'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    if "table_versions" in sa.inspect(op.get_bind()).get_table_names():
+        return
+    op.create_table(
+        "table_versions",
+        sa.Column("table_name", sa.String(length=100), primary_key=True),
+        sa.Column("version", sa.Integer(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(), nullable=False),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table("table_versions", if_exists=True)
@@ -0,0 +1,74 @@
+import threading
+import time
+from collections import OrderedDict
+
+# Every cache created in this process, by name, so their counters can be reported together
+caches = {}
+
+class TTLCache:
+    """In-process cache with a per-entry TTL, LRU eviction and hit/miss counters.
+
+    clear() bumps a generation number; callers that compute a value outside the
+    lock pass the generation they started with to set(), so a result computed
+    before an invalidation is dropped instead of being cached.
+    """
+
+    def __init__(self, name: str, ttl: float = 300, maxsize: int = 256):
+        self.name = name
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.generation = 0
+        self.cleared_at = float("-inf")
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        caches[name] = self
+
+    def get(self, key):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None or entry[0] < time.monotonic():
+                if entry is not None:
+                    del self._data[key]
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def set(self, key, value, generation=None):
+        with self._lock:
+            if generation is not None and generation != self.generation:
+                return
+            self._data[key] = (time.monotonic() + self.ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self.generation += 1
+            self.cleared_at = time.monotonic()
+            self._data.clear()
+
+    def cleared_within(self, seconds: float) -> bool:
+        return time.monotonic() - self.cleared_at < seconds
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_ratio": self.hits / lookups if lookups else 0.0,
+                "size": len(self._data),
+                "maxsize": self.maxsize,
+                "ttl": self.ttl,
+            }
+
+def cache_stats() -> dict:
+    return {name: cache.stats() for name, cache in caches.items()}
@@ -0,0 +1,34 @@
+import functools
+import os
+
+import anyio
+from anyio import to_thread
+
+# Threads shared by sync route handlers, sync dependencies (get_db) and run_blocking()
+THREADPOOL_SIZE = int(os.getenv("THREADPOOL_SIZE", 40))
+# Exports get a smaller limiter of their own so a burst of them cannot take every thread
+EXPORT_THREADS = int(os.getenv("EXPORT_THREADS", 4))
+
+export_limiter = anyio.CapacityLimiter(EXPORT_THREADS)
+
+def configure_threadpool(size: int = THREADPOOL_SIZE):
+    # anyio keeps one default limiter per event loop, so this has to run inside the loop at startup
+    to_thread.current_default_thread_limiter().total_tokens = size
+
+async def run_blocking(func, *args, **kwargs):
+    """Run a blocking call (sync session, bcrypt, pandas) on the shared thread pool."""
+    return await to_thread.run_sync(functools.partial(func, *args, **kwargs))
+
+async def run_export(func, *args, **kwargs):
+    """Like run_blocking, but counted against the export limiter."""
+    return await to_thread.run_sync(functools.partial(func, *args, **kwargs), limiter=export_limiter)
+
+async def iterate_export(iterator):
+    # Streaming bodies: each chunk of a blocking generator is produced on an export thread
+    iterator = iter(iterator)
+    done = object()
+    while True:
+        chunk = await run_export(next, iterator, done)
+        if chunk is done:
+            break
+        yield chunk
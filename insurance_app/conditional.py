@@ -0,0 +1,71 @@
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+
+from fastapi import Depends, HTTPException, Request, Response, status
+from sqlalchemy import bindparam, select
+
+from insurance_app import table_versions
+from insurance_app.database import get_async_db, get_db
+from insurance_app.table_versions import VERSIONS
+
+# Browsers keep the response but revalidate it with If-None-Match on every use
+CACHE_CONTROL = "private, no-cache"
+
+_version_statement = select(VERSIONS.c.version, VERSIONS.c.updated_at).where(VERSIONS.c.table_name == bindparam("name"))
+
+def _validators(table: str, row):
+    if row is None:
+        # Not written since table_versions was created
+        return f'W/"{table}-0"', None
+    version, updated_at = row
+    last_modified = updated_at.replace(tzinfo=timezone.utc)
+    return f'W/"{table}-{version}-{int(last_modified.timestamp())}"', last_modified
+
+def _not_modified(request: Request, etag: str, last_modified) -> bool:
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        # Weak comparison: W/"x" matches "x"
+        tags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+        return "*" in tags or etag.removeprefix("W/") in tags
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since is None or last_modified is None:
+        return False
+    try:
+        since = parsedate_to_datetime(if_modified_since)
+    except (TypeError, ValueError):
+        return False
+    return since.tzinfo is not None and last_modified.replace(microsecond=0) <= since
+
+def _check(request: Request, response: Response, table: str, row):
+    etag, last_modified = _validators(table, row)
+    headers = {"ETag": etag, "Cache-Control": CACHE_CONTROL}
+    if last_modified is not None:
+        headers["Last-Modified"] = format_datetime(last_modified, usegmt=True)
+    if _not_modified(request, etag, last_modified):
+        raise HTTPException(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    response.headers.update(headers)
+
+def conditional_get(model, db_dependency=get_db):
+    """Route dependency answering If-None-Match / If-Modified-Since from model's table version.
+
+    Runs before the route loads anything: one primary-key read of table_versions,
+    then either a 304 or the route's usual response carrying ETag and Last-Modified.
+    The version is read first and bumped in the same transaction as the write, so
+    the rows sent are never older than their ETag.
+    Detail routes use the same table-wide version, so any write to the table
+    revalidates its rows too. Pass get_async_db for routes on the async session,
+    so the check shares the route's own session.
+    """
+    table = model.__tablename__
+    if table not in table_versions.VERSIONED_TABLES:
+        # Writes are only counted for the tables declared there, whatever imports this
+        raise ValueError(f"{table} is not in table_versions.VERSIONED_TABLES")
+
+    if db_dependency is get_async_db:
+        async def check_version(request: Request, response: Response, db=Depends(get_async_db)):
+            _check(request, response, table, (await db.execute(_version_statement, {"name": table})).first())
+    else:
+        def check_version(request: Request, response: Response, db=Depends(db_dependency)):
+            _check(request, response, table, db.execute(_version_statement, {"name": table}).first())
+
+    return Depends(check_version)
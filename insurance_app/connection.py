@@ -1,26 +1,3 @@
-import os
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
-from dotenv import load_dotenv
-# Load environment variables from .env file
-load_dotenv()
-# Get the database URL from the environment, fallback to SQLite for development
-DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./insurance_app.db")
-# Create the SQLAlchemy engine
-engine = create_engine(
-    DATABASE_URL,
-    connect_args={"check_same_thread": False} if DATABASE_URL.startswith("sqlite") else {}
-)
-# Create a configured "Session" class
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
-# Dependency to get DB session
-def get_db():
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
-
-
-
-
+# Kept for older imports: the engine, session factory and get_db all live in database.py,
+# so importing from here shares the same connection pool instead of opening a second one
+from insurance_app.database import DATABASE_URL, SessionLocal, engine, get_db
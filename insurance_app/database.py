@@ -1,23 +1,309 @@
-from sqlalchemy import create_engine
+import logging
+import os
+import threading
+import time
+from typing import Optional
+
+from dotenv import load_dotenv
+from fastapi import Request
+from sqlalchemy import MetaData, create_engine, event
+from sqlalchemy.engine import make_url
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
-import os
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+# Load environment variables from .env
+load_dotenv()
 
 # Use environment variable for database URL, fallback to SQLite for development
 DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./insurance_app.db")
 
-engine = create_engine(
-    DATABASE_URL,
-    connect_args={"check_same_thread": False} if DATABASE_URL.startswith("sqlite") else {}
-)
+# Optional read replica: read-only requests go there unless the client is pinned to the primary
+DATABASE_REPLICA_URL = os.getenv("DATABASE_REPLICA_URL") or None
+# After a write the client's reads stay on the primary this long, so it sees its own changes
+READ_YOUR_WRITES_SECONDS = int(os.getenv("READ_YOUR_WRITES_SECONDS", 10))
+READ_METHODS = {"GET", "HEAD", "OPTIONS"}
+PRIMARY_COOKIE = "db_primary_until"
+PRIMARY_HEADER = "X-Read-Primary"
+
+# Per worker process: size the pool so workers * (DB_POOL_SIZE + DB_MAX_OVERFLOW) stays under max_connections
+POOL_SETTINGS = {
+    "pool_size": int(os.getenv("DB_POOL_SIZE", 5)),
+    "max_overflow": int(os.getenv("DB_MAX_OVERFLOW", 10)),
+    "pool_timeout": float(os.getenv("DB_POOL_TIMEOUT", 30)),
+    "pool_recycle": int(os.getenv("DB_POOL_RECYCLE", 1800)),
+    "pool_pre_ping": os.getenv("DB_POOL_PRE_PING", "true").lower() in ("1", "true", "yes"),
+}
+
+# Compiled statements kept per engine; with echo on, "[generated in ...]" on a hot query means it is too small
+QUERY_CACHE_SIZE = int(os.getenv("DB_QUERY_CACHE_SIZE", 500))
+
+# SQLite profile, applied on every new connection to a file-backed database (SQLITE_TUNING=false turns it off)
+SQLITE_TUNING = os.getenv("SQLITE_TUNING", "true").lower() in ("1", "true", "yes")
+SQLITE_PRAGMAS = {
+    "journal_mode": "WAL",
+    "synchronous": "NORMAL",
+    "busy_timeout": int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", 5000)),
+    "cache_size": int(os.getenv("SQLITE_CACHE_SIZE", -65536)),  # negative means KiB: 64 MiB
+    "mmap_size": int(os.getenv("SQLITE_MMAP_SIZE", 256 * 1024 * 1024)),
+    "temp_store": os.getenv("SQLITE_TEMP_STORE", "MEMORY"),
+}
+# Seconds between background WAL checkpoints and PRAGMA optimize; 0 disables them
+SQLITE_MAINTENANCE_INTERVAL = float(os.getenv("SQLITE_MAINTENANCE_INTERVAL", 300))
+SQLITE_CHECKPOINT_MODE = os.getenv("SQLITE_CHECKPOINT_MODE", "TRUNCATE")
+
+logger = logging.getLogger(__name__)
+
+class PoolMetrics:
+    """Checkout counters and time spent waiting for a pooled connection."""
+
+    def __init__(self):
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+        self._lock = threading.Lock()
+
+    def record(self, waited: float, timed_out: bool = False):
+        with self._lock:
+            if timed_out:
+                self.timeouts += 1
+            else:
+                self.checkouts += 1
+            self.wait_total += waited
+            self.wait_max = max(self.wait_max, waited)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "checkouts": self.checkouts,
+                "timeouts": self.timeouts,
+                "wait_seconds_total": self.wait_total,
+                "wait_seconds_max": self.wait_max,
+                "wait_seconds_avg": self.wait_total / self.checkouts if self.checkouts else 0.0,
+            }
+
+class TimedPoolMixin:
+    # _do_get is where QueuePool blocks when every connection is checked out
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except PoolTimeoutError:
+            self.metrics.record(time.perf_counter() - started, timed_out=True)
+            raise
+        self.metrics.record(time.perf_counter() - started)
+        return connection
+
+    def recreate(self):
+        pool = super().recreate()
+        pool.metrics = self.metrics
+        return pool
+
+class TimedQueuePool(TimedPoolMixin, QueuePool):
+    pass
+
+class TimedAsyncQueuePool(TimedPoolMixin, AsyncAdaptedQueuePool):
+    pass
+
+# Async drivers used when DATABASE_URL names the plain dialect
+ASYNC_DRIVERS = {"postgresql": "asyncpg", "sqlite": "aiosqlite"}
+
+def is_sqlite_file(url) -> bool:
+    url = make_url(url)
+    return url.get_backend_name() == "sqlite" and url.database not in (None, "", ":memory:")
+
+def _engine_options(url, poolclass) -> dict:
+    options = {"query_cache_size": QUERY_CACHE_SIZE}
+    if url.get_backend_name() == "sqlite":
+        options["connect_args"] = {"check_same_thread": False}
+    if url.get_backend_name() != "sqlite" or is_sqlite_file(url):
+        options.update(POOL_SETTINGS, poolclass=poolclass)
+    return options
+
+def _sqlite_profile(url, pragmas) -> dict:
+    if pragmas is None:
+        pragmas = SQLITE_PRAGMAS if SQLITE_TUNING else {}
+    return pragmas if is_sqlite_file(url) else {}
+
+def _set_pragmas(sync_engine, pragmas: dict):
+    @event.listens_for(sync_engine, "connect")
+    def set_sqlite_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for name, value in pragmas.items():
+                cursor.execute(f"PRAGMA {name}={value}")
+        finally:
+            cursor.close()
+
+def make_engine(url: str = DATABASE_URL, pragmas: dict = None, **overrides):
+    """The one place engines are created, with pool settings taken from the environment.
+
+    File-backed SQLite also gets the SQLITE_PRAGMAS profile on every connection;
+    pass pragmas={} to open it untuned.
+    """
+    url = make_url(url)
+    engine = create_engine(url, **{**_engine_options(url, TimedQueuePool), **overrides})
+    if isinstance(engine.pool, TimedPoolMixin):
+        engine.pool.metrics = PoolMetrics()
+    pragmas = _sqlite_profile(url, pragmas)
+    if pragmas:
+        _set_pragmas(engine, pragmas)
+    return engine
+
+def async_url(url: str = DATABASE_URL):
+    # postgresql://... runs on asyncpg and sqlite:///... on aiosqlite; an explicit driver is kept
+    url = make_url(url)
+    if "+" not in url.drivername and url.drivername in ASYNC_DRIVERS:
+        url = url.set(drivername=f"{url.drivername}+{ASYNC_DRIVERS[url.drivername]}")
+    elif url.drivername in ("postgresql+psycopg2", "postgresql+psycopg"):
+        url = url.set(drivername="postgresql+asyncpg")
+    return url
+
+def make_async_engine(url: str = DATABASE_URL, pragmas: dict = None, **overrides):
+    url = async_url(url)
+    engine = create_async_engine(url, **{**_engine_options(url, TimedAsyncQueuePool), **overrides})
+    if isinstance(engine.sync_engine.pool, TimedPoolMixin):
+        engine.sync_engine.pool.metrics = PoolMetrics()
+    pragmas = _sqlite_profile(url, pragmas)
+    if pragmas:
+        _set_pragmas(engine.sync_engine, pragmas)
+    return engine
+
+def pool_stats(bind=None) -> dict:
+    if bind is None:
+        stats = pool_stats(engine)
+        for name, other in (("replica", replica_engine), ("async", _async_engines.get(False)), ("async_replica", _async_engines.get(True))):
+            if other is not None:
+                stats[name] = pool_stats(other)
+        return stats
+    pool = getattr(bind, "sync_engine", bind).pool
+    stats = {"pid": os.getpid(), "pool": type(pool).__name__, "status": pool.status()}
+    if isinstance(pool, QueuePool):
+        stats.update(
+            size=pool.size(),
+            checked_out=pool.checkedout(),
+            checked_in=pool.checkedin(),
+            overflow=pool.overflow(),
+            max_overflow=pool._max_overflow,
+            timeout=pool.timeout(),
+        )
+    if isinstance(pool, TimedPoolMixin):
+        stats.update(pool.metrics.snapshot())
+    return stats
+
+def sqlite_maintenance(bind=None) -> dict:
+    """Checkpoint the WAL back into the database file and let SQLite refresh its planner statistics."""
+    bind = bind or engine
+    with bind.connect() as connection:
+        busy, wal_pages, checkpointed = connection.exec_driver_sql(
+            f"PRAGMA wal_checkpoint({SQLITE_CHECKPOINT_MODE})"
+        ).one()
+        connection.exec_driver_sql("PRAGMA optimize")
+    return {"busy": bool(busy), "wal_pages": wal_pages, "checkpointed_pages": checkpointed}
+
+_maintenance_stop = threading.Event()
+_maintenance_thread = None
+
+def start_sqlite_maintenance(interval: float = SQLITE_MAINTENANCE_INTERVAL):
+    # One daemon thread per worker process; a no-op for anything but file-backed SQLite
+    global _maintenance_thread
+    if interval <= 0 or not is_sqlite_file(engine.url) or not SQLITE_TUNING:
+        return None
+    if _maintenance_thread is not None and _maintenance_thread.is_alive():
+        return _maintenance_thread
+
+    def run():
+        while not _maintenance_stop.wait(interval):
+            try:
+                sqlite_maintenance()
+            except Exception:
+                logger.exception("SQLite maintenance failed")
+
+    _maintenance_stop.clear()
+    _maintenance_thread = threading.Thread(target=run, name="sqlite-maintenance", daemon=True)
+    _maintenance_thread.start()
+    return _maintenance_thread
+
+def stop_sqlite_maintenance():
+    _maintenance_stop.set()
+
+engine = make_engine()
+replica_engine = make_engine(DATABASE_REPLICA_URL) if DATABASE_REPLICA_URL else None
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+ReplicaSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=replica_engine or engine)
 
 Base = declarative_base()
 
-def get_db():
-    db = SessionLocal()
+# create_schema is the supported way to make the tables: no Alembic revision creates them, the revisions only
+# change a schema that already exists (indexes, table_versions). Turn it off only once the schema is in place.
+CREATE_TABLES = os.getenv("CREATE_TABLES", "true").lower() in ("1", "true", "yes")
+
+def create_schema(bind=None):
+    """Create missing tables and indexes for every model imported so far."""
+    # TEMPORARY: models/models.py redeclares the per-entity tables (extend_existing), so each of them carries
+    # ix_<table>_id twice and create_all fails on the second. Until those duplicate classes are removed, create
+    # from a copy with one index per name; Base.metadata itself is left as declared.
+    metadata = MetaData()
+    for table in Base.metadata.sorted_tables:
+        table.to_metadata(metadata)
+    for table in metadata.tables.values():
+        names = set()
+        for index in sorted(table.indexes, key=lambda index: index.name or ""):
+            if index.name in names:
+                logger.warning("Skipping duplicate index %s on %s declared by models/models.py", index.name, table.name)
+                table.indexes.discard(index)
+            names.add(index.name)
+    metadata.create_all(bind=bind or engine)
+
+def use_replica(request: Optional[Request]) -> bool:
+    """Reads go to the replica unless the client asked for the primary or wrote recently."""
+    if replica_engine is None or request is None or request.method not in READ_METHODS:
+        return False
+    if request.headers.get(PRIMARY_HEADER, "").lower() in ("1", "true", "yes"):
+        return False
+    try:
+        pinned_until = float(request.cookies.get(PRIMARY_COOKIE) or 0)
+    except ValueError:
+        pinned_until = 0
+    return pinned_until < time.time()
+
+def pin_to_primary(response):
+    # Cookie rather than server state, so it holds whichever worker serves the next read
+    response.set_cookie(
+        key=PRIMARY_COOKIE,
+        value=str(time.time() + READ_YOUR_WRITES_SECONDS),
+        max_age=READ_YOUR_WRITES_SECONDS,
+        httponly=True,
+    )
+
+def is_replica(db) -> bool:
+    return replica_engine is not None and db.get_bind() is replica_engine
+
+def get_db(request: Request = None):
+    db = ReplicaSessionLocal() if use_replica(request) else SessionLocal()
     try:
         yield db
     finally:
         db.close()
+
+# Created on first use, so deployments without the async driver installed never import it
+_async_engines = {}
+
+def get_async_engine(replica: bool = False):
+    if replica not in _async_engines:
+        _async_engines[replica] = make_async_engine(DATABASE_REPLICA_URL if replica else DATABASE_URL)
+    return _async_engines[replica]
+
+# expire_on_commit=False: attributes stay loaded after commit, since async sessions cannot lazy-load
+AsyncSessionLocal = async_sessionmaker(class_=AsyncSession, autoflush=False, expire_on_commit=False)
+
+async def get_async_db(request: Request = None):
+    async with AsyncSessionLocal(bind=get_async_engine(replica=use_replica(request))) as db:
+        yield db
+
+# Registers the table_versions write counters on every Session, so writes count whatever process makes them
+import insurance_app.table_versions  # noqa: E402,F401
@@ -0,0 +1,163 @@
+import contextvars
+import logging
+import os
+import sqlite3
+import time
+
+import anyio
+from fastapi import Depends
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.responses import JSONResponse
+
+logger = logging.getLogger(__name__)
+
+# Seconds a request may run before it is cancelled with a 504; routers and routes raise it with deadline()
+REQUEST_DEADLINE_SECONDS = float(os.getenv("REQUEST_DEADLINE_SECONDS", 15))
+DASHBOARD_DEADLINE_SECONDS = float(os.getenv("DASHBOARD_DEADLINE_SECONDS", 60))
+EXPORT_DEADLINE_SECONDS = float(os.getenv("EXPORT_DEADLINE_SECONDS", 600))
+# SQLite calls the progress handler every this many virtual machine instructions
+SQLITE_PROGRESS_STEPS = 10000
+POOL_RETRY_AFTER_SECONDS = 2
+
+class Deadline:
+    """The time left for one request, shared with its threads through a contextvar."""
+
+    def __init__(self, seconds: float, cancel_scope: anyio.CancelScope):
+        self.started = time.monotonic()
+        self._loop_started = anyio.current_time()
+        self.cancel_scope = cancel_scope
+        self.disconnected = False
+        self.set(seconds)
+
+    def set(self, seconds: float):
+        # Only call from the event loop: the cancel scope belongs to the request's task
+        self.seconds = seconds
+        self.expires_at = self.started + seconds
+        self.cancel_scope.deadline = self._loop_started + seconds
+
+    def remaining(self) -> float:
+        return self.expires_at - time.monotonic()
+
+    @property
+    def expired(self) -> bool:
+        return self.disconnected or time.monotonic() >= self.expires_at
+
+    def interrupted(self) -> int:
+        # sqlite3 progress handler: a non-zero return aborts the running statement
+        return 1 if self.expired else 0
+
+_current = contextvars.ContextVar("request_deadline", default=None)
+
+def current_deadline():
+    return _current.get()
+
+def deadline(seconds: float):
+    """Dependency that gives a router or route its own deadline instead of REQUEST_DEADLINE_SECONDS."""
+    async def set_deadline():
+        current = _current.get()
+        if current is not None:
+            current.set(seconds)
+    return Depends(set_deadline)
+
+def _has_body(scope) -> bool:
+    for name, value in scope["headers"]:
+        if name == b"transfer-encoding" or (name == b"content-length" and value != b"0"):
+            return True
+    return False
+
+class DeadlineMiddleware:
+    """Cancels a request when its deadline passes (504) or its client disconnects.
+
+    Once the request body has been read, a watcher waits on receive() for
+    http.disconnect, so an abandoned export stops instead of running to the end.
+    Work already handed to a thread is not interrupted by the cancellation itself;
+    the statement timeout set below is what stops its queries.
+    """
+
+    def __init__(self, app, seconds: float = REQUEST_DEADLINE_SECONDS):
+        self.app = app
+        self.seconds = seconds
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        response_started = False
+        body_pending = _has_body(scope)
+        body_delivered = False
+        disconnected = anyio.Event()
+        tasks = None
+
+        async def watch_disconnect():
+            while (await receive())["type"] != "http.disconnect":
+                pass
+            current.disconnected = True
+            disconnected.set()
+            cancel_scope.cancel()
+
+        async def receive_wrapper():
+            nonlocal body_pending, body_delivered
+            if body_pending:
+                message = await receive()
+                if message["type"] == "http.disconnect" or not message.get("more_body", False):
+                    body_pending = False
+                    tasks.start_soon(watch_disconnect)
+                return message
+            if not body_delivered:
+                # No body: the watcher owns receive(), so hand the app its empty request message
+                body_delivered = True
+                return {"type": "http.request", "body": b"", "more_body": False}
+            await disconnected.wait()
+            return {"type": "http.disconnect"}
+
+        async def send_wrapper(message):
+            nonlocal response_started
+            if message["type"] == "http.response.start":
+                response_started = True
+                if message["status"] == 500 and current.expired and not current.disconnected:
+                    # A statement timeout that a service turned into a generic 500
+                    message = {**message, "status": 504}
+            await send(message)
+
+        with anyio.CancelScope() as cancel_scope:
+            current = Deadline(self.seconds, cancel_scope)
+            token = _current.set(current)
+            try:
+                async with anyio.create_task_group() as tasks:
+                    if not body_pending:
+                        tasks.start_soon(watch_disconnect)
+                    await self.app(scope, receive_wrapper, send_wrapper)
+                    tasks.cancel_scope.cancel()
+            except BaseExceptionGroup as group:
+                # Only the app can fail in here; hand its own exception to the error middleware
+                raise group.exceptions[0]
+            finally:
+                _current.reset(token)
+
+        if cancel_scope.cancelled_caught and not current.disconnected:
+            logger.warning("%s %s passed its %.0fs deadline", scope["method"], scope["path"], current.seconds)
+            if not response_started:
+                response = JSONResponse({"detail": f"Request exceeded its {current.seconds:.0f}s deadline"}, status_code=504)
+                await response(scope, receive, send)
+
+async def pool_timeout_handler(request, exc):
+    # Every pooled connection stayed busy for pool_timeout: shed the request rather than queue it longer
+    return JSONResponse(
+        {"detail": "Database busy, retry shortly"},
+        status_code=503,
+        headers={"Retry-After": str(POOL_RETRY_AFTER_SECONDS)},
+    )
+
+# Every transaction started for a request inherits what is left of its deadline
+@event.listens_for(Engine, "begin")
+def _apply_statement_timeout(conn):
+    current = _current.get()
+    dbapi_connection = conn.connection.driver_connection
+    if isinstance(dbapi_connection, sqlite3.Connection):
+        # Set or cleared on every transaction, since pooled connections move between requests
+        dbapi_connection.set_progress_handler(current.interrupted if current else None, SQLITE_PROGRESS_STEPS)
+    elif current is not None and conn.dialect.name == "postgresql":
+        # SET LOCAL ends with the transaction, so the pooled connection goes back unchanged
+        conn.exec_driver_sql(f"SET LOCAL statement_timeout = {max(int(current.remaining() * 1000), 1)}")
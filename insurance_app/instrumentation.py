@@ -0,0 +1,98 @@
+import contextvars
+import logging
+import os
+import re
+import time
+from collections import Counter
+from contextlib import contextmanager
+from typing import Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+logger = logging.getLogger("insurance_app.sql")
+
+# Statements slower than this are logged with their fingerprint
+SLOW_QUERY_MS = float(os.getenv("SLOW_QUERY_MS", 200))
+# Debug mode keeps every statement of a request to flag repeats (the N+1 pattern); off in production
+SQL_DEBUG = os.getenv("SQL_DEBUG", "false").lower() in ("1", "true", "yes")
+# A statement run this many times in one request is reported as a likely N+1
+N_PLUS_ONE_THRESHOLD = int(os.getenv("N_PLUS_ONE_THRESHOLD", 5))
+
+QUERY_COUNT_HEADER = "X-DB-Query-Count"
+QUERY_TIME_HEADER = "X-DB-Time-Ms"
+REPEATED_HEADER = "X-DB-Repeated-Statements"
+
+_LITERALS = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+_PARAMETERS = re.compile(r"%\(\w+\)s|%s|(?<!:):\w+|\$\d+")
+_IN_LISTS = re.compile(r"\(\s*\?(?:\s*,\s*\?)*\s*\)")
+_WHITESPACE = re.compile(r"\s+")
+
+def fingerprint(statement: str) -> str:
+    """Statement text with literals and bound parameters replaced by ?, so variants group together."""
+    text = _WHITESPACE.sub(" ", statement).strip()
+    text = _PARAMETERS.sub("?", _LITERALS.sub("?", text))
+    return _IN_LISTS.sub("(?)", text)
+
+class RequestQueries:
+    """Statements run on behalf of one request."""
+
+    def __init__(self, debug: bool = SQL_DEBUG):
+        self.count = 0
+        self.seconds = 0.0
+        self.statements = Counter() if debug else None
+
+    def record(self, statement: str, seconds: float):
+        self.count += 1
+        self.seconds += seconds
+        if self.statements is not None:
+            self.statements[fingerprint(statement)] += 1
+
+    def repeated(self, threshold: int = N_PLUS_ONE_THRESHOLD) -> dict:
+        if self.statements is None:
+            return {}
+        return {statement: n for statement, n in self.statements.items() if n >= threshold}
+
+# Set by the request middleware; sync handlers and run_blocking() threads see it through the copied context
+_current = contextvars.ContextVar("request_queries", default=None)
+
+@contextmanager
+def track_queries(debug: Optional[bool] = None):
+    # Read per request rather than bound at import, so the flag can be switched on in a running process
+    queries = RequestQueries(SQL_DEBUG if debug is None else debug)
+    token = _current.set(queries)
+    try:
+        yield queries
+    finally:
+        _current.reset(token)
+
+def annotate_response(request, response, queries: RequestQueries):
+    # Streaming bodies run after the headers are sent, so their queries are not included
+    response.headers[QUERY_COUNT_HEADER] = str(queries.count)
+    response.headers[QUERY_TIME_HEADER] = f"{queries.seconds * 1000:.1f}"
+    repeated = queries.repeated()
+    if repeated:
+        response.headers[REPEATED_HEADER] = str(len(repeated))
+        for statement, n in repeated.items():
+            logger.warning("possible N+1 in %s %s: %d x %s", request.method, request.url.path, n, statement)
+
+# Registered on the Engine class, so the primary, the replica and the sync side of the async engines are all covered
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - conn.info["query_started"].pop()
+    queries = _current.get()
+    if queries is not None:
+        queries.record(statement, elapsed)
+    if elapsed * 1000 >= SLOW_QUERY_MS:
+        logger.warning("slow query (%.1f ms): %s", elapsed * 1000, fingerprint(statement))
+
+@event.listens_for(Engine, "handle_error")
+def _handle_error(context):
+    # A failed statement never reaches after_cursor_execute; drop its start time
+    started = context.connection.info.get("query_started") if context.connection is not None else None
+    if started:
+        started.pop()
@@ -0,0 +1,124 @@
+import os
+import threading
+import time
+
+from prometheus_client import CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, Counter, Gauge, Histogram, generate_latest, multiprocess
+
+from insurance_app.cache import cache_stats
+from insurance_app.database import pool_stats
+from insurance_app.services.report_job_service import queue_depth
+
+# With several uvicorn workers, point PROMETHEUS_MULTIPROC_DIR at an empty directory shared by all of
+# them (and wiped on deploy): each worker writes its samples there and /metrics adds them up
+MULTIPROC_DIR = os.getenv("PROMETHEUS_MULTIPROC_DIR") or None
+# Pool, cache and report-queue figures are copied from this worker's own state at most this often
+PROCESS_METRICS_INTERVAL = float(os.getenv("PROCESS_METRICS_INTERVAL", 1))
+
+# Requests that matched no route share one label, so scanners cannot create a series per URL
+UNMATCHED_ROUTE = "<unmatched>"
+
+REQUESTS = Counter("http_requests_total", "HTTP requests by route template and status code", ["method", "route", "status"])
+REQUEST_LATENCY = Histogram(
+    "http_request_duration_seconds",
+    "Time to produce the response headers, by route template",
+    ["method", "route"],
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30),
+)
+IN_FLIGHT = Gauge("http_requests_in_flight", "Requests being handled", multiprocess_mode="livesum")
+
+POOL_CHECKED_OUT = Gauge("db_pool_checked_out", "Connections checked out of the pool", ["pool"], multiprocess_mode="livesum")
+POOL_CAPACITY = Gauge("db_pool_capacity", "pool_size + max_overflow", ["pool"], multiprocess_mode="livesum")
+POOL_CHECKOUTS = Counter("db_pool_checkouts_total", "Connections handed out by the pool", ["pool"])
+POOL_TIMEOUTS = Counter("db_pool_timeouts_total", "Checkouts that gave up after pool_timeout", ["pool"])
+POOL_WAIT = Counter("db_pool_wait_seconds_total", "Time spent waiting for a pooled connection", ["pool"])
+
+CACHE_HITS = Counter("cache_hits_total", "In-process cache hits; hit ratio = hits / (hits + misses)", ["cache"])
+CACHE_MISSES = Counter("cache_misses_total", "In-process cache misses", ["cache"])
+CACHE_ENTRIES = Gauge("cache_entries", "Entries held by the in-process cache", ["cache"], multiprocess_mode="livesum")
+
+REPORT_QUEUE_DEPTH = Gauge("report_jobs_pending", "Report export jobs waiting for or running in a worker", multiprocess_mode="livesum")
+
+_last_refresh = 0.0
+_refresh_lock = threading.Lock()
+# Cumulative counters already copied into the Prometheus counters, per (metric, label)
+_reported = {}
+
+def route_template(scope) -> str:
+    """The matched route's path template, e.g. /claims/claims/{claim_id}."""
+    route = scope.get("route")
+    if route is None:
+        return UNMATCHED_ROUTE
+    return _route_prefix(scope, route) + route.path_format
+
+def _route_prefix(scope, route) -> str:
+    # route.path_format leaves out a mount's path and, on FastAPI versions that include routers without
+    # copying their routes, the include_router() prefix. That prefix is the part of the path before the
+    # one suffix the route matches with exactly the path_params the request was served with.
+    path, params = scope["path"], scope.get("path_params", {})
+    for start in (position for position, char in enumerate(path) if char == "/"):
+        match = route.path_regex.match(path[start:])
+        if match and {name: route.param_convertors[name].convert(value) for name, value in match.groupdict().items()} == params:
+            return path[:start]
+    return ""
+
+def observe_request(method: str, route: str, status: int, seconds: float):
+    REQUESTS.labels(method, route, str(status)).inc()
+    REQUEST_LATENCY.labels(method, route).observe(seconds)
+
+def _advance(counter, label: str, total: float):
+    # Counters only go up: add what this worker counted since the last refresh
+    key = (counter, label)
+    child = counter.labels(label)
+    delta = total - _reported.get(key, 0)
+    if delta > 0:
+        child.inc(delta)
+    _reported[key] = total
+
+def refresh_process_metrics(force: bool = False):
+    """Copy this worker's pool, cache and report-queue state into the Prometheus metrics.
+
+    Called after requests (throttled) and on every scrape, so each worker's samples
+    stay current even when another worker serves /metrics.
+    """
+    global _last_refresh
+    now = time.monotonic()
+    if not force and now - _last_refresh < PROCESS_METRICS_INTERVAL:
+        return
+    if not _refresh_lock.acquire(blocking=False):
+        return
+    try:
+        _last_refresh = now
+        pools = pool_stats()
+        for name in [key for key, value in pools.items() if isinstance(value, dict)]:
+            stats = pools.pop(name)
+            _record_pool(name, stats)
+        _record_pool("primary", pools)
+        for name, stats in cache_stats().items():
+            _advance(CACHE_HITS, name, stats["hits"])
+            _advance(CACHE_MISSES, name, stats["misses"])
+            CACHE_ENTRIES.labels(name).set(stats["size"])
+        REPORT_QUEUE_DEPTH.set(queue_depth())
+    finally:
+        _refresh_lock.release()
+
+def _record_pool(name: str, stats: dict):
+    if "checked_out" in stats:
+        POOL_CHECKED_OUT.labels(name).set(stats["checked_out"])
+        POOL_CAPACITY.labels(name).set(stats["size"] + max(stats["max_overflow"], 0))
+    if "checkouts" in stats:
+        _advance(POOL_CHECKOUTS, name, stats["checkouts"])
+        _advance(POOL_TIMEOUTS, name, stats["timeouts"])
+        _advance(POOL_WAIT, name, stats["wait_seconds_total"])
+
+def render_metrics() -> bytes:
+    refresh_process_metrics(force=True)
+    if MULTIPROC_DIR is None:
+        return generate_latest(REGISTRY)
+    registry = CollectorRegistry()
+    multiprocess.MultiProcessCollector(registry)
+    return generate_latest(registry)
+
+def worker_exit():
+    # Drops this worker's live gauges (in-flight, pool, queue) from the shared directory
+    if MULTIPROC_DIR is not None:
+        multiprocess.mark_process_dead(os.getpid())
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Date, Enum
+from sqlalchemy import Column, Integer, String, Date, Enum, Index
 from sqlalchemy.orm import relationship
 from insurance_app.database import Base
 import enum
@@ -10,7 +10,11 @@ class AgentStatusEnum(str, enum.Enum):
 
 class Agent(Base):
     __tablename__ = "agents"
-    __table_args__ = {'extend_existing': True}
+    __table_args__ = (
+        Index("ix_agents_status", "status"),
+        Index("ix_agents_last_name_id", "last_name", "id"),
+        {'extend_existing': True},
+    )
     id = Column(Integer, primary_key=True, index=True)
     first_name = Column(String(50), nullable=False)
     last_name = Column(String(50), nullable=False)
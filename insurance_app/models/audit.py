@@ -1,10 +1,15 @@
-from sqlalchemy import Column, Integer, String, DateTime, Text
+from sqlalchemy import Column, Integer, String, DateTime, Text, Index
 from insurance_app.database import Base
 from datetime import datetime
 
 class AuditLog(Base):
     __tablename__ = "audit_logs"
-    __table_args__ = {'extend_existing': True}
+    __table_args__ = (
+        # Both end in id: the list pages seek on (timestamp, id)
+        Index("ix_audit_logs_timestamp_id", "timestamp", "id"),
+        Index("ix_audit_logs_entity_timestamp_id", "entity", "entity_id", "timestamp", "id"),
+        {'extend_existing': True},
+    )
     id = Column(Integer, primary_key=True, index=True)
     action = Column(String(100), nullable=False)
     user_id = Column(Integer, nullable=False)
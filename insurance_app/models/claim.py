@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Date, Float, ForeignKey, Enum
+from sqlalchemy import Column, Integer, String, Date, Float, ForeignKey, Enum, Index
 from sqlalchemy.orm import relationship
 from insurance_app.database import Base
 import enum
@@ -11,7 +11,13 @@ class ClaimStatus(enum.Enum):
 
 class Claim(Base):
     __tablename__ = "claims"
-    __table_args__ = {'extend_existing': True}
+    __table_args__ = (
+        Index("ix_claims_policy_id", "policy_id"),
+        # Both end in id: list pages seek on (claim_date, id)
+        Index("ix_claims_claim_date_id", "claim_date", "id"),
+        Index("ix_claims_status_claim_date_id", "status", "claim_date", "id"),
+        {'extend_existing': True},
+    )
     id = Column(Integer, primary_key=True, index=True)
     policy_id = Column(Integer, ForeignKey("policies.id"), nullable=False)
     claim_date = Column(Date, nullable=False)
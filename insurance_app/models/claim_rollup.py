@@ -0,0 +1,15 @@
+from sqlalchemy import Column, Integer, String, Float, UniqueConstraint
+from insurance_app.database import Base
+
+class ClaimsMonthlyRollup(Base):
+    __tablename__ = "claims_monthly_rollup"
+    __table_args__ = (
+        UniqueConstraint("month", "status", "currency", name="uq_claims_monthly_rollup_bucket"),
+        {'extend_existing': True},
+    )
+    id = Column(Integer, primary_key=True, index=True)
+    month = Column(String(7), nullable=False)  # e.g., "2024-01"
+    status = Column(String(20), nullable=False)  # ClaimStatus value, e.g., "pending"
+    currency = Column(String(3), nullable=False, default="LRD")  # policy currency the amounts are held in
+    claim_count = Column(Integer, nullable=False, default=0)
+    total_amount = Column(Float, nullable=False, default=0.0)
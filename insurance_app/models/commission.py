@@ -1,10 +1,13 @@
-from sqlalchemy import Column, Integer, Float, ForeignKey, Date
+from sqlalchemy import Column, Integer, Float, ForeignKey, Date, Index
 from sqlalchemy.orm import relationship
 from insurance_app.database import Base
 
 class Commission(Base):
     __tablename__ = "commissions"
-    __table_args__ = {'extend_existing': True}
+    __table_args__ = (
+        Index("ix_commissions_agent_id_commission_date", "agent_id", "commission_date"),
+        {'extend_existing': True},
+    )
     id = Column(Integer, primary_key=True, index=True)
     agent_id = Column(Integer, ForeignKey("agents.id"), nullable=False)
     policy_id = Column(Integer, ForeignKey("policies.id"), nullable=False)
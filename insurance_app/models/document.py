@@ -1,11 +1,14 @@
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from insurance_app.database import Base
 from datetime import datetime
 
 class Document(Base):
     __tablename__ = "documents"
-    __table_args__ = {'extend_existing': True}
+    __table_args__ = (
+        Index("ix_documents_related_entity", "related_entity", "related_entity_id"),
+        {'extend_existing': True},
+    )
     id = Column(Integer, primary_key=True, index=True)
     filename = Column(String, nullable=False)
     file_path = Column(String, nullable=False)
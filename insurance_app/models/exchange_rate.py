@@ -0,0 +1,13 @@
+from sqlalchemy import Column, Integer, String, Float, Date, UniqueConstraint
+from insurance_app.database import Base
+
+class ExchangeRate(Base):
+    __tablename__ = "exchange_rates"
+    __table_args__ = (
+        UniqueConstraint("currency", "rate_date", name="uq_exchange_rates_currency_date"),
+        {'extend_existing': True},
+    )
+    id = Column(Integer, primary_key=True, index=True)
+    currency = Column(String(3), nullable=False)  # e.g., LRD
+    rate_date = Column(Date, nullable=False)
+    usd_rate = Column(Float, nullable=False)  # value of one unit of currency in USD
@@ -1,10 +1,15 @@
-from sqlalchemy import Column, Integer, String, Float, DateTime
+from sqlalchemy import Column, Integer, String, Float, DateTime, Index
 from insurance_app.database import Base
 from datetime import datetime
 
 class LedgerEntry(Base):
     __tablename__ = "ledger_entries"
-    __table_args__ = {'extend_existing': True}
+    __table_args__ = (
+        # Both end in id: the list pages seek on (timestamp, id)
+        Index("ix_ledger_entries_timestamp_id", "timestamp", "id"),
+        Index("ix_ledger_entries_account_timestamp_id", "account", "timestamp", "id"),
+        {'extend_existing': True},
+    )
     id = Column(Integer, primary_key=True, index=True)
     account = Column(String(100), nullable=False)
     description = Column(String(255), nullable=True)
@@ -0,0 +1,18 @@
+from sqlalchemy import Column, Integer, String, Float, UniqueConstraint
+from sqlalchemy.dialects.postgresql import UUID
+from insurance_app.database import Base
+
+class LossRatioMonthlyRollup(Base):
+    __tablename__ = "loss_ratio_monthly_rollup"
+    __table_args__ = (
+        UniqueConstraint("month", "product_id", "currency", name="uq_loss_ratio_monthly_rollup_bucket"),
+        {'extend_existing': True},
+    )
+    id = Column(Integer, primary_key=True, index=True)
+    month = Column(String(7), nullable=False)  # e.g., "2024-01"
+    product_id = Column(UUID(as_uuid=True), nullable=False)  # product of the policy the amounts belong to
+    currency = Column(String(3), nullable=False, default="LRD")  # policy currency the amounts are held in
+    premium_count = Column(Integer, nullable=False, default=0)
+    premiums_earned = Column(Float, nullable=False, default=0.0)
+    claim_count = Column(Integer, nullable=False, default=0)
+    claims_paid = Column(Float, nullable=False, default=0.0)
@@ -1,11 +1,18 @@
-from sqlalchemy import Column, String, Enum, Date, Numeric, ForeignKey
+from sqlalchemy import Column, String, Enum, Date, Numeric, ForeignKey, Index
 from sqlalchemy.dialects.postgresql import UUID
 from insurance_app.database import Base
 import uuid
 
 class Policy(Base):
     __tablename__ = "policies"
-    __table_args__ = {'extend_existing': True}
+    __table_args__ = (
+        # All end in id: list pages seek on (issue_date, id), or on id alone when only filtered
+        Index("ix_policies_client_id_id", "client_id", "id"),
+        Index("ix_policies_product_id_id", "product_id", "id"),
+        Index("ix_policies_issue_date_id", "issue_date", "id"),
+        Index("ix_policies_status_issue_date_id", "status", "issue_date", "id"),
+        {'extend_existing': True},
+    )
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4, index=True)
     client_id = Column(UUID(as_uuid=True), ForeignKey("clients.id"), nullable=False)
     product_id = Column(UUID(as_uuid=True), ForeignKey("products.id"), nullable=False)
@@ -1,11 +1,17 @@
-from sqlalchemy import Column, Date, Numeric, Enum, ForeignKey
+from sqlalchemy import Column, Date, Numeric, Enum, ForeignKey, Index
 from sqlalchemy.dialects.postgresql import UUID
 from insurance_app.database import Base
 import uuid
 
 class Premium(Base):
     __tablename__ = "premiums"
-    __table_args__ = {'extend_existing': True}
+    __table_args__ = (
+        # All end in id: list pages seek on (due_date, id)
+        Index("ix_premiums_policy_id_due_date_id", "policy_id", "due_date", "id"),
+        Index("ix_premiums_due_date_id", "due_date", "id"),
+        Index("ix_premiums_status_due_date_id", "status", "due_date", "id"),
+        {'extend_existing': True},
+    )
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4, index=True)
     policy_id = Column(UUID(as_uuid=True), ForeignKey("policies.id"), nullable=False)
     due_date = Column(Date, nullable=False)
@@ -0,0 +1,9 @@
+from sqlalchemy import Column, Integer, String, DateTime
+from insurance_app.database import Base
+
+class TableVersion(Base):
+    __tablename__ = "table_versions"
+    __table_args__ = {'extend_existing': True}
+    table_name = Column(String(100), primary_key=True)
+    version = Column(Integer, nullable=False, default=0)  # bumped once by every transaction that writes the table
+    updated_at = Column(DateTime, nullable=False)
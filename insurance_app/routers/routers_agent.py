@@ -1,10 +1,16 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Response, status
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from typing import List
 
 from insurance_app.schemas import  agent_schema
 from insurance_app.services import agent_service
-from insurance_app.database import get_db
+from insurance_app.services.fieldsets import fieldset, render_fields
+from insurance_app.services.filtering import EQUALITY, RANGE, listing_params
+from insurance_app.services.pagination import Page, page_rows
+from insurance_app.models.agent import Agent
+from insurance_app.database import get_async_db, get_db
+from insurance_app.conditional import conditional_get
 
 router = APIRouter(
     prefix="/agents",
@@ -15,13 +21,29 @@ router = APIRouter(
 def create_agent(agent: agent_schema.AgentCreate, db: Session = Depends(get_db)):
     return agent_service.create_agent(db, agent)
 
-@router.get("/", response_model=List[agent_schema.AgentOut])
-def get_all_agents(db: Session = Depends(get_db)):
-    return agent_service.get_all_agents(db)
+agent_fields = fieldset(Agent, agent_schema.AgentOut)
+agent_conditional = conditional_get(Agent, get_async_db)
+agent_listing = listing_params(
+    Agent,
+    {"status": EQUALITY, "last_name": EQUALITY, "email": ("eq",), "license_number": ("eq",)},
+    ("last_name",),
+)
 
-@router.get("/{agent_id}", response_model=agent_schema.AgentOut)
-def get_agent(agent_id: int, db: Session = Depends(get_db)):
-    return agent_service.get_agent_by_id(db, agent_id)
+@router.get("/", response_model=List[agent_schema.AgentOut], dependencies=[agent_conditional])
+async def get_all_agents(
+    response: Response,
+    page: Page = Depends(),
+    fields=agent_fields,
+    listing=agent_listing,
+    db: AsyncSession = Depends(get_async_db),
+):
+    agents = await agent_service.get_all_agents_async(db, page, fields, listing)
+    agents = page_rows(agents, page, response, key=listing.cursor_key)
+    return render_fields(agents, fields, response)
+
+@router.get("/{agent_id}", response_model=agent_schema.AgentOut, dependencies=[agent_conditional])
+async def get_agent(agent_id: int, response: Response, fields=agent_fields, db: AsyncSession = Depends(get_async_db)):
+    return render_fields(await agent_service.get_agent_by_id_async(db, agent_id, fields), fields, response)
 
 @router.put("/{agent_id}", response_model=agent_schema.AgentOut)
 def update_agent(agent_id: int, agent: agent_schema.AgentUpdate, db: Session = Depends(get_db)):
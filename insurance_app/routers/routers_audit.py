@@ -1,19 +1,43 @@
-from fastapi import APIRouter, Depends, HTTPException
+from datetime import datetime
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 from sqlalchemy.orm import Session
 from insurance_app.database import get_db
+from insurance_app.conditional import conditional_get
+from insurance_app.deadlines import EXPORT_DEADLINE_SECONDS, deadline
 from insurance_app.schemas.audit_schema import AuditLogCreate, AuditLogResponse
+from insurance_app.models.audit import AuditLog
 from insurance_app.services.audit_service import create_audit_log, get_audit_logs
-from typing import List
+from insurance_app.services.export_service import ExportFormat, export_response
+from insurance_app.services.pagination import Page, page_rows
+from typing import List, Optional
 
 router = APIRouter(prefix="/audit", tags=["Audit"])
 
+audit_conditional = conditional_get(AuditLog, get_db)
+
 @router.post("/", response_model=AuditLogResponse)
 def log_action(audit_data: AuditLogCreate, db: Session = Depends(get_db)):
     return create_audit_log(db, audit_data)
 
-@router.get("/", response_model=List[AuditLogResponse])
-def list_audit_logs(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    return get_audit_logs(db, skip=skip, limit=limit)
+@router.get("/", response_model=List[AuditLogResponse], dependencies=[audit_conditional])
+def list_audit_logs(
+    response: Response,
+    page: Page = Depends(),
+    entity: Optional[str] = None,
+    entity_id: Optional[int] = None,
+    start: Optional[datetime] = Query(None, alias="from"),
+    end: Optional[datetime] = Query(None, alias="to"),
+    db: Session = Depends(get_db),
+):
+    if entity_id is not None and entity is None:
+        # Entity ids are only unique within an entity type, and the index leads with the type
+        raise HTTPException(status_code=400, detail="entity_id requires entity")
+    logs = get_audit_logs(db, page, entity=entity, entity_id=entity_id, start=start, end=end)
+    return page_rows(logs, page, response, key=lambda log: [log.timestamp, log.id])
+
+@router.get("/export", dependencies=[deadline(EXPORT_DEADLINE_SECONDS)])
+def export_audit_logs(format: ExportFormat = ExportFormat.csv, db: Session = Depends(get_db)):
+    return export_response(db, AuditLog, format, "audit_logs")
 
 
 
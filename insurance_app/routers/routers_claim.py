@@ -1,11 +1,17 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Response, status
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from typing import List
 
-from insurance_app.database import get_db
+from insurance_app.database import get_async_db, get_db
+from insurance_app.conditional import conditional_get
 from insurance_app.schemas.claim_schema import ClaimCreate, ClaimUpdate, ClaimOut
 from insurance_app.schemas.document_schema import DocumentOut
 from insurance_app.services import claim_service, document_service
+from insurance_app.services.fieldsets import fieldset, render_fields
+from insurance_app.services.filtering import EQUALITY, RANGE, listing_params
+from insurance_app.services.pagination import Page, page_rows
+from insurance_app.models.claim import Claim
 
 router = APIRouter(
     prefix="/claims",
@@ -16,16 +22,28 @@ router = APIRouter(
 def create_claim(claim: ClaimCreate, db: Session = Depends(get_db)):
     return claim_service.create_claim(db, claim)
 
-@router.get("/", response_model=List[ClaimOut])
-def get_all_claims(db: Session = Depends(get_db)):
-    return claim_service.get_all_claims(db)
-
-@router.get("/{claim_id}", response_model=ClaimOut)
-def get_claim(claim_id: int, db: Session = Depends(get_db)):
-    db_claim = claim_service.get_claim_by_id(db, claim_id)
+claim_fields = fieldset(Claim, ClaimOut)
+claim_conditional = conditional_get(Claim, get_async_db)
+claim_listing = listing_params(Claim, {"status": EQUALITY, "claim_date": RANGE, "policy_id": EQUALITY}, ("claim_date",))
+
+@router.get("/", response_model=List[ClaimOut], dependencies=[claim_conditional])
+async def get_all_claims(
+    response: Response,
+    page: Page = Depends(),
+    fields=claim_fields,
+    listing=claim_listing,
+    db: AsyncSession = Depends(get_async_db),
+):
+    claims = await claim_service.get_all_claims_async(db, page, fields, listing)
+    claims = page_rows(claims, page, response, key=listing.cursor_key)
+    return render_fields(claims, fields, response)
+
+@router.get("/{claim_id}", response_model=ClaimOut, dependencies=[claim_conditional])
+async def get_claim(claim_id: int, response: Response, fields=claim_fields, db: AsyncSession = Depends(get_async_db)):
+    db_claim = await claim_service.get_claim_by_id_async(db, claim_id, fields)
     if not db_claim:
         raise HTTPException(status_code=404, detail="Claim not found")
-    return db_claim
+    return render_fields(db_claim, fields, response)
 
 @router.put("/{claim_id}", response_model=ClaimOut)
 def update_claim(claim_id: int, claim_update: ClaimUpdate, db: Session = Depends(get_db)):
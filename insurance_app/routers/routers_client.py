@@ -1,4 +1,4 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Response
 
 from sqlalchemy.orm import Session
 
@@ -12,8 +12,16 @@ from insurance_app.schemas.client_schema import ClientCreate, ClientUpdate, Clie
 
 from insurance_app.services.client_service import ClientService
 
+from insurance_app.services.fieldsets import fieldset, render_fields
+
+from insurance_app.services.pagination import Page, page_rows
+
+from insurance_app.models.client import Client
+
 from insurance_app.database import get_db  # <-- Import get_db from your shared database.py
 
+from insurance_app.conditional import conditional_get
+
  
 
 router = APIRouter()
@@ -30,29 +38,36 @@ def create_client(client: ClientCreate, db: Session = Depends(get_db)):
 
  
 
-@router.get("/", response_model=List[ClientResponse])
+client_fields = fieldset(Client, ClientResponse)
+client_conditional = conditional_get(Client, get_db)
 
-def list_clients(db: Session = Depends(get_db)):
+ 
+
+@router.get("/", response_model=List[ClientResponse], dependencies=[client_conditional])
+
+def list_clients(response: Response, page: Page = Depends(), fields=client_fields, db: Session = Depends(get_db)):
 
     service = ClientService(db)
 
-    return service.get_all_clients()
+    clients = page_rows(service.get_all_clients(page, fields), page, response)
+
+    return render_fields(clients, fields, response)
 
  
 
-@router.get("/{client_id}", response_model=ClientResponse)
+@router.get("/{client_id}", response_model=ClientResponse, dependencies=[client_conditional])
 
-def get_client(client_id: uuid.UUID, db: Session = Depends(get_db)):
+def get_client(client_id: uuid.UUID, response: Response, fields=client_fields, db: Session = Depends(get_db)):
 
     service = ClientService(db)
 
-    client = service.get_client_by_id(client_id)
+    client = service.get_client_by_id(client_id, fields)
 
     if not client:
 
         raise HTTPException(status_code=404, detail="Client not found")
 
-    return client
+    return render_fields(client, fields, response)
 
  
 
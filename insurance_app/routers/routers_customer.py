@@ -1,23 +1,40 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Response, status
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from typing import List
 from insurance_app import models
 from insurance_app.schemas.customer_schema import CustomerCreate, CustomerUpdate, CustomerOut
-from insurance_app.database import get_db
+from insurance_app.database import get_async_db, get_db
+from insurance_app.conditional import conditional_get
 from insurance_app.services import customer_service
+from insurance_app.services.fieldsets import fieldset, render_fields
+from insurance_app.services.filtering import EQUALITY, RANGE, listing_params
+from insurance_app.services.pagination import Page, page_rows
+from insurance_app.models.customer import Customer
 router = APIRouter(
     prefix="/customers",
     tags=["Customers"]
 )
+customer_fields = fieldset(Customer, CustomerOut)
+customer_conditional = conditional_get(Customer, get_async_db)
+customer_listing = listing_params(Customer, {"last_name": EQUALITY, "email": ("eq",), "national_id": ("eq",)}, ("last_name",))
 @router.post("/", response_model=CustomerOut, status_code=status.HTTP_201_CREATED)
 def create_customer(customer: CustomerCreate, db: Session = Depends(get_db)):
     return customer_service.create_customer(db, customer)
-@router.get("/", response_model=List[CustomerOut])
-def get_all_customers(db: Session = Depends(get_db)):
-    return customer_service.get_all_customers(db)
-@router.get("/{customer_id}", response_model=CustomerOut)
-def get_customer(customer_id: int, db: Session = Depends(get_db)):
-    return customer_service.get_customer_by_id(db, customer_id)
+@router.get("/", response_model=List[CustomerOut], dependencies=[customer_conditional])
+async def get_all_customers(
+    response: Response,
+    page: Page = Depends(),
+    fields=customer_fields,
+    listing=customer_listing,
+    db: AsyncSession = Depends(get_async_db),
+):
+    customers = await customer_service.get_all_customers_async(db, page, fields, listing)
+    customers = page_rows(customers, page, response, key=listing.cursor_key)
+    return render_fields(customers, fields, response)
+@router.get("/{customer_id}", response_model=CustomerOut, dependencies=[customer_conditional])
+async def get_customer(customer_id: int, response: Response, fields=customer_fields, db: AsyncSession = Depends(get_async_db)):
+    return render_fields(await customer_service.get_customer_by_id_async(db, customer_id, fields), fields, response)
 @router.put("/{customer_id}", response_model=CustomerOut)
 def update_customer(customer_id: int, customer: CustomerUpdate, db: Session = Depends(get_db)):
     return customer_service.update_customer(db, customer_id, customer)
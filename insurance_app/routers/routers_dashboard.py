@@ -1,68 +1,68 @@
 # insurance_app/routers/routers_dashboard.py
 
-from fastapi import APIRouter, Request, Depends
+from fastapi import APIRouter, Request, Depends, Query, HTTPException, status as http_status
 
-from fastapi.responses import HTMLResponse, StreamingResponse
+from fastapi.responses import FileResponse, HTMLResponse, StreamingResponse
 
 from sqlalchemy.orm import Session
 
-from insurance_app.connection import get_db
+from insurance_app.database import get_db
 
-from insurance_app.models.models import Claim
+from insurance_app.cache import cache_stats
 
-from fastapi.templating import Jinja2Templates
+from insurance_app.concurrency import iterate_export, run_blocking, run_export
 
-import pandas as pd
+from insurance_app.deadlines import EXPORT_DEADLINE_SECONDS, deadline
 
-import io
+from insurance_app.models.claim import ClaimStatus
 
-from datetime import datetime
+from insurance_app.services.dashboard_service import ClaimBreakdown, ReportPeriod, claims_breakdown, claims_by_month, iter_claims_by_month, require_report_rates
 
-from reportlab.lib.pagesizes import letter
+from insurance_app.services.exchange_rate_service import MissingRateError
 
-from reportlab.pdfgen import canvas
+from insurance_app.services.loss_ratio_service import loss_ratios
 
-router = APIRouter()
-
-templates = Jinja2Templates(directory="insurance_app/templates")
+from insurance_app.services.report_service import claims_report_subtitle, stream_claims_pdf
 
-LRD_TO_USD = 0.005  # Example rate
+from insurance_app.services import report_job_service
 
-def claims_by_month(db: Session, currency: str = "LRD"):
+from insurance_app.services.report_job_service import ReportKind
 
-    claims = db.query(Claim).all()
+from fastapi.templating import Jinja2Templates
 
-    data = []
+from typing import List, Optional
 
-    for claim in claims:
+from contextlib import contextmanager
 
-        if claim.filed_date:
+import uuid
 
-            month = datetime.strptime(claim.filed_date, "%Y-%m-%d").strftime("%Y-%m")
+import io
 
-            amount = claim.amount if claim.amount else 0
+from datetime import date
 
-            if currency == "USD":
+router = APIRouter()
 
-                amount *= LRD_TO_USD
+templates = Jinja2Templates(directory="insurance_app/templates")
 
-            data.append({"month": month, "amount": amount})
+@contextmanager
 
-    df = pd.DataFrame(data)
+def missing_rates_as_422():
 
-    if df.empty:
+    try:
 
-        return []
+        yield
 
-    grouped = df.groupby("month").agg(count=("amount", "size"), total_value=("amount", "sum")).reset_index()
+    except MissingRateError as error:
 
-    return grouped.to_dict(orient="records")
+        raise HTTPException(status_code=http_status.HTTP_422_UNPROCESSABLE_ENTITY, detail=str(error))
 
 @router.get("/dashboard", response_class=HTMLResponse)
 
-async def dashboard(request: Request, db: Session = Depends(get_db), currency: str = "LRD"):
+async def dashboard(request: Request, db: Session = Depends(get_db), currency: str = "LRD", date_from: Optional[date] = None, date_to: Optional[date] = None, status: Optional[ClaimStatus] = None):
+
+    with missing_rates_as_422():
 
-    analytics = claims_by_month(db, currency)
+        analytics = await run_blocking(claims_by_month, db, currency, date_from, date_to, status)
 
     project_tree = [
 
@@ -96,78 +96,122 @@ async def dashboard(request: Request, db: Session = Depends(get_db), currency: s
 
     })
 
-@router.get("/dashboard/export/excel")
+def _claims_excel(db: Session, currency: str, date_from, date_to, status) -> io.BytesIO:
 
-async def export_excel(db: Session = Depends(get_db), currency: str = "LRD"):
-
-    analytics = claims_by_month(db, currency)
-
-    df = pd.DataFrame(analytics)
+    import pandas as pd
 
     output = io.BytesIO()
 
-    df.to_excel(output, index=False)
+    pd.DataFrame(claims_by_month(db, currency, date_from, date_to, status)).to_excel(output, index=False)
 
     output.seek(0)
 
+    return output
+
+@router.get("/dashboard/export/excel", dependencies=[deadline(EXPORT_DEADLINE_SECONDS)])
+
+async def export_excel(db: Session = Depends(get_db), currency: str = "LRD", date_from: Optional[date] = None, date_to: Optional[date] = None, status: Optional[ClaimStatus] = None):
+
+    with missing_rates_as_422():
+
+        output = await run_export(_claims_excel, db, currency, date_from, date_to, status)
+
     return StreamingResponse(output, media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
 
                             headers={"Content-Disposition": "attachment; filename=claims_by_month.xlsx"})
 
-@router.get("/dashboard/export/pdf")
+@router.get("/dashboard/export/pdf", dependencies=[deadline(EXPORT_DEADLINE_SECONDS)])
+
+async def export_pdf(db: Session = Depends(get_db), currency: str = "LRD", date_from: Optional[date] = None, date_to: Optional[date] = None, status: Optional[ClaimStatus] = None):
+
+    # Checked before the response starts: once the PDF is streaming, a missing rate could only truncate it
 
-async def export_pdf(db: Session = Depends(get_db), currency: str = "LRD"):
+    with missing_rates_as_422():
 
-    analytics = claims_by_month(db, currency)
+        await run_blocking(require_report_rates, db, currency)
 
-    buffer = io.BytesIO()
+    rows = iter_claims_by_month(db, currency, date_from, date_to, status)
 
-    p = canvas.Canvas(buffer, pagesize=letter)
+    return StreamingResponse(iterate_export(stream_claims_pdf(rows, currency, claims_report_subtitle(date_from, date_to, status))), media_type="application/pdf",
 
-    width, height = letter
+                            headers={"Content-Disposition": "attachment; filename=claims_by_month.pdf"})
 
-    p.setFont("Helvetica-Bold", 16)
+@router.get("/dashboard/analytics/claims")
 
-    p.drawString(50, height - 50, "Claims by Month Report")
+async def claims_analytics(db: Session = Depends(get_db), breakdowns: List[ClaimBreakdown] = Query([ClaimBreakdown.month]), currency: str = "LRD", date_from: Optional[date] = None, date_to: Optional[date] = None, status: Optional[ClaimStatus] = None):
 
-    p.setFont("Helvetica", 12)
+    with missing_rates_as_422():
 
-    p.drawString(50, height - 80, f"Currency: {currency}")
+        return await run_blocking(claims_breakdown, db, breakdowns, currency, date_from, date_to, status)
 
-    y = height - 120
+@router.get("/dashboard/analytics/loss-ratio")
 
-    p.drawString(50, y, "Month")
+async def loss_ratio_analytics(db: Session = Depends(get_db), period: ReportPeriod = ReportPeriod.month, currency: str = "LRD", date_from: Optional[date] = None, date_to: Optional[date] = None, product_id: Optional[uuid.UUID] = None):
 
-    p.drawString(150, y, "Claim Count")
+    with missing_rates_as_422():
 
-    p.drawString(300, y, f"Total Value ({currency})")
+        return await run_blocking(loss_ratios, db, period, currency, date_from, date_to, product_id)
 
-    y -= 20
+@router.post("/dashboard/reports", status_code=http_status.HTTP_202_ACCEPTED)
 
-    for row in analytics:
+async def submit_report(kind: ReportKind, db: Session = Depends(get_db), currency: str = "LRD", date_from: Optional[date] = None, date_to: Optional[date] = None, status: Optional[ClaimStatus] = None):
 
-        p.drawString(50, y, str(row['month']))
+    # The job renders in another process, where a missing rate could only fail it after the 202
 
-        p.drawString(150, y, str(row['count']))
+    with missing_rates_as_422():
 
-        p.drawString(300, y, f"{row['total_value']:.2f}")
+        await run_blocking(require_report_rates, db, currency)
 
-        y -= 20
+    params = {
 
-        if y < 50:
+        "currency": currency,
 
-            p.showPage()
+        "date_from": date_from.isoformat() if date_from else None,
 
-            y = height - 50
+        "date_to": date_to.isoformat() if date_to else None,
 
-    p.save()
+        "status": status.value if status else None,
 
-    buffer.seek(0)
+    }
 
-    return StreamingResponse(buffer, media_type="application/pdf",
+    return await run_blocking(report_job_service.submit_report, kind, params)
 
-                            headers={"Content-Disposition": "attachment; filename=claims_by_month.pdf"})
+@router.get("/dashboard/reports/{job_id}")
+
+async def get_report_job(job_id: str):
+
+    job = report_job_service.get_report_job(job_id)
+
+    if not job:
+
+        raise HTTPException(status_code=404, detail="Report job not found")
+
+    job.pop("path")
+
+    return job
+
+@router.get("/dashboard/reports/{job_id}/download", dependencies=[deadline(EXPORT_DEADLINE_SECONDS)])
+
+async def download_report(job_id: str):
+
+    job = report_job_service.get_report_job(job_id)
+
+    if not job:
+
+        raise HTTPException(status_code=404, detail="Report job not found")
+
+    if job["status"] != "done":
+
+        raise HTTPException(status_code=409, detail=f"Report is {job['status']}")
+
+    kind = ReportKind(job["kind"])
+
+    return FileResponse(job["path"], media_type=report_job_service.MEDIA_TYPES[kind],
+
+                        filename=f"claims_by_month.{report_job_service.EXTENSIONS[kind]}")
 
- 
+@router.get("/dashboard/cache")
 
+async def analytics_cache_stats():
 
+    return cache_stats()
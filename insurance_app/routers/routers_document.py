@@ -1,4 +1,4 @@
-from fastapi import APIRouter, UploadFile, File, Depends, HTTPException, status
+from fastapi import APIRouter, UploadFile, File, Depends, HTTPException, Response, status
 from sqlalchemy.orm import Session
 from typing import List
 import shutil
@@ -7,6 +7,10 @@ from uuid import uuid4
 
 from insurance_app import schemas, services
 from insurance_app.database import get_db
+from insurance_app.conditional import conditional_get
+from insurance_app.services.fieldsets import fieldset, render_fields
+from insurance_app.services.pagination import Page, page_rows
+from insurance_app.models.document import Document
 
 router = APIRouter(
     prefix="/documents",
@@ -15,6 +19,9 @@ router = APIRouter(
 
 UPLOAD_DIR = "uploaded_files"
 
+document_fields = fieldset(Document, schemas.document_schema.DocumentOut)
+document_conditional = conditional_get(Document, get_db)
+
 @router.post("/", response_model=schemas.document_schema.DocumentOut, status_code=status.HTTP_201_CREATED)
 def upload_document(
     related_entity: str,
@@ -43,16 +50,17 @@ def upload_document(
 
     return services.document_service.create_document(db, document_data)
 
-@router.get("/", response_model=List[schemas.document_schema.DocumentOut])
-def get_all_documents(db: Session = Depends(get_db)):
-    return services.document_service.get_all_documents(db)
+@router.get("/", response_model=List[schemas.document_schema.DocumentOut], dependencies=[document_conditional])
+def get_all_documents(response: Response, page: Page = Depends(), fields=document_fields, db: Session = Depends(get_db)):
+    documents = page_rows(services.document_service.get_all_documents(db, page, fields), page, response)
+    return render_fields(documents, fields, response)
 
-@router.get("/{document_id}", response_model=schemas.document_schema.DocumentOut)
-def get_document(document_id: int, db: Session = Depends(get_db)):
-    document = services.document_service.get_document_by_id(db, document_id)
+@router.get("/{document_id}", response_model=schemas.document_schema.DocumentOut, dependencies=[document_conditional])
+def get_document(document_id: int, response: Response, fields=document_fields, db: Session = Depends(get_db)):
+    document = services.document_service.get_document_by_id(db, document_id, fields)
     if not document:
         raise HTTPException(status_code=404, detail="Document not found")
-    return document
+    return render_fields(document, fields, response)
 
 @router.delete("/{document_id}", status_code=status.HTTP_204_NO_CONTENT)
 def delete_document(document_id: int, db: Session = Depends(get_db)):
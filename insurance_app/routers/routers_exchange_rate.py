@@ -0,0 +1,28 @@
+from fastapi import APIRouter, Depends, File, UploadFile
+from sqlalchemy.orm import Session
+from typing import List, Optional
+from datetime import date
+
+from insurance_app.schemas.exchange_rate_schema import ExchangeRateCreate, ExchangeRateResponse
+from insurance_app.services import exchange_rate_service
+from insurance_app.services.dashboard_service import invalidate_analytics
+from insurance_app.database import get_db
+
+router = APIRouter()
+
+@router.get("/", response_model=List[ExchangeRateResponse])
+def list_rates(currency: Optional[str] = None, date_from: Optional[date] = None, date_to: Optional[date] = None, db: Session = Depends(get_db)):
+    return exchange_rate_service.get_rates(db, currency, date_from, date_to)
+
+@router.post("/bulk")
+def load_rates(rates: List[ExchangeRateCreate], db: Session = Depends(get_db)):
+    loaded = exchange_rate_service.save_rates(db, rates)
+    invalidate_analytics()
+    return {"loaded": loaded}
+
+@router.post("/upload")
+def upload_rate_file(file: UploadFile = File(...), db: Session = Depends(get_db)):
+    rates = exchange_rate_service.parse_rate_file(file.file.read())
+    loaded = exchange_rate_service.save_rates(db, rates)
+    invalidate_analytics()
+    return {"filename": file.filename, "loaded": loaded}
@@ -1,19 +1,39 @@
-from fastapi import APIRouter, Depends
+from datetime import datetime
+from fastapi import APIRouter, Depends, Query, Response
 from sqlalchemy.orm import Session
 from insurance_app.database import get_db
+from insurance_app.conditional import conditional_get
+from insurance_app.deadlines import EXPORT_DEADLINE_SECONDS, deadline
 from insurance_app.schemas.ledger_schema import LedgerEntryCreate, LedgerEntryResponse
+from insurance_app.models.ledger import LedgerEntry
 from insurance_app.services.ledger_service import create_ledger_entry, get_ledger_entries
-from typing import List
+from insurance_app.services.export_service import ExportFormat, export_response
+from insurance_app.services.pagination import Page, page_rows
+from typing import List, Optional
 
 router = APIRouter(prefix="/ledger", tags=["Ledger"])
 
+ledger_conditional = conditional_get(LedgerEntry, get_db)
+
 @router.post("/", response_model=LedgerEntryResponse)
 def add_entry(entry_data: LedgerEntryCreate, db: Session = Depends(get_db)):
     return create_ledger_entry(db, entry_data)
 
-@router.get("/", response_model=List[LedgerEntryResponse])
-def list_entries(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    return get_ledger_entries(db, skip=skip, limit=limit)
+@router.get("/", response_model=List[LedgerEntryResponse], dependencies=[ledger_conditional])
+def list_entries(
+    response: Response,
+    page: Page = Depends(),
+    account: Optional[str] = None,
+    start: Optional[datetime] = Query(None, alias="from"),
+    end: Optional[datetime] = Query(None, alias="to"),
+    db: Session = Depends(get_db),
+):
+    entries = get_ledger_entries(db, page, account=account, start=start, end=end)
+    return page_rows(entries, page, response, key=lambda entry: [entry.timestamp, entry.id])
+
+@router.get("/export", dependencies=[deadline(EXPORT_DEADLINE_SECONDS)])
+def export_entries(format: ExportFormat = ExportFormat.csv, db: Session = Depends(get_db)):
+    return export_response(db, LedgerEntry, format, "ledger_entries")
 
 
 
@@ -1,9 +1,19 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Response, status
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from typing import List
+import uuid
 from insurance_app.schemas.policy_schema import PolicyResponse, PolicyCreate, PolicyUpdate
 from insurance_app.schemas.document_schema import DocumentOut
-from insurance_app.database import get_db
+from insurance_app.database import get_async_db, get_db
+from insurance_app.conditional import conditional_get
+from insurance_app.deadlines import EXPORT_DEADLINE_SECONDS, deadline
+from insurance_app.models.policy import Policy
+from insurance_app.services.export_service import ExportFormat, export_response
+from insurance_app.services.policy_service import AsyncPolicyService
+from insurance_app.services.fieldsets import fieldset, render_fields
+from insurance_app.services.filtering import EQUALITY, RANGE, listing_params
+from insurance_app.services.pagination import Page, page_rows
 from insurance_app import services
 router = APIRouter(
     prefix="/policies",
@@ -12,15 +22,33 @@ router = APIRouter(
 @router.post("/", response_model=PolicyResponse, status_code=status.HTTP_201_CREATED)
 def create_policy(policy: PolicyCreate, db: Session = Depends(get_db)):
     return services.policy_service.create_policy(db, policy)
-@router.get("/", response_model=List[PolicyResponse])
-def get_all_policies(db: Session = Depends(get_db)):
-    return services.policy_service.get_all_policies(db)
-@router.get("/{policy_id}", response_model=PolicyResponse)
-def get_policy(policy_id: int, db: Session = Depends(get_db)):
-    db_policy = services.policy_service.get_policy_by_id(db, policy_id)
+policy_fields = fieldset(Policy, PolicyResponse)
+policy_conditional = conditional_get(Policy, get_async_db)
+policy_listing = listing_params(
+    Policy,
+    {"client_id": EQUALITY, "product_id": EQUALITY, "status": EQUALITY, "issue_date": RANGE, "policy_number": ("eq",)},
+    ("issue_date",),
+)
+@router.get("/", response_model=List[PolicyResponse], dependencies=[policy_conditional])
+async def get_all_policies(
+    response: Response,
+    page: Page = Depends(),
+    fields=policy_fields,
+    listing=policy_listing,
+    db: AsyncSession = Depends(get_async_db),
+):
+    policies = await AsyncPolicyService(db).get_all_policies(page, fields, listing)
+    policies = page_rows(policies, page, response, key=listing.cursor_key)
+    return render_fields(policies, fields, response)
+@router.get("/export", dependencies=[deadline(EXPORT_DEADLINE_SECONDS)])
+def export_policies(format: ExportFormat = ExportFormat.csv, db: Session = Depends(get_db)):
+    return export_response(db, Policy, format, "policies")
+@router.get("/{policy_id}", response_model=PolicyResponse, dependencies=[policy_conditional])
+async def get_policy(policy_id: uuid.UUID, response: Response, fields=policy_fields, db: AsyncSession = Depends(get_async_db)):
+    db_policy = await AsyncPolicyService(db).get_policy_by_id(policy_id, fields)
     if not db_policy:
         raise HTTPException(status_code=404, detail="Policy not found")
-    return db_policy
+    return render_fields(db_policy, fields, response)
 @router.put("/{policy_id}", response_model=PolicyResponse)
 def update_policy(policy_id: int, policy_update: PolicyUpdate, db: Session = Depends(get_db)):
     return services.policy_service.update_policy(db, policy_id, policy_update)
@@ -1,11 +1,18 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Response
 from sqlalchemy.orm import Session
 from typing import List
 import uuid
 
 from insurance_app.schemas.premium_schema import PremiumCreate, PremiumUpdate, PremiumResponse
+from insurance_app.models.premium import Premium
 from insurance_app.services.premium_service import PremiumService
+from insurance_app.services.pagination import Page, page_rows
+from insurance_app.services.export_service import ExportFormat, export_response
 from insurance_app.database import get_db  # <-- Import get_db from your shared database.py
+from insurance_app.conditional import conditional_get
+from insurance_app.deadlines import EXPORT_DEADLINE_SECONDS, deadline
+from insurance_app.services.fieldsets import fieldset, render_fields
+from insurance_app.services.filtering import EQUALITY, RANGE, listing_params
 
 router = APIRouter()
 
@@ -22,18 +29,33 @@ def create_premium(premium: PremiumCreate, db: Session = Depends(get_db)):
     service = PremiumService(db)
     return service.create_premium(premium)
 
-@router.get("/", response_model=List[PremiumResponse])
-def list_premiums(db: Session = Depends(get_db)):
+premium_fields = fieldset(Premium, PremiumResponse)
+premium_conditional = conditional_get(Premium, get_db)
+premium_listing = listing_params(Premium, {"status": EQUALITY, "due_date": RANGE, "policy_id": EQUALITY}, ("due_date",))
+
+@router.get("/", response_model=List[PremiumResponse], dependencies=[premium_conditional])
+def list_premiums(
+    response: Response,
+    page: Page = Depends(),
+    fields=premium_fields,
+    listing=premium_listing,
+    db: Session = Depends(get_db),
+):
     service = PremiumService(db)
-    return service.get_all_premiums()
+    premiums = page_rows(service.get_all_premiums(page, fields, listing), page, response, key=listing.cursor_key)
+    return render_fields(premiums, fields, response)
+
+@router.get("/export", dependencies=[deadline(EXPORT_DEADLINE_SECONDS)])
+def export_premiums(format: ExportFormat = ExportFormat.csv, db: Session = Depends(get_db)):
+    return export_response(db, Premium, format, "premiums")
 
-@router.get("/{premium_id}", response_model=PremiumResponse)
-def get_premium(premium_id: uuid.UUID, db: Session = Depends(get_db)):
+@router.get("/{premium_id}", response_model=PremiumResponse, dependencies=[premium_conditional])
+def get_premium(premium_id: uuid.UUID, response: Response, fields=premium_fields, db: Session = Depends(get_db)):
     service = PremiumService(db)
-    premium = service.get_premium_by_id(premium_id)
+    premium = service.get_premium_by_id(premium_id, fields)
     if not premium:
         raise HTTPException(status_code=404, detail="Premium not found")
-    return premium
+    return render_fields(premium, fields, response)
 
 @router.put("/{premium_id}", response_model=PremiumResponse)
 def update_premium(premium_id: uuid.UUID, premium_data: PremiumUpdate, db: Session = Depends(get_db)):
@@ -1,39 +1,37 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Response
 from sqlalchemy.orm import Session
 from typing import List
 import uuid
 
 from insurance_app.schemas.product_schema import ProductCreate, ProductUpdate, ProductResponse
 from insurance_app.services.product_service import ProductService
+from insurance_app.services.fieldsets import fieldset, render_fields
+from insurance_app.models.product import Product
 from insurance_app.database import get_db  # <-- Import get_db from your shared database.py
+from insurance_app.conditional import conditional_get
 
 router = APIRouter()
 
-# Dependency to get DB session
-def get_db():
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
+product_fields = fieldset(Product, ProductResponse)
+product_conditional = conditional_get(Product, get_db)
 
 @router.post("/", response_model=ProductResponse)
 def create_product(product: ProductCreate, db: Session = Depends(get_db)):
     service = ProductService(db)
     return service.create_product(product)
 
-@router.get("/", response_model=List[ProductResponse])
-def list_products(db: Session = Depends(get_db)):
+@router.get("/", response_model=List[ProductResponse], dependencies=[product_conditional])
+def list_products(response: Response, fields=product_fields, db: Session = Depends(get_db)):
     service = ProductService(db)
-    return service.get_all_products()
+    return render_fields(service.get_all_products(fields), fields, response)
 
-@router.get("/{product_id}", response_model=ProductResponse)
-def get_product(product_id: uuid.UUID, db: Session = Depends(get_db)):
+@router.get("/{product_id}", response_model=ProductResponse, dependencies=[product_conditional])
+def get_product(product_id: uuid.UUID, response: Response, fields=product_fields, db: Session = Depends(get_db)):
     service = ProductService(db)
-    product = service.get_product_by_id(product_id)
+    product = service.get_product_by_id(product_id, fields)
     if not product:
         raise HTTPException(status_code=404, detail="Product not found")
-    return product
+    return render_fields(product, fields, response)
 
 @router.put("/{product_id}", response_model=ProductResponse)
 def update_product(product_id: uuid.UUID, product_data: ProductUpdate, db: Session = Depends(get_db)):
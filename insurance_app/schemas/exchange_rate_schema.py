@@ -0,0 +1,16 @@
+from pydantic import BaseModel, constr, confloat
+from datetime import date
+
+class ExchangeRateBase(BaseModel):
+    currency: constr(min_length=3, max_length=3)
+    rate_date: date
+    usd_rate: confloat(gt=0)
+
+class ExchangeRateCreate(ExchangeRateBase):
+    pass
+
+class ExchangeRateResponse(ExchangeRateBase):
+    id: int
+
+    class Config:
+        from_attributes = True
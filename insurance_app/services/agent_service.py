@@ -1,8 +1,14 @@
 import logging
 from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from fastapi import HTTPException, status
 from insurance_app import models
+from insurance_app.models.agent import Agent
+from insurance_app.services.fieldsets import fetch_all, select_fields
+from insurance_app.services.lookup import get_by_id, get_by_id_async
+from insurance_app.services.filtering import list_page
+from insurance_app.services.pagination import Page
 from insurance_app.schemas import agent_schema
 
 # Configure logging
@@ -30,9 +36,9 @@ def create_agent(db: Session, agent: agent_schema.AgentCreate):
             detail="Unexpected error occurred"
         )
 
-def get_all_agents(db: Session):
+def get_all_agents(db: Session, page: Page, fields=None, listing=None):
     try:
-        return db.query(models.Agent).all()
+        return fetch_all(db.execute(list_page(select_fields(Agent, fields), Agent, page, listing)), fields)
     except SQLAlchemyError as e:
         logger.error(f"Database error during fetching all agents: {e}")
         raise HTTPException(
@@ -40,9 +46,9 @@ def get_all_agents(db: Session):
             detail="Failed to fetch agents"
         )
 
-def get_agent_by_id(db: Session, agent_id: int):
+def get_agent_by_id(db: Session, agent_id: int, fields=None):
     try:
-        agent = db.query(models.Agent).filter(models.Agent.id == agent_id).first()
+        agent = get_by_id(db, Agent, agent_id, fields)
         if not agent:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
@@ -58,7 +64,7 @@ def get_agent_by_id(db: Session, agent_id: int):
 
 def update_agent(db: Session, agent_id: int, agent_data: agent_schema.AgentUpdate):
     try:
-        agent = db.query(models.Agent).filter(models.Agent.id == agent_id).first()
+        agent = get_by_id(db, Agent, agent_id)
         if not agent:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
@@ -85,7 +91,7 @@ def update_agent(db: Session, agent_id: int, agent_data: agent_schema.AgentUpdat
 
 def delete_agent(db: Session, agent_id: int):
     try:
-        agent = db.query(models.Agent).filter(models.Agent.id == agent_id).first()
+        agent = get_by_id(db, Agent, agent_id)
         if not agent:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
@@ -107,6 +113,30 @@ def delete_agent(db: Session, agent_id: int):
             detail="Unexpected error occurred"
         )
 
+# Async read paths, used by the routers through get_async_db
 
+async def get_all_agents_async(db: AsyncSession, page: Page, fields=None, listing=None):
+    try:
+        return fetch_all(await db.execute(list_page(select_fields(Agent, fields), Agent, page, listing)), fields)
+    except SQLAlchemyError as e:
+        logger.error(f"Database error during fetching all agents: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Failed to fetch agents"
+        )
 
-
+async def get_agent_by_id_async(db: AsyncSession, agent_id: int, fields=None):
+    try:
+        agent = await get_by_id_async(db, Agent, agent_id, fields)
+    except SQLAlchemyError as e:
+        logger.error(f"Database error during fetching agent by ID: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Failed to fetch agent"
+        )
+    if not agent:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Agent not found"
+        )
+    return agent
@@ -1,6 +1,11 @@
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import select
 from sqlalchemy.orm import Session
 from insurance_app.models.audit import AuditLog
 from insurance_app.schemas.audit_schema import AuditLogCreate
+from insurance_app.services.pagination import Page, seek
 
 def create_audit_log(db: Session, audit_data: AuditLogCreate) -> AuditLog:
     audit_log = AuditLog(**audit_data.dict())
@@ -9,6 +14,23 @@ def create_audit_log(db: Session, audit_data: AuditLogCreate) -> AuditLog:
     db.refresh(audit_log)
     return audit_log
 
-def get_audit_logs(db: Session, skip: int = 0, limit: int = 100):
-    return db.query(AuditLog).offset(skip).limit(limit).all()
+def get_audit_logs(
+    db: Session,
+    page: Page,
+    entity: Optional[str] = None,
+    entity_id: Optional[int] = None,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+):
+    """Audit records newest first, optionally for one entity and within [start, end)."""
+    statement = select(AuditLog)
+    if entity is not None:
+        statement = statement.where(AuditLog.entity == entity)
+    if entity_id is not None:
+        statement = statement.where(AuditLog.entity_id == entity_id)
+    if start is not None:
+        statement = statement.where(AuditLog.timestamp >= start)
+    if end is not None:
+        statement = statement.where(AuditLog.timestamp < end)
+    return db.execute(seek(statement, [AuditLog.timestamp, AuditLog.id], page, descending=True)).scalars().all()
 
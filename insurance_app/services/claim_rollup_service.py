@@ -0,0 +1,78 @@
+from sqlalchemy import delete, func, select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+from insurance_app.models.claim import Claim, ClaimStatus
+from insurance_app.models.claim_rollup import ClaimsMonthlyRollup
+from insurance_app.models.policy import Policy
+from insurance_app.services.dashboard_service import BASE_CURRENCY, invalidate_analytics, month_bucket, policy_currency
+
+def claim_bucket(db: Session, claim):
+    # (month, status, currency, amount) a claim contributes to the rollup, or None if it has no date yet
+    if claim is None or claim.claim_date is None:
+        return None
+    status = claim.status or ClaimStatus.PENDING
+    currency = db.scalar(select(Policy.currency).where(Policy.id == claim.policy_id)) if claim.policy_id else None
+    return (
+        claim.claim_date.strftime("%Y-%m"),
+        getattr(status, "value", status),
+        currency or BASE_CURRENCY,
+        float(claim.claim_amount or 0),
+    )
+
+def _apply(db: Session, month: str, status: str, currency: str, count: int, amount: float):
+    dialect = db.get_bind().dialect.name
+    insert = postgresql.insert if dialect == "postgresql" else sqlite.insert
+    stmt = insert(ClaimsMonthlyRollup).values(
+        month=month, status=status, currency=currency, claim_count=count, total_amount=amount
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[ClaimsMonthlyRollup.month, ClaimsMonthlyRollup.status, ClaimsMonthlyRollup.currency],
+        set_={
+            "claim_count": ClaimsMonthlyRollup.claim_count + count,
+            "total_amount": ClaimsMonthlyRollup.total_amount + amount,
+        },
+    )
+    db.execute(stmt)
+
+def record_claim_change(db: Session, before, after):
+    # Move a claim's contribution from its old bucket to its new one; caller commits
+    if before == after:
+        return
+    if before is not None:
+        _apply(db, *before[:3], -1, -before[3])
+    if after is not None:
+        _apply(db, *after[:3], 1, after[3])
+
+def rebuild_rollup(db: Session):
+    month = month_bucket(db, Claim.claim_date).label("month")
+    currency = policy_currency()
+    rows = db.execute(
+        select(month, Claim.status, currency, func.count(Claim.id), func.coalesce(func.sum(Claim.claim_amount), 0))
+        .select_from(Claim)
+        .outerjoin(Policy, Claim.policy_id == Policy.id)
+        .where(Claim.claim_date.isnot(None))
+        .group_by(month, Claim.status, currency)
+    ).all()
+    buckets = {}
+    for row_month, row_status, row_currency, count, total in rows:
+        key = (row_month, (row_status or ClaimStatus.PENDING).value, row_currency)
+        claim_count, total_amount = buckets.get(key, (0, 0.0))
+        buckets[key] = (claim_count + count, total_amount + float(total))
+    db.execute(delete(ClaimsMonthlyRollup))
+    db.add_all(
+        ClaimsMonthlyRollup(month=month, status=status, currency=currency, claim_count=count, total_amount=total)
+        for (month, status, currency), (count, total) in buckets.items()
+    )
+    db.commit()
+    invalidate_analytics()
+    return len(buckets)
+
+if __name__ == "__main__":
+    from insurance_app.database import SessionLocal
+
+    db = SessionLocal()
+    try:
+        print(f"Rebuilt claims_monthly_rollup: {rebuild_rollup(db)} buckets.")
+    finally:
+        db.close()
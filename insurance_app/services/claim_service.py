@@ -1,30 +1,47 @@
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from fastapi import HTTPException, status
 
 from insurance_app import models, schemas
+from insurance_app.models.claim import Claim
+from insurance_app.services.fieldsets import fetch_all, select_fields
+from insurance_app.services.lookup import get_by_id, get_by_id_async
+from insurance_app.services.filtering import list_page
+from insurance_app.services.pagination import Page
+from insurance_app.services.claim_rollup_service import claim_bucket, record_claim_change
+from insurance_app.services.dashboard_service import invalidate_analytics
+from insurance_app.services.loss_ratio_rollup_service import paid_claim_buckets, record_loss_ratio_change
 
 def create_claim(db: Session, claim: schemas.claim_schema.ClaimCreate):
     db_claim = models.claim.Claim(**claim.dict())
     db.add(db_claim)
+    record_claim_change(db, None, claim_bucket(db, db_claim))
+    record_loss_ratio_change(db, {}, paid_claim_buckets(db, db_claim))
     db.commit()
+    invalidate_analytics()
     db.refresh(db_claim)
     return db_claim
 
-def get_all_claims(db: Session):
-    return db.query(models.claim.Claim).all()
+def get_all_claims(db: Session, page: Page, fields=None, listing=None):
+    return fetch_all(db.execute(list_page(select_fields(Claim, fields), Claim, page, listing)), fields)
 
-def get_claim_by_id(db: Session, claim_id: int):
-    return db.query(models.claim.Claim).filter(models.claim.Claim.id == claim_id).first()
+def get_claim_by_id(db: Session, claim_id: int, fields=None):
+    return get_by_id(db, Claim, claim_id, fields)
 
 def update_claim(db: Session, claim_id: int, claim_update: schemas.claim_schema.ClaimUpdate):
     db_claim = get_claim_by_id(db, claim_id)
     if not db_claim:
         raise HTTPException(status_code=404, detail="Claim not found")
 
+    before = claim_bucket(db, db_claim)
+    paid_before = paid_claim_buckets(db, db_claim)
     for key, value in claim_update.dict(exclude_unset=True).items():
         setattr(db_claim, key, value)
+    record_claim_change(db, before, claim_bucket(db, db_claim))
+    record_loss_ratio_change(db, paid_before, paid_claim_buckets(db, db_claim))
 
     db.commit()
+    invalidate_analytics()
     db.refresh(db_claim)
     return db_claim
 
@@ -33,8 +50,16 @@ def delete_claim(db: Session, claim_id: int):
     if not db_claim:
         raise HTTPException(status_code=404, detail="Claim not found")
 
+    record_claim_change(db, claim_bucket(db, db_claim), None)
+    record_loss_ratio_change(db, paid_claim_buckets(db, db_claim), {})
     db.delete(db_claim)
     db.commit()
+    invalidate_analytics()
 
+# Async read paths, used by the routers through get_async_db
 
+async def get_all_claims_async(db: AsyncSession, page: Page, fields=None, listing=None):
+    return fetch_all(await db.execute(list_page(select_fields(Claim, fields), Claim, page, listing)), fields)
 
+async def get_claim_by_id_async(db: AsyncSession, claim_id: int, fields=None):
+    return await get_by_id_async(db, Claim, claim_id, fields)
@@ -1,5 +1,8 @@
 from sqlalchemy.orm import Session
 from insurance_app.models.client import Client
+from insurance_app.services.fieldsets import fetch_all, select_fields
+from insurance_app.services.lookup import get_by_id
+from insurance_app.services.pagination import Page, paginate
 from insurance_app.schemas.client_schema import ClientCreate, ClientUpdate
 import uuid
 
@@ -21,11 +24,11 @@ class ClientService:
         self.db.refresh(client)
         return client
 
-    def get_all_clients(self):
-        return self.db.query(Client).all()
+    def get_all_clients(self, page: Page, fields=None):
+        return fetch_all(self.db.execute(paginate(select_fields(Client, fields), Client.id, page)), fields)
 
-    def get_client_by_id(self, client_id: uuid.UUID):
-        return self.db.query(Client).filter(Client.id == client_id).first()
+    def get_client_by_id(self, client_id: uuid.UUID, fields=None):
+        return get_by_id(self.db, Client, client_id, fields)
 
     def update_client(self, client_id: uuid.UUID, client_data: ClientUpdate):
         client = self.get_client_by_id(client_id)
@@ -2,6 +2,7 @@ from sqlalchemy.orm import Session
 from fastapi import HTTPException, status
 
 from insurance_app import models, schemas
+from insurance_app.services.lookup import get_by_id
 
 def create_commission(db: Session, commission: schemas.commission_schema.CommissionCreate):
     db_commission = models.commission.Commission(**commission.dict())
@@ -14,7 +15,7 @@ def get_all_commissions(db: Session):
     return db.query(models.commission.Commission).all()
 
 def get_commission_by_id(db: Session, commission_id: int):
-    return db.query(models.commission.Commission).filter(models.commission.Commission.id == commission_id).first()
+    return get_by_id(db, models.commission.Commission, commission_id)
 
 def update_commission(db: Session, commission_id: int, commission_update: schemas.commission_schema.CommissionUpdate):
     db_commission = get_commission_by_id(db, commission_id)
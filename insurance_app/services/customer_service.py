@@ -1,6 +1,12 @@
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from fastapi import HTTPException, status
 from insurance_app import models
+from insurance_app.models.customer import Customer
+from insurance_app.services.fieldsets import fetch_all, select_fields
+from insurance_app.services.lookup import get_by_id, get_by_id_async
+from insurance_app.services.filtering import list_page
+from insurance_app.services.pagination import Page
 from insurance_app.schemas.customer_schema import CustomerCreate, CustomerUpdate
 
 def create_customer(db: Session, customer: CustomerCreate):
@@ -10,17 +16,17 @@ def create_customer(db: Session, customer: CustomerCreate):
     db.refresh(db_customer)
     return db_customer
 
-def get_all_customers(db: Session):
-    return db.query(models.Customer).all()
+def get_all_customers(db: Session, page: Page, fields=None, listing=None):
+    return fetch_all(db.execute(list_page(select_fields(Customer, fields), Customer, page, listing)), fields)
 
-def get_customer_by_id(db: Session, customer_id: int):
-    customer = db.query(models.Customer).filter(models.Customer.id == customer_id).first()
+def get_customer_by_id(db: Session, customer_id: int, fields=None):
+    customer = get_by_id(db, Customer, customer_id, fields)
     if not customer:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Customer not found")
     return customer
 
 def update_customer(db: Session, customer_id: int, customer_data: CustomerUpdate):
-    customer = db.query(models.Customer).filter(models.Customer.id == customer_id).first()
+    customer = get_by_id(db, Customer, customer_id)
     if not customer:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Customer not found")
     for key, value in customer_data.dict(exclude_unset=True).items():
@@ -30,10 +36,19 @@ def update_customer(db: Session, customer_id: int, customer_data: CustomerUpdate
     return customer
 
 def delete_customer(db: Session, customer_id: int):
-    customer = db.query(models.Customer).filter(models.Customer.id == customer_id).first()
+    customer = get_by_id(db, Customer, customer_id)
     if not customer:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Customer not found")
     db.delete(customer)
     db.commit()
 
+# Async read paths, used by the routers through get_async_db
 
+async def get_all_customers_async(db: AsyncSession, page: Page, fields=None, listing=None):
+    return fetch_all(await db.execute(list_page(select_fields(Customer, fields), Customer, page, listing)), fields)
+
+async def get_customer_by_id_async(db: AsyncSession, customer_id: int, fields=None):
+    customer = await get_by_id_async(db, Customer, customer_id, fields)
+    if not customer:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Customer not found")
+    return customer
@@ -0,0 +1,288 @@
+import calendar
+import enum
+import os
+from datetime import date
+from typing import List, Optional
+
+from sqlalchemy import Integer, String, cast, func, literal, select
+from sqlalchemy.orm import Session
+
+from insurance_app.models.claim import Claim, ClaimStatus
+from insurance_app.models.claim_rollup import ClaimsMonthlyRollup
+from insurance_app.models.policy import Policy
+from insurance_app.models.product import Product
+from insurance_app.cache import TTLCache
+from insurance_app.database import READ_YOUR_WRITES_SECONDS, is_replica
+from insurance_app.services.exchange_rate_service import convert_amounts, require_rates
+
+BASE_CURRENCY = "LRD"  # Claims on policies without a currency are assumed to be in LRD
+
+class ClaimBreakdown(str, enum.Enum):
+    product = "product"
+    status = "status"
+    currency = "currency"
+    month = "month"
+    month_status = "month_status"
+
+# Grouping columns each breakdown needs from the single scan
+BREAKDOWN_DIMENSIONS = {
+    ClaimBreakdown.product: ("product_id",),
+    ClaimBreakdown.status: ("status",),
+    ClaimBreakdown.currency: ("currency",),
+    ClaimBreakdown.month: ("month",),
+    ClaimBreakdown.month_status: ("month", "status"),
+}
+
+# Keyed by report name, currency and filters; cleared whenever claims, premiums or rates are written
+analytics_cache = TTLCache(
+    "dashboard_analytics",
+    ttl=float(os.getenv("ANALYTICS_CACHE_TTL", 300)),
+    maxsize=int(os.getenv("ANALYTICS_CACHE_SIZE", 256)),
+)
+
+def invalidate_analytics():
+    analytics_cache.clear()
+
+def store_analytics(db: Session, key, value, generation):
+    # The replica may not have the write that just cleared the cache yet; what it returns is served but not cached,
+    # or the writer, pinned to the primary, would be served the pre-write report from the cache for the whole TTL
+    if is_replica(db) and analytics_cache.cleared_within(READ_YOUR_WRITES_SECONDS):
+        return
+    analytics_cache.set(key, value, generation)
+
+class ReportPeriod(str, enum.Enum):
+    month = "month"
+    quarter = "quarter"
+
+def _inline(value):
+    # Rendered into the SQL rather than bound: a bucket repeated in SELECT, GROUP BY and ORDER BY
+    # with a separate parameter each is a different expression to the planner, and sorts twice
+    return literal(value, literal_execute=True)
+
+def month_bucket(db: Session, column):
+    # Truncate a date column to a "YYYY-MM" string in whatever dialect the session is bound to
+    if db.get_bind().dialect.name == "postgresql":
+        return func.to_char(column, _inline("YYYY-MM"))
+    return func.strftime(_inline("%Y-%m"), column)
+
+def quarter_bucket(db: Session, column):
+    # "YYYY-Qn" in whatever dialect the session is bound to
+    if db.get_bind().dialect.name == "postgresql":
+        return func.to_char(column, _inline('YYYY-"Q"Q'))
+    quarter = (cast(func.strftime(_inline("%m"), column), Integer) + 2) // 3
+    return func.strftime(_inline("%Y"), column, type_=String) + _inline("-Q") + cast(quarter, String)
+
+def period_bucket(db: Session, column, period: ReportPeriod):
+    if period == ReportPeriod.quarter:
+        return quarter_bucket(db, column)
+    return month_bucket(db, column)
+
+def require_report_rates(db: Session, currency: str):
+    # Every currency a claims report can convert from, plus the one it converts to
+    policy_currencies = db.execute(select(Policy.currency).where(Policy.currency.isnot(None)).distinct()).scalars()
+    require_rates(db, {currency, BASE_CURRENCY, *policy_currencies})
+
+def policy_currency():
+    return func.coalesce(Policy.currency, _inline(BASE_CURRENCY)).label("currency")
+
+def mid_month(month: str) -> str:
+    # Monthly buckets are converted at the mid-month rate, a cheap stand-in for the month's average rate
+    return f"{month}-15"
+
+def mid_period(period: str) -> str:
+    # "YYYY-MM" or "YYYY-Qn"; quarters use the middle month of the quarter
+    if "-Q" in period:
+        year, quarter = period.split("-Q")
+        return f"{year}-{(int(quarter) - 1) * 3 + 2:02d}-15"
+    return mid_month(period)
+
+def is_month_range(date_from: Optional[date], date_to: Optional[date]) -> bool:
+    # The rollup only has monthly resolution, so it can answer ranges that start and end on month boundaries
+    if date_from and date_from.day != 1:
+        return False
+    if date_to and date_to.day != calendar.monthrange(date_to.year, date_to.month)[1]:
+        return False
+    return True
+
+def _claims_by_month_from_rollup(db: Session, date_from, date_to, status):
+    month = ClaimsMonthlyRollup.month
+    currency = ClaimsMonthlyRollup.currency
+    query = select(
+        month,
+        currency,
+        func.sum(ClaimsMonthlyRollup.claim_count).label("count"),
+        func.coalesce(func.sum(ClaimsMonthlyRollup.total_amount), 0).label("total_value"),
+    )
+    if date_from:
+        query = query.where(month >= date_from.strftime("%Y-%m"))
+    if date_to:
+        query = query.where(month <= date_to.strftime("%Y-%m"))
+    if status:
+        query = query.where(ClaimsMonthlyRollup.status == status.value)
+    # Ordered like the grouping, so the grouped rows need no second sort
+    query = query.group_by(month, currency).having(func.sum(ClaimsMonthlyRollup.claim_count) > 0).order_by(month, currency)
+    return db.execute(query.execution_options(yield_per=500))
+
+def _claims_by_month_from_claims(db: Session, date_from, date_to, status):
+    month = month_bucket(db, Claim.claim_date).label("month")
+    currency = policy_currency()
+    query = (
+        select(
+            month,
+            currency,
+            func.count(Claim.id).label("count"),
+            func.coalesce(func.sum(Claim.claim_amount), 0).label("total_value"),
+        )
+        .select_from(Claim)
+        .outerjoin(Policy, Claim.policy_id == Policy.id)
+        .where(Claim.claim_date.isnot(None))
+    )
+    if date_from:
+        query = query.where(Claim.claim_date >= date_from)
+    if date_to:
+        query = query.where(Claim.claim_date <= date_to)
+    if status:
+        query = query.where(Claim.status == status)
+    query = query.group_by(month, currency).order_by(month, currency)
+    return db.execute(query.execution_options(yield_per=500))
+
+def _fold_months(db: Session, rows, currency: str):
+    # Rows arrive ordered by month with one row per native currency; each fetched chunk is
+    # converted as one array and a month is yielded once the next month starts
+    pending = None
+    for chunk in rows.partitions():
+        amounts = convert_amounts(
+            db,
+            [row.total_value for row in chunk],
+            [row.currency for row in chunk],
+            [mid_month(row.month) for row in chunk],
+            currency,
+        )
+        for row, amount in zip(chunk, amounts):
+            if pending is None or pending["month"] != row.month:
+                if pending is not None:
+                    yield pending
+                pending = {"month": row.month, "count": 0, "total_value": 0.0}
+            pending["count"] += row.count
+            pending["total_value"] += float(amount)
+    if pending is not None:
+        yield pending
+
+def iter_claims_by_month(
+    db: Session,
+    currency: str = "LRD",
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    status: Optional[ClaimStatus] = None,
+):
+    key = ("claims_by_month", currency, date_from, date_to, status)
+    cached = analytics_cache.get(key)
+    if cached is not None:
+        yield from cached
+        return
+
+    generation = analytics_cache.generation
+    if is_month_range(date_from, date_to):
+        rows = _claims_by_month_from_rollup(db, date_from, date_to, status)
+    else:
+        rows = _claims_by_month_from_claims(db, date_from, date_to, status)
+
+    computed = []
+    for item in _fold_months(db, rows, currency):
+        computed.append(item)
+        yield item
+    store_analytics(db, key, computed, generation)
+
+def claims_by_month(
+    db: Session,
+    currency: str = "LRD",
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    status: Optional[ClaimStatus] = None,
+):
+    return list(iter_claims_by_month(db, currency, date_from, date_to, status))
+
+def _claims_grouped_by(db: Session, dimensions, date_from, date_to, status):
+    # One grouped query at the finest grain the requested breakdowns need; month and currency are
+    # always kept so amounts can be converted at historical rates before they are summed
+    columns = {
+        "product_id": Product.id.label("product_id"),
+        "status": Claim.status.label("status"),
+        "month": month_bucket(db, Claim.claim_date).label("month"),
+    }
+    group_columns = [columns[name] for name in sorted(dimensions | {"month"}) if name in columns]
+    if "product_id" in dimensions:
+        # Grouped by id, so products sharing a name stay apart; the name is only their label
+        group_columns.append(func.coalesce(Product.name, "Unassigned").label("product"))
+    group_columns.append(policy_currency())
+
+    query = (
+        select(
+            *group_columns,
+            func.count(Claim.id).label("count"),
+            func.coalesce(func.sum(Claim.claim_amount), 0).label("total_value"),
+        )
+        .select_from(Claim)
+        .outerjoin(Policy, Claim.policy_id == Policy.id)
+        .where(Claim.claim_date.isnot(None))
+    )
+    if "product_id" in dimensions:
+        query = query.outerjoin(Product, Policy.product_id == Product.id)
+    if date_from:
+        query = query.where(Claim.claim_date >= date_from)
+    if date_to:
+        query = query.where(Claim.claim_date <= date_to)
+    if status:
+        query = query.where(Claim.status == status)
+    return db.execute(query.group_by(*group_columns)).mappings().all()
+
+def claims_breakdown(
+    db: Session,
+    breakdowns: List[ClaimBreakdown],
+    currency: str = "LRD",
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    status: Optional[ClaimStatus] = None,
+):
+    breakdowns = sorted(set(breakdowns), key=lambda breakdown: breakdown.value)
+    key = ("claims_breakdown", tuple(breakdowns), currency, date_from, date_to, status)
+    cached = analytics_cache.get(key)
+    if cached is not None:
+        return cached
+
+    generation = analytics_cache.generation
+    dimensions = {name for breakdown in breakdowns for name in BREAKDOWN_DIMENSIONS[breakdown]}
+    rows = _claims_grouped_by(db, dimensions, date_from, date_to, status)
+    amounts = convert_amounts(
+        db,
+        [row["total_value"] for row in rows],
+        [row["currency"] for row in rows],
+        [mid_month(row["month"]) for row in rows],
+        currency,
+    )
+
+    product_names = {row["product_id"]: row["product"] for row in rows} if "product_id" in dimensions else {}
+
+    def labels(name, value):
+        # Products sort by name, then id
+        if name == "product_id":
+            return {"product": product_names[value], "product_id": str(value) if value is not None else None}
+        return {name: value}
+
+    result = {}
+    for breakdown in breakdowns:
+        names = BREAKDOWN_DIMENSIONS[breakdown]
+        buckets = {}
+        for row, amount in zip(rows, amounts):
+            bucket_key = tuple(getattr(row[name], "value", row[name]) for name in names)
+            count, total = buckets.get(bucket_key, (0, 0.0))
+            buckets[bucket_key] = (count + row["count"], total + float(amount))
+        entries = []
+        for bucket_key, (count, total) in buckets.items():
+            entry = {}
+            for name, part in zip(names, bucket_key):
+                entry.update(labels(name, part))
+            entries.append((tuple(str(value) for value in entry.values()), {**entry, "count": count, "total_value": total}))
+        result[breakdown.value] = [entry for _, entry in sorted(entries, key=lambda item: item[0])]
+    store_analytics(db, key, result, generation)
+    return result
@@ -3,6 +3,9 @@ from fastapi import HTTPException, status
 import os
 
 from insurance_app import models, schemas
+from insurance_app.services.fieldsets import fetch_all, select_fields
+from insurance_app.services.lookup import get_by_id
+from insurance_app.services.pagination import Page, paginate
 
 def create_document(db: Session, document: schemas.document_schema.DocumentCreate):
     db_document = models.document.Document(**document.dict())
@@ -11,11 +14,12 @@ def create_document(db: Session, document: schemas.document_schema.DocumentCreat
     db.refresh(db_document)
     return db_document
 
-def get_all_documents(db: Session):
-    return db.query(models.document.Document).all()
+def get_all_documents(db: Session, page: Page, fields=None):
+    Document = models.document.Document
+    return fetch_all(db.execute(paginate(select_fields(Document, fields), Document.id, page)), fields)
 
-def get_document_by_id(db: Session, document_id: int):
-    return db.query(models.document.Document).filter(models.document.Document.id == document_id).first()
+def get_document_by_id(db: Session, document_id: int, fields=None):
+    return get_by_id(db, models.document.Document, document_id, fields)
 
 def delete_document(db: Session, document_id: int):
     db_document = get_document_by_id(db, document_id)
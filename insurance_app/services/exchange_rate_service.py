@@ -0,0 +1,129 @@
+import csv
+import io
+import os
+from datetime import date
+from typing import List, Optional
+
+import numpy as np
+from fastapi import HTTPException, status
+from sqlalchemy import select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+from insurance_app.cache import TTLCache
+from insurance_app.models.exchange_rate import ExchangeRate
+from insurance_app.schemas.exchange_rate_schema import ExchangeRateCreate
+
+# Used only for currencies that have no rows in exchange_rates yet
+FALLBACK_USD_RATES = {
+    "USD": 1.0,
+    "LRD": float(os.getenv("LRD_TO_USD", 0.005)),
+}
+
+class MissingRateError(LookupError):
+    """No rate is known for a currency, so amounts cannot be converted to or from it."""
+
+    def __init__(self, currency: str):
+        super().__init__(f"No exchange rates for {currency}")
+        self.currency = currency
+
+# The whole rate table as {currency: (dates, usd_rates)} numpy arrays, refreshed after writes or TTL
+rate_cache = TTLCache("exchange_rates", ttl=float(os.getenv("RATE_CACHE_TTL", 600)), maxsize=1)
+
+def _rate_series(db: Session) -> dict:
+    series = rate_cache.get("series")
+    if series is not None:
+        return series
+    generation = rate_cache.generation
+    rows = db.execute(
+        select(ExchangeRate.currency, ExchangeRate.rate_date, ExchangeRate.usd_rate)
+        .order_by(ExchangeRate.currency, ExchangeRate.rate_date)
+    ).all()
+    grouped = {}
+    for currency, rate_date, usd_rate in rows:
+        dates, rates = grouped.setdefault(currency.upper(), ([], []))
+        dates.append(rate_date)
+        rates.append(usd_rate)
+    series = {
+        currency: (np.array(dates, dtype="datetime64[D]"), np.array(rates, dtype=float))
+        for currency, (dates, rates) in grouped.items()
+    }
+    rate_cache.set("series", series, generation)
+    return series
+
+def usd_rates(db: Session, currency: str, dates) -> np.ndarray:
+    """Rate in effect on each date (the latest one on or before it) for one currency."""
+    dates = np.asarray(dates, dtype="datetime64[D]")
+    currency = (currency or "").upper()
+    if currency == "USD":
+        return np.ones(len(dates))
+    series = _rate_series(db).get(currency)
+    if series is None:
+        if currency not in FALLBACK_USD_RATES:
+            raise MissingRateError(currency)
+        return np.full(len(dates), FALLBACK_USD_RATES[currency])
+    rate_dates, rates = series
+    # Dates before the first known rate use the earliest rate rather than failing
+    index = np.clip(np.searchsorted(rate_dates, dates, side="right") - 1, 0, len(rates) - 1)
+    return rates[index]
+
+def convert_amounts(db: Session, amounts, currencies, dates, to_currency: str) -> np.ndarray:
+    """Convert amounts held in mixed currencies to to_currency at the rates in effect on their dates."""
+    amounts = np.asarray(amounts, dtype=float)
+    currencies = np.asarray([(currency or "").upper() for currency in currencies], dtype=object)
+    dates = np.asarray(dates, dtype="datetime64[D]")
+    in_usd = np.empty_like(amounts)
+    for currency in np.unique(currencies):
+        mask = currencies == currency
+        in_usd[mask] = amounts[mask] * usd_rates(db, currency, dates[mask])
+    return in_usd / usd_rates(db, to_currency, dates)
+
+def require_rates(db: Session, currencies):
+    """Raise MissingRateError for the first currency that cannot be converted.
+
+    Lets a streamed report fail before its response starts rather than part-way through it.
+    """
+    for currency in currencies:
+        usd_rates(db, currency, [])
+
+def get_rates(db: Session, currency: Optional[str] = None, date_from: Optional[date] = None, date_to: Optional[date] = None):
+    query = select(ExchangeRate)
+    if currency:
+        query = query.where(ExchangeRate.currency == currency.upper())
+    if date_from:
+        query = query.where(ExchangeRate.rate_date >= date_from)
+    if date_to:
+        query = query.where(ExchangeRate.rate_date <= date_to)
+    return db.execute(query.order_by(ExchangeRate.currency, ExchangeRate.rate_date)).scalars().all()
+
+def save_rates(db: Session, rates: List[ExchangeRateCreate]) -> int:
+    """Insert or overwrite rates in one statement per batch, then drop the cached series."""
+    if not rates:
+        return 0
+    dialect = db.get_bind().dialect.name
+    insert = postgresql.insert if dialect == "postgresql" else sqlite.insert
+    values = [
+        {"currency": rate.currency.upper(), "rate_date": rate.rate_date, "usd_rate": rate.usd_rate}
+        for rate in rates
+    ]
+    for start in range(0, len(values), 1000):
+        stmt = insert(ExchangeRate).values(values[start:start + 1000])
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[ExchangeRate.currency, ExchangeRate.rate_date],
+            set_={"usd_rate": stmt.excluded.usd_rate},
+        )
+        db.execute(stmt)
+    db.commit()
+    rate_cache.clear()
+    return len(values)
+
+def parse_rate_file(content: bytes) -> List[ExchangeRateCreate]:
+    # CSV with a header row: currency,rate_date,usd_rate (rate_date as YYYY-MM-DD)
+    reader = csv.DictReader(io.StringIO(content.decode("utf-8-sig")))
+    missing = {"currency", "rate_date", "usd_rate"} - set(reader.fieldnames or [])
+    if missing:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Rate file is missing columns: {', '.join(sorted(missing))}")
+    try:
+        return [ExchangeRateCreate(**row) for row in reader]
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Invalid rate file: {e}")
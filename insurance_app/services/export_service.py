@@ -0,0 +1,101 @@
+import csv
+import enum
+import io
+import json
+import os
+import tempfile
+import uuid
+from datetime import date, datetime
+from decimal import Decimal
+
+from fastapi import HTTPException, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from insurance_app.concurrency import iterate_export
+
+# Rows fetched per round trip; also the most rows held in memory at once
+EXPORT_CHUNK_SIZE = int(os.getenv("EXPORT_CHUNK_SIZE", 1000))
+
+class ExportFormat(str, enum.Enum):
+    csv = "csv"
+    ndjson = "ndjson"
+    xlsx = "xlsx"
+
+MEDIA_TYPES = {
+    ExportFormat.csv: "text/csv",
+    ExportFormat.ndjson: "application/x-ndjson",
+    ExportFormat.xlsx: "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+}
+
+def _plain(value):
+    if isinstance(value, enum.Enum):
+        return value.value
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, uuid.UUID):
+        return str(value)
+    return value
+
+def iter_chunks(db: Session, model, chunk_size: int = EXPORT_CHUNK_SIZE):
+    # Server-side cursor on Postgres; yield_per keeps only one chunk of tuples buffered
+    columns = list(model.__table__.columns)
+    query = select(*columns).order_by(*model.__table__.primary_key.columns)
+    result = db.execute(query.execution_options(stream_results=True, yield_per=chunk_size))
+    for chunk in result.partitions():
+        yield [[_plain(value) for value in row] for row in chunk]
+
+def stream_csv(header, chunks):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(header)
+    for chunk in chunks:
+        writer.writerows(chunk)
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue()
+
+def stream_ndjson(header, chunks):
+    for chunk in chunks:
+        yield "".join(json.dumps(dict(zip(header, row))) + "\n" for row in chunk)
+
+def stream_xlsx(header, chunks, sheet_title: str = "Export"):
+    # openpyxl's write-only mode spools rows to disk, so only the finished file is read back
+    from openpyxl import Workbook
+
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet(title=sheet_title[:31])
+    sheet.append(header)
+    for chunk in chunks:
+        for row in chunk:
+            sheet.append(row)
+    with tempfile.TemporaryFile() as spool:
+        workbook.save(spool)
+        spool.seek(0)
+        while True:
+            data = spool.read(64 * 1024)
+            if not data:
+                break
+            yield data
+
+def export_response(db: Session, model, export_format: ExportFormat, filename: str) -> StreamingResponse:
+    if export_format not in MEDIA_TYPES:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Unsupported export format")
+    header = [column.name for column in model.__table__.columns]
+    chunks = iter_chunks(db, model)
+    if export_format == ExportFormat.csv:
+        body = stream_csv(header, chunks)
+    elif export_format == ExportFormat.ndjson:
+        body = stream_ndjson(header, chunks)
+    else:
+        body = stream_xlsx(header, chunks, sheet_title=filename)
+    return StreamingResponse(
+        iterate_export(body),
+        media_type=MEDIA_TYPES[export_format],
+        headers={"Content-Disposition": f"attachment; filename={filename}.{export_format.value}"},
+    )
@@ -0,0 +1,46 @@
+from typing import Optional
+
+from fastapi import Depends, HTTPException, Query, Response, status
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from sqlalchemy import select
+
+def fieldset(model, schema):
+    """Dependency for ?fields=a,b on a list or detail route: the model columns to load, or None for all.
+
+    Only columns that the route's response schema also exposes can be picked; id is
+    always loaded because it keys the rows and the pagination cursor.
+    """
+    allowed = {name: getattr(model, name) for name in model.__table__.columns.keys() if name in schema.model_fields}
+
+    def parse_fields(fields: Optional[str] = Query(None, description=f"Comma-separated subset of: {', '.join(allowed)}")):
+        if fields is None:
+            return None
+        names = list(dict.fromkeys(name.strip() for name in fields.split(",") if name.strip()))
+        unknown = [name for name in names if name not in allowed]
+        if unknown or not names:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Unknown field(s) {', '.join(unknown) or '(none given)'}; choose from {', '.join(allowed)}",
+            )
+        return tuple([allowed["id"]] + [allowed[name] for name in names if name != "id"])
+
+    return Depends(parse_fields)
+
+def select_fields(model, columns: Optional[tuple]):
+    return select(model) if columns is None else select(*columns)
+
+def fetch_all(result, columns: Optional[tuple]) -> list:
+    # Entities for a full fetch, plain rows of just the loaded columns for a sparse one
+    return result.scalars().all() if columns is None else result.all()
+
+def render_fields(rows, columns: Optional[tuple], response: Optional[Response] = None):
+    """What a route returns: full entities go through its response_model, sparse rows are sent as they are.
+
+    A sparse row lacks the schema's other required fields, so it bypasses the
+    response_model; headers already set on the route's Response are carried over.
+    """
+    if columns is None:
+        return rows
+    content = [row._asdict() for row in rows] if isinstance(rows, list) else rows._asdict()
+    return JSONResponse(jsonable_encoder(content), headers=response.headers if response is not None else None)
@@ -0,0 +1,105 @@
+import operator
+from typing import List, Optional
+
+from fastapi import Depends, HTTPException, Query, status
+
+from insurance_app.services.pagination import Page, paginate, parse_value, seek
+
+# ?filter=column:operator:value; "in" takes a comma-separated list
+OPERATORS = {
+    "eq": operator.eq,
+    "gt": operator.gt,
+    "gte": operator.ge,
+    "lt": operator.lt,
+    "lte": operator.le,
+    "in": lambda column, values: column.in_(values),
+}
+EQUALITY = ("eq", "in")
+RANGE = ("eq", "gt", "gte", "lt", "lte")
+
+def _leads_an_index(column) -> bool:
+    if column.primary_key or column.index or column.unique:
+        return True
+    return any(list(index.columns)[0] is column for index in column.table.indexes)
+
+class Listing:
+    """Parsed ?filter= and ?sort= for one list request."""
+
+    def __init__(self, model, conditions=(), sort=None, descending: bool = False):
+        self.model = model
+        self.conditions = list(conditions)
+        self.sort = sort
+        self.descending = descending
+
+    @property
+    def key_columns(self) -> list:
+        # The primary key breaks ties, so the keyset order is unique
+        return [self.model.id] if self.sort is None else [self.sort, self.model.id]
+
+    def cursor_key(self, row) -> list:
+        return [getattr(row, column.key) for column in self.key_columns]
+
+    def apply(self, statement, page: Page):
+        if self.conditions:
+            statement = statement.where(*self.conditions)
+        if self.sort is not None and self.sort.key not in statement.selected_columns.keys():
+            # A ?fields= selection without the sort column: the cursor still needs it
+            statement = statement.add_columns(self.sort)
+        return seek(statement, self.key_columns, page, self.descending)
+
+def list_page(statement, model, page: Page, listing: Optional[Listing] = None):
+    """statement filtered, sorted and keyset-paged by listing, or paged on the primary key without one."""
+    return paginate(statement, model.id, page) if listing is None else listing.apply(statement, page)
+
+def listing_params(model, filters: dict, sorts=()):
+    """Dependency for ?filter= and ?sort=[-]column on a list route.
+
+    filters maps each filterable column to its operators (EQUALITY or RANGE) and
+    sorts names the sortable columns. Every one must lead an index, so a request can
+    only pick an indexed access path; sort columns must also be NOT NULL, since the
+    keyset comparison skips NULLs.
+    """
+    columns = model.__table__.c
+    for name in [*filters, *sorts]:
+        if not _leads_an_index(columns[name]):
+            raise ValueError(f"{model.__name__}.{name} leads no index and cannot be filtered or sorted on")
+    for name in sorts:
+        if columns[name].nullable:
+            raise ValueError(f"{model.__name__}.{name} is nullable and cannot be sorted on")
+
+    def parse_listing(
+        filter: List[str] = Query([], description=f"column:operator:value on {', '.join(filters)}"),
+        sort: Optional[str] = Query(None, description=f"One of {', '.join(['id', *sorts])}; prefix with - for descending"),
+    ):
+        conditions = [_condition(model, filters, expression) for expression in filter]
+        if sort is None:
+            return Listing(model, conditions)
+        name = sort.lstrip("-")
+        if name != "id" and name not in sorts:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Cannot sort on {name}; choose from {', '.join(['id', *sorts])}",
+            )
+        return Listing(model, conditions, None if name == "id" else getattr(model, name), sort.startswith("-"))
+
+    return Depends(parse_listing)
+
+def _condition(model, filters: dict, expression: str):
+    name, _, rest = expression.partition(":")
+    op, _, value = rest.partition(":")
+    if name not in filters:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Cannot filter on {name}; choose from {', '.join(filters)}",
+        )
+    if op not in filters[name]:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"{name} supports {', '.join(filters[name])}, not {op or '(none)'}",
+        )
+    column = model.__table__.c[name]
+    try:
+        values = [parse_value(column, item) for item in value.split(",")] if op == "in" else parse_value(column, value)
+    except (ValueError, TypeError, LookupError):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Invalid value for {name}: {value}")
+    return OPERATORS[op](getattr(model, name), values)
@@ -1,6 +1,11 @@
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import select
 from sqlalchemy.orm import Session
 from insurance_app.models.ledger import LedgerEntry
 from insurance_app.schemas.ledger_schema import LedgerEntryCreate
+from insurance_app.services.pagination import Page, seek
 
 def create_ledger_entry(db: Session, entry_data: LedgerEntryCreate) -> LedgerEntry:
     entry = LedgerEntry(**entry_data.dict())
@@ -9,6 +14,20 @@ def create_ledger_entry(db: Session, entry_data: LedgerEntryCreate) -> LedgerEnt
     db.refresh(entry)
     return entry
 
-def get_ledger_entries(db: Session, skip: int = 0, limit: int = 100):
-    return db.query(LedgerEntry).offset(skip).limit(limit).all()
+def get_ledger_entries(
+    db: Session,
+    page: Page,
+    account: Optional[str] = None,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+):
+    """Entries oldest first, optionally for one account and within [start, end)."""
+    statement = select(LedgerEntry)
+    if account is not None:
+        statement = statement.where(LedgerEntry.account == account)
+    if start is not None:
+        statement = statement.where(LedgerEntry.timestamp >= start)
+    if end is not None:
+        statement = statement.where(LedgerEntry.timestamp < end)
+    return db.execute(seek(statement, [LedgerEntry.timestamp, LedgerEntry.id], page)).scalars().all()
 
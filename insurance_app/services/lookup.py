@@ -0,0 +1,23 @@
+import functools
+
+from sqlalchemy import bindparam, select
+
+@functools.lru_cache(maxsize=1024)
+def by_id_statement(model, columns=None):
+    # Built once per model (and per ?fields= selection): its cache key is memoized on the statement, so every
+    # call after the first goes straight to the engine's compiled cache (query_cache_size) and only rebinds :ident
+    return (select(model) if columns is None else select(*columns)).where(model.id == bindparam("ident"))
+
+def get_by_id(db, model, ident, columns=None):
+    """model with primary key ident, or None; the hot path behind every get/update/delete by id.
+
+    With columns (a fieldset() tuple) only those are loaded and a plain row is returned.
+    """
+    result = db.execute(by_id_statement(model, columns), {"ident": ident})
+    return result.scalars().first() if columns is None else result.first()
+
+async def get_by_id_async(db, model, ident, columns=None):
+    if columns is None:
+        # The session's identity map can answer this without a query
+        return await db.get(model, ident)
+    return (await db.execute(by_id_statement(model, columns), {"ident": ident})).first()
@@ -0,0 +1,125 @@
+from sqlalchemy import delete, func, select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+from insurance_app.models.claim import Claim, ClaimStatus
+from insurance_app.models.loss_ratio_rollup import LossRatioMonthlyRollup
+from insurance_app.models.policy import Policy
+from insurance_app.models.premium import Premium
+from insurance_app.services.dashboard_service import invalidate_analytics, month_bucket, policy_currency
+
+# Buckets are {(month, product_id, currency): (premium_count, premiums_earned, claim_count, claims_paid)}
+EMPTY = (0, 0.0, 0, 0.0)
+
+def _policy(db: Session, policy_id):
+    return db.execute(select(Policy.product_id, policy_currency()).where(Policy.id == policy_id)).first()
+
+def premium_buckets(db: Session, premium):
+    # What a premium adds to premiums earned: nothing until some of it is paid
+    if premium is None or not premium.amount_paid or premium.amount_paid <= 0:
+        return {}
+    earned_on = premium.payment_date or premium.due_date
+    policy = _policy(db, premium.policy_id) if premium.policy_id else None
+    if earned_on is None or policy is None:
+        return {}
+    return {(earned_on.strftime("%Y-%m"), policy.product_id, policy.currency): (1, float(premium.amount_paid), 0, 0.0)}
+
+def paid_claim_buckets(db: Session, claim):
+    # What a claim adds to claims paid: nothing unless it is PAID
+    if claim is None or claim.claim_date is None or getattr(claim.status, "value", claim.status) != ClaimStatus.PAID.value:
+        return {}
+    policy = _policy(db, claim.policy_id) if claim.policy_id else None
+    if policy is None:
+        return {}
+    return {(claim.claim_date.strftime("%Y-%m"), policy.product_id, policy.currency): (0, 0.0, 1, float(claim.claim_amount or 0))}
+
+def _grouped(db: Session, *conditions):
+    earned_on = func.coalesce(Premium.payment_date, Premium.due_date)
+    premium_month = month_bucket(db, earned_on).label("month")
+    claim_month = month_bucket(db, Claim.claim_date).label("month")
+    currency = policy_currency()
+    premiums = db.execute(
+        select(premium_month, Policy.product_id, currency, func.count(Premium.id), func.sum(Premium.amount_paid))
+        .select_from(Premium)
+        .join(Policy, Premium.policy_id == Policy.id)
+        .where(Premium.amount_paid > 0, *conditions)
+        .group_by(premium_month, Policy.product_id, currency)
+    ).all()
+    claims = db.execute(
+        select(claim_month, Policy.product_id, currency, func.count(Claim.id), func.coalesce(func.sum(Claim.claim_amount), 0))
+        .select_from(Claim)
+        .join(Policy, Claim.policy_id == Policy.id)
+        .where(Claim.status == ClaimStatus.PAID, Claim.claim_date.isnot(None), *conditions)
+        .group_by(claim_month, Policy.product_id, currency)
+    ).all()
+    buckets = {}
+    for month, product_id, row_currency, count, amount in premiums:
+        buckets[(month, product_id, row_currency)] = (count, float(amount), 0, 0.0)
+    for month, product_id, row_currency, count, amount in claims:
+        premium_count, earned = buckets.get((month, product_id, row_currency), EMPTY)[:2]
+        buckets[(month, product_id, row_currency)] = (premium_count, earned, count, float(amount))
+    return buckets
+
+def policy_buckets(db: Session, policy_id):
+    # Everything one policy contributes, taken out of the rollup when the policy is deleted
+    return _grouped(db, Policy.id == policy_id)
+
+def _apply(db: Session, month: str, product_id, currency: str, premium_count: int, earned: float, claim_count: int, paid: float):
+    dialect = db.get_bind().dialect.name
+    insert = postgresql.insert if dialect == "postgresql" else sqlite.insert
+    stmt = insert(LossRatioMonthlyRollup).values(
+        month=month,
+        product_id=product_id,
+        currency=currency,
+        premium_count=premium_count,
+        premiums_earned=earned,
+        claim_count=claim_count,
+        claims_paid=paid,
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[LossRatioMonthlyRollup.month, LossRatioMonthlyRollup.product_id, LossRatioMonthlyRollup.currency],
+        set_={
+            "premium_count": LossRatioMonthlyRollup.premium_count + premium_count,
+            "premiums_earned": LossRatioMonthlyRollup.premiums_earned + earned,
+            "claim_count": LossRatioMonthlyRollup.claim_count + claim_count,
+            "claims_paid": LossRatioMonthlyRollup.claims_paid + paid,
+        },
+    )
+    db.execute(stmt)
+
+def record_loss_ratio_change(db: Session, before, after):
+    # Move contributions from the buckets they were in to the ones they are in now; caller commits
+    if before == after:
+        return
+    for key, values in before.items():
+        _apply(db, *key, *(-value for value in values))
+    for key, values in after.items():
+        _apply(db, *key, *values)
+
+def rebuild_rollup(db: Session):
+    buckets = _grouped(db)
+    db.execute(delete(LossRatioMonthlyRollup))
+    db.add_all(
+        LossRatioMonthlyRollup(
+            month=month,
+            product_id=product_id,
+            currency=currency,
+            premium_count=premium_count,
+            premiums_earned=earned,
+            claim_count=claim_count,
+            claims_paid=paid,
+        )
+        for (month, product_id, currency), (premium_count, earned, claim_count, paid) in buckets.items()
+    )
+    db.commit()
+    invalidate_analytics()
+    return len(buckets)
+
+if __name__ == "__main__":
+    from insurance_app.database import SessionLocal
+
+    db = SessionLocal()
+    try:
+        print(f"Rebuilt loss_ratio_monthly_rollup: {rebuild_rollup(db)} buckets.")
+    finally:
+        db.close()
@@ -0,0 +1,147 @@
+from collections import namedtuple
+from datetime import date
+from typing import Optional
+
+import numpy as np
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from insurance_app.models.claim import Claim, ClaimStatus
+from insurance_app.models.loss_ratio_rollup import LossRatioMonthlyRollup
+from insurance_app.models.policy import Policy
+from insurance_app.models.premium import Premium
+from insurance_app.models.product import Product
+from insurance_app.services.dashboard_service import (
+    ReportPeriod,
+    analytics_cache,
+    is_month_range,
+    mid_period,
+    period_bucket,
+    policy_currency,
+    store_analytics,
+)
+from insurance_app.services.exchange_rate_service import convert_amounts
+
+# Same shape as the grouped rows of the live queries
+Bucket = namedtuple("Bucket", "product_id period currency amount")
+
+def _premiums_earned(db: Session, period: ReportPeriod, date_from, date_to, product_id):
+    # Premium counts as earned on the date it was paid, or its due date if no payment date was recorded
+    earned_on = func.coalesce(Premium.payment_date, Premium.due_date)
+    bucket = period_bucket(db, earned_on, period).label("period")
+    currency = policy_currency()
+    query = (
+        select(Policy.product_id, bucket, currency, func.sum(Premium.amount_paid).label("amount"))
+        .select_from(Premium)
+        .join(Policy, Premium.policy_id == Policy.id)
+        .where(Premium.amount_paid > 0)
+    )
+    if date_from:
+        query = query.where(earned_on >= date_from)
+    if date_to:
+        query = query.where(earned_on <= date_to)
+    if product_id:
+        query = query.where(Policy.product_id == product_id)
+    return db.execute(query.group_by(Policy.product_id, bucket, currency)).all()
+
+def _claims_paid(db: Session, period: ReportPeriod, date_from, date_to, product_id):
+    bucket = period_bucket(db, Claim.claim_date, period).label("period")
+    currency = policy_currency()
+    query = (
+        select(Policy.product_id, bucket, currency, func.sum(Claim.claim_amount).label("amount"))
+        .select_from(Claim)
+        .join(Policy, Claim.policy_id == Policy.id)
+        .where(Claim.status == ClaimStatus.PAID)
+    )
+    if date_from:
+        query = query.where(Claim.claim_date >= date_from)
+    if date_to:
+        query = query.where(Claim.claim_date <= date_to)
+    if product_id:
+        query = query.where(Policy.product_id == product_id)
+    return db.execute(query.group_by(Policy.product_id, bucket, currency)).all()
+
+def _quarter(month: str) -> str:
+    year, number = month.split("-")
+    return f"{year}-Q{(int(number) + 2) // 3}"
+
+def _from_rollup(db: Session, period: ReportPeriod, date_from, date_to, product_id):
+    # One row per month, product and currency, however many premiums and claims are behind it
+    rollup = LossRatioMonthlyRollup
+    query = select(
+        rollup.month, rollup.product_id, rollup.currency,
+        rollup.premium_count, rollup.premiums_earned, rollup.claim_count, rollup.claims_paid,
+    )
+    if date_from:
+        query = query.where(rollup.month >= date_from.strftime("%Y-%m"))
+    if date_to:
+        query = query.where(rollup.month <= date_to.strftime("%Y-%m"))
+    if product_id:
+        query = query.where(rollup.product_id == product_id)
+    premiums, claims = [], []
+    for row in db.execute(query):
+        bucket = _quarter(row.month) if period == ReportPeriod.quarter else row.month
+        if row.premium_count > 0:
+            premiums.append(Bucket(row.product_id, bucket, row.currency, row.premiums_earned))
+        if row.claim_count > 0:
+            claims.append(Bucket(row.product_id, bucket, row.currency, row.claims_paid))
+    return premiums, claims
+
+def _to_currency(db: Session, rows, currency: str) -> np.ndarray:
+    if not rows:
+        return np.zeros(0)
+    return convert_amounts(
+        db,
+        [row.amount or 0 for row in rows],
+        [row.currency for row in rows],
+        [mid_period(row.period) for row in rows],
+        currency,
+    )
+
+def loss_ratios(
+    db: Session,
+    period: ReportPeriod = ReportPeriod.month,
+    currency: str = "LRD",
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+    product_id=None,
+):
+    """Claims paid over premiums earned per product and period, in the reporting currency."""
+    key = ("loss_ratios", period, currency, date_from, date_to, product_id)
+    cached = analytics_cache.get(key)
+    if cached is not None:
+        return cached
+
+    generation = analytics_cache.generation
+    if is_month_range(date_from, date_to):
+        premiums, claims = _from_rollup(db, period, date_from, date_to, product_id)
+    else:
+        premiums = _premiums_earned(db, period, date_from, date_to, product_id)
+        claims = _claims_paid(db, period, date_from, date_to, product_id)
+
+    # Both grouped result sets are reduced onto one (product, period) index with bincount
+    keys = [(row.product_id, row.period) for row in premiums] + [(row.product_id, row.period) for row in claims]
+    if not keys:
+        store_analytics(db, key, [], generation)
+        return []
+    labels = {}
+    index = np.array([labels.setdefault(item, len(labels)) for item in keys])
+    size = len(labels)
+    earned = np.bincount(index[:len(premiums)], weights=_to_currency(db, premiums, currency), minlength=size)
+    paid = np.bincount(index[len(premiums):], weights=_to_currency(db, claims, currency), minlength=size)
+    ratio = np.divide(paid, earned, out=np.full(size, np.nan), where=earned > 0)
+
+    product_names = dict(db.execute(select(Product.id, Product.name)).all())
+    result = [
+        {
+            "product_id": str(product) if product is not None else None,
+            "product": product_names.get(product, "Unassigned"),
+            "period": bucket,
+            "premiums_earned": float(earned[position]),
+            "claims_paid": float(paid[position]),
+            "loss_ratio": None if np.isnan(ratio[position]) else float(ratio[position]),
+        }
+        for (product, bucket), position in sorted(labels.items(), key=lambda item: (str(item[0][1]), str(item[0][0])))
+    ]
+    store_analytics(db, key, result, generation)
+    return result
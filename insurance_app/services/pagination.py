@@ -0,0 +1,71 @@
+import base64
+import json
+import os
+from datetime import date, datetime
+from typing import Optional
+
+from fastapi import HTTPException, Query, Response, status
+from sqlalchemy import literal, tuple_
+
+DEFAULT_PAGE_SIZE = int(os.getenv("DEFAULT_PAGE_SIZE", 50))
+MAX_PAGE_SIZE = int(os.getenv("MAX_PAGE_SIZE", 500))
+# The list body stays a plain JSON array; the cursor for the next page travels in this header
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+# Cursor values are strings; these column types do not parse from their str() with the type itself
+_PARSERS = {datetime: datetime.fromisoformat, date: date.fromisoformat}
+
+def encode_cursor(values: list) -> str:
+    payload = json.dumps([str(value) for value in values], separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+def parse_value(column, value: str):
+    """A query-string value converted to column's Python type; ValueError if it does not fit."""
+    python_type = column.type.python_type
+    return _PARSERS.get(python_type, python_type)(value)
+
+def decode_cursor(cursor: str, columns) -> list:
+    """The cursor's values converted back to each key column's Python type; 400 if it was tampered with."""
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        if len(values) != len(columns):
+            raise ValueError(cursor)
+        return [parse_value(column, value) for column, value in zip(columns, values)]
+    except (ValueError, TypeError, NotImplementedError):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+
+class Page:
+    """Dependency for list endpoints: ?cursor=<opaque>&limit=<1..MAX_PAGE_SIZE>."""
+
+    def __init__(
+        self,
+        cursor: Optional[str] = Query(None, description=f"Value of the previous page's {NEXT_CURSOR_HEADER} header"),
+        limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    ):
+        self.cursor = cursor
+        self.limit = limit
+
+def seek(statement, key_columns: list, page: Page, descending: bool = False):
+    """Keyset page ordered on key_columns, which must end in the primary key so the ordering is unique.
+
+    The page starts strictly after the cursor's row, so with an index on key_columns
+    every page is one range scan however deep it is. One row past the limit is
+    fetched so page_rows() can tell whether another page exists.
+    """
+    if page.cursor is not None:
+        values = [literal(value, column.type) for column, value in zip(key_columns, decode_cursor(page.cursor, key_columns))]
+        key, after = (key_columns[0], values[0]) if len(key_columns) == 1 else (tuple_(*key_columns), tuple_(*values))
+        statement = statement.where(key < after if descending else key > after)
+    ordering = [column.desc() for column in key_columns] if descending else key_columns
+    return statement.order_by(*ordering).limit(page.limit + 1)
+
+def paginate(statement, key_column, page: Page):
+    """Keyset page on key_column alone (the primary key)."""
+    return seek(statement, [key_column], page)
+
+def page_rows(rows, page: Page, response: Response, key=lambda row: [row.id]) -> list:
+    rows = list(rows)
+    if len(rows) > page.limit:
+        rows = rows[:page.limit]
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(key(rows[-1]))
+    return rows
@@ -1,6 +1,13 @@
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from insurance_app.models.policy import Policy
+from insurance_app.services.fieldsets import fetch_all, select_fields
+from insurance_app.services.lookup import get_by_id, get_by_id_async
+from insurance_app.services.filtering import list_page
+from insurance_app.services.pagination import Page
 from insurance_app.schemas.policy_schema import PolicyCreate, PolicyUpdate
+from insurance_app.services.dashboard_service import invalidate_analytics
+from insurance_app.services.loss_ratio_rollup_service import policy_buckets, record_loss_ratio_change
 import uuid
 
 class PolicyService:
@@ -24,11 +31,11 @@ class PolicyService:
         self.db.refresh(policy)
         return policy
 
-    def get_all_policies(self):
-        return self.db.query(Policy).all()
+    def get_all_policies(self, page: Page, fields=None, listing=None):
+        return fetch_all(self.db.execute(list_page(select_fields(Policy, fields), Policy, page, listing)), fields)
 
-    def get_policy_by_id(self, policy_id: uuid.UUID):
-        return self.db.query(Policy).filter(Policy.id == policy_id).first()
+    def get_policy_by_id(self, policy_id: uuid.UUID, fields=None):
+        return get_by_id(self.db, Policy, policy_id, fields)
 
     def update_policy(self, policy_id: uuid.UUID, policy_data: PolicyUpdate):
         policy = self.get_policy_by_id(policy_id)
@@ -37,11 +44,27 @@ class PolicyService:
         for field, value in policy_data.dict(exclude_unset=True).items():
             setattr(policy, field, value)
         self.db.commit()
+        invalidate_analytics()
         self.db.refresh(policy)
         return policy
 
     def delete_policy(self, policy_id: uuid.UUID):
         policy = self.get_policy_by_id(policy_id)
         if policy:
+            record_loss_ratio_change(self.db, policy_buckets(self.db, policy.id), {})
             self.db.delete(policy)
-            self.db.commit()
\ No newline at end of file
+            self.db.commit()
+            invalidate_analytics()
+
+
+class AsyncPolicyService:
+    """Read paths of PolicyService on an AsyncSession."""
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def get_all_policies(self, page: Page, fields=None, listing=None):
+        return fetch_all(await self.db.execute(list_page(select_fields(Policy, fields), Policy, page, listing)), fields)
+
+    async def get_policy_by_id(self, policy_id: uuid.UUID, fields=None):
+        return await get_by_id_async(self.db, Policy, policy_id, fields)
@@ -1,6 +1,12 @@
 from sqlalchemy.orm import Session
 from insurance_app.models.premium import Premium
+from insurance_app.services.fieldsets import fetch_all, select_fields
+from insurance_app.services.lookup import get_by_id
+from insurance_app.services.filtering import list_page
+from insurance_app.services.pagination import Page
 from insurance_app.schemas.premium_schema import PremiumCreate, PremiumUpdate
+from insurance_app.services.dashboard_service import invalidate_analytics
+from insurance_app.services.loss_ratio_rollup_service import premium_buckets, record_loss_ratio_change
 import uuid
 
 class PremiumService:
@@ -18,28 +24,35 @@ class PremiumService:
             status=premium_data.status
         )
         self.db.add(premium)
+        record_loss_ratio_change(self.db, {}, premium_buckets(self.db, premium))
         self.db.commit()
+        invalidate_analytics()
         self.db.refresh(premium)
         return premium
 
-    def get_all_premiums(self):
-        return self.db.query(Premium).all()
+    def get_all_premiums(self, page: Page, fields=None, listing=None):
+        return fetch_all(self.db.execute(list_page(select_fields(Premium, fields), Premium, page, listing)), fields)
 
-    def get_premium_by_id(self, premium_id: uuid.UUID):
-        return self.db.query(Premium).filter(Premium.id == premium_id).first()
+    def get_premium_by_id(self, premium_id: uuid.UUID, fields=None):
+        return get_by_id(self.db, Premium, premium_id, fields)
 
     def update_premium(self, premium_id: uuid.UUID, premium_data: PremiumUpdate):
         premium = self.get_premium_by_id(premium_id)
         if not premium:
             return None
+        before = premium_buckets(self.db, premium)
         for field, value in premium_data.dict(exclude_unset=True).items():
             setattr(premium, field, value)
+        record_loss_ratio_change(self.db, before, premium_buckets(self.db, premium))
         self.db.commit()
+        invalidate_analytics()
         self.db.refresh(premium)
         return premium
 
     def delete_premium(self, premium_id: uuid.UUID):
         premium = self.get_premium_by_id(premium_id)
         if premium:
+            record_loss_ratio_change(self.db, premium_buckets(self.db, premium), {})
             self.db.delete(premium)
-            self.db.commit()
\ No newline at end of file
+            self.db.commit()
+            invalidate_analytics()
\ No newline at end of file
@@ -1,5 +1,7 @@
 from sqlalchemy.orm import Session
 from insurance_app.models.product import Product
+from insurance_app.services.fieldsets import fetch_all, select_fields
+from insurance_app.services.lookup import get_by_id
 from insurance_app.schemas.product_schema import ProductCreate, ProductUpdate
 import uuid
 
@@ -21,11 +23,11 @@ class ProductService:
         self.db.refresh(product)
         return product
 
-    def get_all_products(self):
-        return self.db.query(Product).all()
+    def get_all_products(self, fields=None):
+        return fetch_all(self.db.execute(select_fields(Product, fields)), fields)
 
-    def get_product_by_id(self, product_id: uuid.UUID):
-        return self.db.query(Product).filter(Product.id == product_id).first()
+    def get_product_by_id(self, product_id: uuid.UUID, fields=None):
+        return get_by_id(self.db, Product, product_id, fields)
 
     def update_product(self, product_id: uuid.UUID, product_data: ProductUpdate):
         product = self.get_product_by_id(product_id)
@@ -0,0 +1,160 @@
+import enum
+import hashlib
+import json
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date
+from typing import Optional
+
+REPORT_CACHE_DIR = os.getenv("REPORT_CACHE_DIR", "report_cache")
+REPORT_CACHE_TTL = int(os.getenv("REPORT_CACHE_TTL", 3600))  # seconds a rendered file is served again
+REPORT_WORKERS = int(os.getenv("REPORT_WORKERS", 2))
+
+class ReportKind(str, enum.Enum):
+    excel = "excel"
+    pdf = "pdf"
+
+EXTENSIONS = {ReportKind.excel: "xlsx", ReportKind.pdf: "pdf"}
+MEDIA_TYPES = {
+    ReportKind.excel: "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+    ReportKind.pdf: "application/pdf",
+}
+
+_executor = None
+_executor_lock = threading.Lock()
+_jobs = {}
+_jobs_lock = threading.Lock()
+
+def _get_executor() -> ProcessPoolExecutor:
+    # Spawned rather than forked so workers never inherit the server's threads or pooled connections
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ProcessPoolExecutor(
+                max_workers=REPORT_WORKERS, mp_context=multiprocessing.get_context("spawn")
+            )
+        return _executor
+
+def job_id_for(kind: ReportKind, params: dict) -> str:
+    # The id is the parameter hash, so identical requests share one job and one cached file
+    payload = json.dumps({"kind": kind.value, **params}, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode()).hexdigest()[:32]
+
+def report_path(job_id: str, kind: ReportKind) -> str:
+    return os.path.join(REPORT_CACHE_DIR, f"{job_id}.{EXTENSIONS[kind]}")
+
+def _is_fresh(path: str) -> bool:
+    return os.path.exists(path) and time.time() - os.path.getmtime(path) < REPORT_CACHE_TTL
+
+def render_report(kind: str, params: dict, path: str) -> str:
+    # Runs in a worker process: opens its own session and writes to a temp file before renaming
+    from insurance_app.database import SessionLocal
+    from insurance_app.models.claim import ClaimStatus
+    from insurance_app.services.dashboard_service import iter_claims_by_month
+    from insurance_app.services.report_service import claims_report_subtitle, stream_claims_pdf
+
+    kind = ReportKind(kind)
+    date_from = date.fromisoformat(params["date_from"]) if params.get("date_from") else None
+    date_to = date.fromisoformat(params["date_to"]) if params.get("date_to") else None
+    status = ClaimStatus(params["status"]) if params.get("status") else None
+    currency = params.get("currency", "LRD")
+
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    db = SessionLocal()
+    try:
+        rows = iter_claims_by_month(db, currency, date_from, date_to, status)
+        if kind == ReportKind.pdf:
+            with open(tmp_path, "wb") as output:
+                for chunk in stream_claims_pdf(rows, currency, claims_report_subtitle(date_from, date_to, status)):
+                    output.write(chunk)
+        else:
+            import pandas as pd
+
+            pd.DataFrame(list(rows), columns=["month", "count", "total_value"]).to_excel(tmp_path, index=False)
+        os.replace(tmp_path, path)
+    finally:
+        db.close()
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+    return path
+
+def _job_view(job: dict) -> dict:
+    return {key: job[key] for key in ("id", "kind", "status", "error", "submitted_at", "finished_at")}
+
+def submit_report(kind: ReportKind, params: dict) -> dict:
+    job_id = job_id_for(kind, params)
+    path = report_path(job_id, kind)
+    with _jobs_lock:
+        job = _jobs.get(job_id)
+        if job and job["status"] == "pending":
+            return _job_view(job)
+        job = {
+            "id": job_id,
+            "kind": kind,
+            "path": path,
+            "status": "pending",
+            "error": None,
+            "submitted_at": time.time(),
+            "finished_at": None,
+        }
+        _jobs[job_id] = job
+        if _is_fresh(path):
+            job.update(status="done", finished_at=os.path.getmtime(path))
+            return _job_view(job)
+
+    purge_expired_reports()
+    future = _get_executor().submit(render_report, kind.value, params, path)
+
+    def _finished(done):
+        with _jobs_lock:
+            error = done.exception()
+            job.update(
+                status="failed" if error else "done",
+                error=str(error) if error else None,
+                finished_at=time.time(),
+            )
+
+    future.add_done_callback(_finished)
+    return _job_view(job)
+
+def get_report_job(job_id: str, kind: Optional[ReportKind] = None) -> Optional[dict]:
+    with _jobs_lock:
+        job = _jobs.get(job_id)
+        if job:
+            if job["status"] == "done" and not _is_fresh(job["path"]):
+                job["status"] = "expired"
+            return dict(_job_view(job), path=job["path"])
+    # Submitted to another worker process: the shared cache directory still knows about it
+    for candidate in ([kind] if kind else list(ReportKind)):
+        path = report_path(job_id, candidate)
+        if _is_fresh(path):
+            mtime = os.path.getmtime(path)
+            return {"id": job_id, "kind": candidate, "status": "done", "error": None,
+                    "submitted_at": None, "finished_at": mtime, "path": path}
+    return None
+
+def queue_depth() -> int:
+    with _jobs_lock:
+        return sum(1 for job in _jobs.values() if job["status"] == "pending")
+
+def purge_expired_reports():
+    removed = 0
+    if os.path.isdir(REPORT_CACHE_DIR):
+        for name in os.listdir(REPORT_CACHE_DIR):
+            path = os.path.join(REPORT_CACHE_DIR, name)
+            if name.endswith(".tmp") or _is_fresh(path):
+                continue
+            try:
+                os.remove(path)
+                removed += 1
+            except FileNotFoundError:
+                pass  # another worker purged it first
+    cutoff = time.time() - REPORT_CACHE_TTL
+    with _jobs_lock:
+        for job_id in [job_id for job_id, job in _jobs.items() if job["status"] != "pending" and (job["finished_at"] or 0) < cutoff]:
+            del _jobs[job_id]
+    return removed
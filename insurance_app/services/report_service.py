@@ -0,0 +1,117 @@
+# US Letter in points, as in reportlab.lib.pagesizes; importing reportlab just for this slowed startup
+LETTER = (612.0, 792.0)
+
+def _pdf_text(value) -> bytes:
+    text = str(value).replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+    return text.encode("latin-1", "replace")
+
+class StreamingPDF:
+    """Minimal PDF writer that emits each page as soon as it is drawn.
+
+    reportlab's canvas keeps the whole document in memory until save(), so the
+    report is written object by object instead and the xref table, which only
+    needs the byte offsets seen so far, is appended once the last page is out.
+    """
+
+    CATALOG, PAGES, FONT, FONT_BOLD = 1, 2, 3, 4
+
+    def __init__(self, pagesize=LETTER):
+        self.width, self.height = pagesize
+        self.offset = 0
+        self.offsets = {}
+        self.page_ids = []
+        self.next_id = 5
+
+    def _object(self, obj_id: int, body: bytes) -> bytes:
+        self.offsets[obj_id] = self.offset
+        chunk = b"%d 0 obj\n" % obj_id + body + b"\nendobj\n"
+        self.offset += len(chunk)
+        return chunk
+
+    def _raw(self, chunk: bytes) -> bytes:
+        self.offset += len(chunk)
+        return chunk
+
+    def begin(self) -> bytes:
+        return (
+            self._raw(b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n")
+            + self._object(self.FONT, b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>")
+            + self._object(self.FONT_BOLD, b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica-Bold >>")
+        )
+
+    def page(self, lines) -> bytes:
+        """Write one page; lines is an iterable of (bold, size, x, y, text)."""
+        ops = []
+        for bold, size, x, y, text in lines:
+            font = b"/F2" if bold else b"/F1"
+            ops.append(b"BT %s %d Tf %.2f %.2f Td (%s) Tj ET" % (font, size, x, y, _pdf_text(text)))
+        content = b"\n".join(ops)
+        content_id, page_id = self.next_id, self.next_id + 1
+        self.next_id += 2
+        self.page_ids.append(page_id)
+        return self._object(
+            content_id, b"<< /Length %d >>\nstream\n" % len(content) + content + b"\nendstream"
+        ) + self._object(
+            page_id,
+            b"<< /Type /Page /Parent %d 0 R /MediaBox [0 0 %.2f %.2f] "
+            b"/Resources << /Font << /F1 %d 0 R /F2 %d 0 R >> >> /Contents %d 0 R >>"
+            % (self.PAGES, self.width, self.height, self.FONT, self.FONT_BOLD, content_id),
+        )
+
+    def end(self) -> bytes:
+        kids = b" ".join(b"%d 0 R" % page_id for page_id in self.page_ids)
+        chunk = self._object(
+            self.PAGES, b"<< /Type /Pages /Kids [%s] /Count %d >>" % (kids, len(self.page_ids))
+        ) + self._object(self.CATALOG, b"<< /Type /Catalog /Pages %d 0 R >>" % self.PAGES)
+        xref_offset = self.offset
+        size = self.next_id
+        xref = [b"xref\n0 %d\n" % size, b"0000000000 65535 f \n"]
+        for obj_id in range(1, size):
+            xref.append(b"%010d 00000 n \n" % self.offsets[obj_id])
+        xref.append(b"trailer\n<< /Size %d /Root %d 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (size, self.CATALOG, xref_offset))
+        return chunk + self._raw(b"".join(xref))
+
+def claims_report_subtitle(date_from=None, date_to=None, status=None) -> str:
+    # The filter line under the title, shared by the streamed export and the background report job
+    filters = []
+    if date_from or date_to:
+        filters.append(f"Period: {date_from or 'start'} to {date_to or 'today'}")
+    if status:
+        filters.append(f"Status: {status.value}")
+    return " | ".join(filters)
+
+def stream_claims_pdf(rows, currency: str, subtitle: str = ""):
+    # Yields the "Claims by Month" report page by page while rows are still being read
+    pdf = StreamingPDF()
+    height = pdf.height
+    yield pdf.begin()
+
+    def header(first_page: bool):
+        lines = []
+        y = height - 50
+        if first_page:
+            lines.append((True, 16, 50, y, "Claims by Month Report"))
+            lines.append((False, 12, 50, height - 80, f"Currency: {currency}"))
+            if subtitle:
+                lines.append((False, 12, 50, height - 100, subtitle))
+            y = height - 120
+        lines.append((True, 12, 50, y, "Month"))
+        lines.append((True, 12, 150, y, "Claim Count"))
+        lines.append((True, 12, 300, y, f"Total Value ({currency})"))
+        return lines, y - 20
+
+    lines, y = header(True)
+    page_rows = 0
+    for row in rows:
+        lines.append((False, 12, 50, y, str(row["month"])))
+        lines.append((False, 12, 150, y, str(row["count"])))
+        lines.append((False, 12, 300, y, f"{row['total_value']:.2f}"))
+        y -= 20
+        page_rows += 1
+        if y < 50:
+            yield pdf.page(lines)
+            lines, y = header(False)
+            page_rows = 0
+    if page_rows or not pdf.page_ids:
+        yield pdf.page(lines)
+    yield pdf.end()
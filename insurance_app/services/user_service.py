@@ -2,6 +2,8 @@ from sqlalchemy.orm import Session
 
 from insurance_app.models.user import User
 
+from insurance_app.services.lookup import get_by_id
+
 from insurance_app.schemas.user_schema import UserCreate, UserUpdate
 
 import uuid
@@ -60,7 +62,7 @@ class UserService:
 
     def get_user_by_id(self, user_id: uuid.UUID):
 
-        return self.db.query(User).filter(User.id == user_id).first()
+        return get_by_id(self.db, User, user_id)
 
  
 
@@ -0,0 +1,85 @@
+"""Per-table write counters behind the conditional GETs in insurance_app.conditional.
+
+insurance_app.database imports this module, so every process that writes through a
+Session counts its writes: the API, the CLI entry points, jobs and one-off scripts.
+Writes on a bare engine connection, outside any Session, are not counted.
+The versions are bumped on the writer's own connection as it commits, so they
+commit or roll back with the rows they cover.
+"""
+from datetime import datetime
+
+from sqlalchemy import event
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+from insurance_app.models.table_version import TableVersion
+
+VERSIONS = TableVersion.__table__
+
+# Tables whose list and detail routes answer conditional GETs; writes to any other table are not counted
+VERSIONED_TABLES = frozenset({
+    "agents",
+    "audit_logs",
+    "claims",
+    "clients",
+    "customers",
+    "documents",
+    "ledger_entries",
+    "policies",
+    "premiums",
+    "products",
+})
+
+def _bump_statement(dialect_name: str, table: str, now: datetime):
+    insert = postgresql.insert if dialect_name == "postgresql" else sqlite.insert
+    return insert(VERSIONS).values(table_name=table, version=1, updated_at=now).on_conflict_do_update(
+        index_elements=[VERSIONS.c.table_name],
+        set_={"version": VERSIONS.c.version + 1, "updated_at": now},
+    )
+
+def bump_table_versions(conn, tables):
+    """Bump each table's version on conn, inside the transaction that wrote the tables.
+
+    Called last before the commit, so the table_versions row locks are held only
+    for the commit itself. Tables go in name order, so two writers cannot deadlock
+    on them. A failed bump raises and fails the commit: committing the rows without
+    it would leave readers a 304 for data that has changed.
+    """
+    now = datetime.utcnow()
+    for table in sorted(tables):
+        conn.execute(_bump_statement(conn.dialect.name, table, now))
+
+@event.listens_for(Engine, "begin")
+def _reset_written_tables(conn):
+    conn.info["written_tables"] = set()
+
+# Every INSERT/UPDATE/DELETE on a versioned table, ORM flush or Core statement, is noted on its connection
+@event.listens_for(Engine, "after_execute")
+def _note_write(conn, clauseelement, multiparams, params, execution_options, result):
+    if not getattr(clauseelement, "is_dml", False):
+        return
+    table = getattr(clauseelement.table, "name", None)
+    if table in VERSIONED_TABLES:
+        conn.info.setdefault("written_tables", set()).add(table)
+
+@event.listens_for(Session, "after_begin")
+def _collect_written_tables(session, transaction, connection):
+    session.info.setdefault("written_tables", {})[connection] = connection.info.setdefault("written_tables", set())
+
+@event.listens_for(Session, "before_commit")
+def _bump_before_commit(session):
+    # A savepoint release is not the commit; its writes are bumped with the outer transaction's
+    if session.in_nested_transaction():
+        return
+    # Flush first, so the writes the commit would flush are counted too
+    session.flush()
+    for conn, tables in session.info.get("written_tables", {}).items():
+        if tables:
+            bump_table_versions(conn, tables)
+            tables.clear()
+
+@event.listens_for(Session, "after_transaction_end")
+def _forget_connections(session, transaction):
+    if transaction.parent is None:
+        session.info.pop("written_tables", None)
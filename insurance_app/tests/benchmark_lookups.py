@@ -0,0 +1,82 @@
+"""Per-call cost of the by-id lookups behind get_claim_by_id, get_customer_by_id and get_agent_by_id.
+
+"before" is the old db.query(Model).filter(Model.id == x).first(); "after" is
+services.lookup.get_by_id. The models are mapped onto plain classes in a private
+registry with the same columns, so the comparison runs on their tables without
+the rest of the app's relationships.
+
+Run with: python -m insurance_app.tests.benchmark_lookups [calls]
+"""
+import datetime
+import sys
+import time
+
+from sqlalchemy import Column, Enum, MetaData, Table, insert
+from sqlalchemy.orm import Session, registry
+
+from insurance_app.database import make_engine
+from insurance_app.models.agent import Agent
+from insurance_app.models.claim import Claim
+from insurance_app.models.customer import Customer
+from insurance_app.services.lookup import get_by_id
+
+ROWS = 1000
+SAMPLE_VALUES = {
+    "Integer": 1, "Float": 1.0, "Date": datetime.date(2024, 1, 1), "DateTime": datetime.datetime(2024, 1, 1), "Boolean": True,
+}
+
+def _sample(column, n: int):
+    if isinstance(column.type, Enum):
+        return list(column.type.enum_class)[0] if column.type.enum_class else column.type.enums[0]
+    return SAMPLE_VALUES.get(type(column.type).__name__, f"{column.name}-{n}")
+
+def _mapped(mapper_registry, model):
+    table = Table(
+        model.__tablename__,
+        mapper_registry.metadata,
+        *[Column(column.name, column.type, primary_key=column.primary_key) for column in model.__table__.columns],
+    )
+    stand_in = type(model.__name__, (), {})
+    mapper_registry.map_imperatively(stand_in, table)
+    return stand_in
+
+def _seed(engine, model):
+    table = model.__table__
+    rows = [dict({column.name: _sample(column, n) for column in table.columns}, id=n) for n in range(1, ROWS + 1)]
+    with engine.begin() as connection:
+        connection.execute(insert(table), rows)
+
+def before(db, model, ident):
+    return db.query(model).filter(model.id == ident).first()
+
+def after(db, model, ident):
+    return get_by_id(db, model, ident)
+
+def _per_call(engine, lookup, model, calls: int) -> float:
+    with Session(engine) as db:
+        for ident in range(1, 101):
+            lookup(db, model, ident)
+        started = time.perf_counter()
+        for n in range(calls):
+            lookup(db, model, n % ROWS + 1)
+            # A fresh request has an empty identity map, so every lookup goes to the database
+            db.expunge_all()
+        return (time.perf_counter() - started) / calls
+
+def main(calls: int = 5000):
+    mapper_registry = registry(metadata=MetaData())
+    models = {name: _mapped(mapper_registry, model) for name, model in (
+        ("get_claim_by_id", Claim), ("get_customer_by_id", Customer), ("get_agent_by_id", Agent)
+    )}
+    engine = make_engine("sqlite://")
+    mapper_registry.metadata.create_all(engine)
+    for model in models.values():
+        _seed(engine, model)
+    for name, model in models.items():
+        old = _per_call(engine, before, model, calls)
+        new = _per_call(engine, after, model, calls)
+        print(f"{name:>20}: before {old * 1e6:7.1f} us/call  after {new * 1e6:7.1f} us/call  ({old / new:.1f}x)")
+    engine.dispose()
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 5000)
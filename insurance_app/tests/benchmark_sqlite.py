@@ -0,0 +1,84 @@
+"""Read and write throughput of file-backed SQLite, untuned vs. the SQLITE_PRAGMAS profile.
+
+Run with: python -m insurance_app.tests.benchmark_sqlite [seconds]
+"""
+import os
+import sys
+import tempfile
+import threading
+import time
+
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+
+from insurance_app.database import SQLITE_PRAGMAS, make_engine
+
+ROWS = 200000
+WRITERS = 4
+READERS = 4
+
+def _prepare(engine):
+    with engine.begin() as connection:
+        connection.execute(text("CREATE TABLE ledger (id INTEGER PRIMARY KEY, account TEXT, amount REAL)"))
+        connection.execute(text("CREATE INDEX ix_ledger_account ON ledger (account)"))
+        connection.execute(
+            text("INSERT INTO ledger (account, amount) VALUES (:account, :amount)"),
+            [{"account": f"ACC-{n % 500}", "amount": n % 1000} for n in range(ROWS)],
+        )
+
+def _run(engine, seconds: float) -> dict:
+    stop = time.monotonic() + seconds
+    counts = {"writes": 0, "reads": 0, "locked": 0}
+    lock = threading.Lock()
+
+    def writer(worker):
+        n = 0
+        while time.monotonic() < stop:
+            try:
+                # One row per transaction, like a single API write
+                with engine.begin() as connection:
+                    connection.execute(
+                        text("INSERT INTO ledger (account, amount) VALUES (:account, :amount)"),
+                        {"account": f"ACC-{(worker * 7 + n) % 500}", "amount": n},
+                    )
+                key = "writes"
+            except OperationalError:
+                key = "locked"
+            n += 1
+            with lock:
+                counts[key] += 1
+
+    def reader(worker):
+        n = 0
+        while time.monotonic() < stop:
+            with engine.connect() as connection:
+                connection.execute(
+                    text("SELECT count(*), sum(amount) FROM ledger WHERE account = :account"),
+                    {"account": f"ACC-{(worker * 13 + n) % 500}"},
+                ).one()
+            n += 1
+            with lock:
+                counts["reads"] += 1
+
+    threads = [threading.Thread(target=writer, args=(i,)) for i in range(WRITERS)]
+    threads += [threading.Thread(target=reader, args=(i,)) for i in range(READERS)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return {key: value / seconds for key, value in counts.items()}
+
+def main(seconds: float = 5.0):
+    for label, pragmas in (("untuned", {}), ("tuned", SQLITE_PRAGMAS)):
+        directory = tempfile.mkdtemp()
+        engine = make_engine(f"sqlite:///{os.path.join(directory, 'bench.db')}", pragmas=pragmas)
+        _prepare(engine)
+        result = _run(engine, seconds)
+        engine.dispose()
+        print(
+            f"{label:>8}: {result['writes']:8.0f} writes/s  {result['reads']:8.0f} reads/s  "
+            f"{result['locked']:6.1f} locked/s"
+        )
+
+if __name__ == "__main__":
+    main(float(sys.argv[1]) if len(sys.argv) > 1 else 5.0)
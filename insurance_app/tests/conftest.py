@@ -0,0 +1,12 @@
+import os
+import tempfile
+
+# Every test runs against a throwaway SQLite file, set before anything imports insurance_app.database
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{tempfile.mkdtemp()}/test.db")
+
+# Importing the app loads every model; the lifespan would create the tables, but tests that
+# call the app without running it need them too, so the schema is created here once
+import insurance_app_main  # noqa: E402,F401
+from insurance_app.database import create_schema  # noqa: E402
+
+create_schema()
@@ -0,0 +1,24 @@
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+
+from insurance_app import database
+from insurance_app.services.dashboard_service import analytics_cache, invalidate_analytics, store_analytics
+
+def test_replica_results_are_not_cached_right_after_a_write(monkeypatch):
+    primary, replica = create_engine("sqlite://"), create_engine("sqlite://")
+    monkeypatch.setattr(database, "replica_engine", replica)
+    invalidate_analytics()
+
+    with Session(replica) as db:
+        # The replica may not have the write yet: its report is served but not kept
+        store_analytics(db, "report", "stale", analytics_cache.generation)
+        assert analytics_cache.get("report") is None
+    with Session(primary) as db:
+        store_analytics(db, "report", "fresh", analytics_cache.generation)
+        assert analytics_cache.get("report") == "fresh"
+
+    monkeypatch.setattr(analytics_cache, "cleared_at", analytics_cache.cleared_at - database.READ_YOUR_WRITES_SECONDS)
+    with Session(replica) as db:
+        store_analytics(db, "replica report", "caught up", analytics_cache.generation)
+        assert analytics_cache.get("replica report") == "caught up"
+    invalidate_analytics()
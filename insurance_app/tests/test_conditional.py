@@ -0,0 +1,126 @@
+import pytest
+from fastapi import Depends, FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import Column, Integer, String, create_engine, select, update
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import Session, declarative_base
+
+from insurance_app import table_versions
+from insurance_app.conditional import conditional_get
+from insurance_app.database import get_async_db
+from insurance_app.models.table_version import TableVersion
+
+# A model of its own, outside the app's Base
+Base = declarative_base()
+
+class Note(Base):
+    __tablename__ = "conditional_notes"
+    id = Column(Integer, primary_key=True)
+    body = Column(String)
+
+@pytest.fixture
+def app(tmp_path, monkeypatch):
+    monkeypatch.setattr(table_versions, "VERSIONED_TABLES", table_versions.VERSIONED_TABLES | {Note.__tablename__})
+    path = tmp_path / "notes.db"
+    engine = create_engine(f"sqlite:///{path}", connect_args={"check_same_thread": False})
+    async_engine = create_async_engine(f"sqlite+aiosqlite:///{path}")
+    Base.metadata.create_all(engine)
+    TableVersion.__table__.create(engine)
+    loads = []
+
+    def get_session():
+        with Session(engine) as db:
+            yield db
+
+    async def get_async_session():
+        async with AsyncSession(async_engine) as db:
+            yield db
+
+    app = FastAPI()
+    app.dependency_overrides[get_async_db] = get_async_session
+
+    @app.get("/notes/", dependencies=[conditional_get(Note, get_session)])
+    def list_notes(db: Session = Depends(get_session)):
+        loads.append(1)
+        return [{"id": note.id, "body": note.body} for note in db.scalars(select(Note).order_by(Note.id))]
+
+    @app.get("/async-notes/", dependencies=[conditional_get(Note, get_async_db)])
+    async def list_notes_async(db: AsyncSession = Depends(get_async_db)):
+        loads.append(1)
+        return [{"id": note.id, "body": note.body} for note in await db.scalars(select(Note).order_by(Note.id))]
+
+    @app.post("/async-notes/", status_code=201)
+    async def add_note(body: str, db: AsyncSession = Depends(get_async_db)):
+        db.add(Note(body=body))
+        await db.commit()
+
+    yield TestClient(app), engine, loads
+    engine.dispose()
+
+def test_unchanged_table_answers_304_without_running_the_route(app):
+    client, engine, loads = app
+    with Session(engine) as db:
+        db.add_all([Note(id=1, body="a"), Note(id=2, body="b")])
+        db.flush()
+        db.execute(update(Note).where(Note.id == 2).values(body="c"))
+        db.commit()
+
+    first = client.get("/notes/")
+    etag = first.headers["ETag"]
+    assert first.status_code == 200 and first.headers["Last-Modified"]
+    # One transaction, one bump, however many statements it ran
+    assert '-1-' in etag
+
+    cached = client.get("/notes/", headers={"If-None-Match": etag})
+    assert cached.status_code == 304
+    assert cached.content == b"" and cached.headers["ETag"] == etag
+    assert client.get("/notes/", headers={"If-Modified-Since": first.headers["Last-Modified"]}).status_code == 304
+    assert len(loads) == 1
+
+def test_version_moves_only_once_the_write_commits(app):
+    client, engine, _ = app
+    etag = client.get("/notes/").headers["ETag"]
+
+    with Session(engine) as db:
+        db.add(Note(id=1, body="draft"))
+        db.rollback()
+    assert client.get("/notes/", headers={"If-None-Match": etag}).status_code == 304
+
+    with Session(engine) as db:
+        db.add(Note(id=2, body="saved"))
+        db.flush()
+        # The bump waits for the commit, and commits with the rows
+        assert client.get("/notes/", headers={"If-None-Match": etag}).status_code == 304
+        db.commit()
+    changed = client.get("/notes/", headers={"If-None-Match": etag})
+    assert changed.status_code == 200 and changed.json() == [{"id": 2, "body": "saved"}]
+
+def test_async_route_shares_the_version_with_async_writes(app):
+    client, engine, loads = app
+    first = client.get("/async-notes/")
+    etag = first.headers["ETag"]
+    assert first.status_code == 200 and first.json() == []
+    assert client.get("/async-notes/", headers={"If-None-Match": etag}).status_code == 304
+    assert client.get("/notes/", headers={"If-None-Match": etag}).status_code == 304
+
+    assert client.post("/async-notes/", params={"body": "async"}).status_code == 201
+    changed = client.get("/async-notes/", headers={"If-None-Match": etag})
+    assert changed.status_code == 200 and changed.json() == [{"id": 1, "body": "async"}]
+    assert client.get("/notes/", headers={"If-None-Match": changed.headers["ETag"]}).status_code == 304
+    assert len(loads) == 2
+
+def test_failed_bump_fails_the_write(app):
+    _, engine, _ = app
+    TableVersion.__table__.drop(engine)
+
+    with Session(engine) as db:
+        db.add(Note(id=1, body="lost"))
+        with pytest.raises(OperationalError):
+            db.commit()
+    with Session(engine) as db:
+        assert db.scalars(select(Note)).all() == []
+
+def test_unversioned_table_is_refused():
+    with pytest.raises(ValueError, match="VERSIONED_TABLES"):
+        conditional_get(Note)
@@ -0,0 +1,74 @@
+import time
+
+import anyio
+import pytest
+from fastapi import Depends, FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from insurance_app.database import get_db
+from insurance_app.deadlines import DeadlineMiddleware, deadline
+
+# Counts upwards forever unless something interrupts it
+ENDLESS_QUERY = text("WITH RECURSIVE c(x) AS (SELECT 1 UNION ALL SELECT x + 1 FROM c) SELECT count(*) FROM c")
+
+app = FastAPI()
+app.add_middleware(DeadlineMiddleware, seconds=0.5)
+finished = []
+
+@app.get("/slow")
+async def slow():
+    await anyio.sleep(2)
+    finished.append("slow")
+    return {}
+
+@app.get("/export", dependencies=[deadline(2)])
+async def export():
+    await anyio.sleep(1)
+    return {}
+
+@app.get("/endless")
+def endless(db: Session = Depends(get_db)):
+    db.execute(ENDLESS_QUERY).all()
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+def test_deadline_returns_504():
+    response = TestClient(app).get("/slow")
+    assert response.status_code == 504
+    assert "deadline" in response.json()["detail"]
+
+def test_route_can_extend_its_deadline():
+    assert TestClient(app).get("/export").status_code == 200
+
+def test_statement_is_interrupted_at_the_deadline():
+    started = time.perf_counter()
+    response = TestClient(app, raise_server_exceptions=False).get("/endless")
+    assert response.status_code == 504
+    assert time.perf_counter() - started < 2
+
+@pytest.mark.anyio
+async def test_client_disconnect_cancels_the_request():
+    messages = [{"type": "http.request", "body": b"", "more_body": False}]
+    sent = []
+
+    async def receive():
+        if messages:
+            return messages.pop()
+        await anyio.sleep(0.1)
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        sent.append(message)
+
+    scope = {"type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET", "scheme": "http",
+             "path": "/slow", "raw_path": b"/slow", "query_string": b"", "root_path": "", "headers": [],
+             "client": ("test", 1), "server": ("test", 80)}
+    started = time.perf_counter()
+    await app(scope, receive, send)
+    assert time.perf_counter() - started < 0.5
+    assert sent == []
+    assert "slow" not in finished
@@ -0,0 +1,29 @@
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from insurance_app.database import get_db
+from insurance_app.routers import routers_dashboard
+from insurance_app.services import exchange_rate_service
+from insurance_app.services.exchange_rate_service import MissingRateError, require_rates, usd_rates
+
+@pytest.fixture
+def no_rates(monkeypatch):
+    # An empty exchange_rates table: only the fallback currencies convert
+    monkeypatch.setattr(exchange_rate_service, "_rate_series", lambda db: {})
+
+def test_unknown_currency_raises_a_lookup_error(no_rates):
+    assert list(usd_rates(None, "usd", ["2024-01-01"])) == [1.0]
+    with pytest.raises(LookupError, match="EUR"):
+        require_rates(None, ["LRD", "EUR"])
+
+def test_pdf_export_answers_422_before_streaming(no_rates, monkeypatch):
+    monkeypatch.setattr(routers_dashboard, "require_report_rates", lambda db, currency: require_rates(db, [currency]))
+    monkeypatch.setattr(routers_dashboard, "iter_claims_by_month", pytest.fail)
+    app = FastAPI()
+    app.include_router(routers_dashboard.router)
+    app.dependency_overrides[get_db] = lambda: None
+
+    response = TestClient(app).get("/dashboard/export/pdf", params={"currency": "EUR"})
+    assert response.status_code == 422
+    assert response.json() == {"detail": str(MissingRateError("EUR"))}
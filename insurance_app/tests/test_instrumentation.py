@@ -0,0 +1,84 @@
+import logging
+
+import pytest
+from fastapi import Depends
+from fastapi.testclient import TestClient
+from passlib.context import CryptContext
+from sqlalchemy import select, text
+from sqlalchemy.orm import Session
+
+import insurance_app_main
+from insurance_app import instrumentation
+from insurance_app_main import app
+from insurance_app.database import SessionLocal, engine, get_db
+from insurance_app.instrumentation import QUERY_COUNT_HEADER, QUERY_TIME_HEADER, REPEATED_HEADER, fingerprint, track_queries
+from insurance_app.models.models import User
+
+USERS = User.__table__
+
+@pytest.fixture(scope="module")
+def usernames():
+    names = [f"instrumented-{n}" for n in range(6)]
+    with pytest.MonkeyPatch.context() as patch:
+        # passlib's bcrypt backend fails against bcrypt 4.1+, as in test_concurrency
+        patch.setattr(insurance_app_main, "pwd_context", CryptContext(schemes=["pbkdf2_sha256"]))
+        password_hash = insurance_app_main.pwd_context.hash("secret")
+        with SessionLocal() as db:
+            db.execute(USERS.insert(), [{"username": name, "password_hash": password_hash, "role": "user"} for name in names])
+            db.commit()
+        yield names
+
+def test_fingerprint_groups_statement_variants():
+    assert fingerprint("SELECT * FROM claims WHERE id = 7 AND status = 'PAID'") == fingerprint(
+        "SELECT *  FROM claims\n WHERE id = 12 AND status = 'REJECTED'"
+    )
+    assert fingerprint("SELECT * FROM claims WHERE id IN (?, ?, ?)") == "SELECT * FROM claims WHERE id IN (?)"
+
+def test_repeated_statements_are_flagged():
+    with track_queries(debug=True) as queries:
+        with engine.connect() as connection:
+            for claim_id in range(6):
+                connection.execute(text("SELECT :claim_id"), {"claim_id": claim_id})
+            connection.execute(text("SELECT 1, 2"))
+    assert queries.count == 7
+    assert queries.repeated(threshold=5) == {"SELECT ?": 6}
+
+def test_every_response_carries_query_headers():
+    response = TestClient(app).get("/health")
+    assert response.headers[QUERY_COUNT_HEADER] == "0"
+    assert QUERY_TIME_HEADER in response.headers
+
+def test_route_queries_are_counted(usernames):
+    response = TestClient(app).post("/login", data={"username": usernames[0], "password": "secret"}, follow_redirects=False)
+    assert response.status_code == 302
+    # authenticate_user: the one lookup by username
+    assert response.headers[QUERY_COUNT_HEADER] == "1"
+    assert float(response.headers[QUERY_TIME_HEADER]) > 0
+    assert REPEATED_HEADER not in response.headers
+
+@pytest.fixture
+def per_user_lookups(usernames):
+    # A route with the classic N+1 shape: list the ids, then fetch each row on its own
+    def user_roles(db: Session = Depends(get_db)):
+        ids = db.scalars(select(USERS.c.id).where(USERS.c.username.in_(usernames))).all()
+        return [db.execute(select(USERS.c.role).where(USERS.c.id == user_id)).scalar_one() for user_id in ids]
+
+    app.add_api_route("/test-instrumentation/user-roles", user_roles)
+    route = app.router.routes[-1]
+    yield route.path
+    app.router.routes.remove(route)
+
+def test_repeated_route_queries_are_reported_under_sql_debug(per_user_lookups, monkeypatch, caplog):
+    client = TestClient(app)
+    assert REPEATED_HEADER not in client.get(per_user_lookups).headers
+
+    monkeypatch.setattr(instrumentation, "SQL_DEBUG", True)
+    with caplog.at_level(logging.WARNING, logger="insurance_app.sql"):
+        response = client.get(per_user_lookups)
+    assert response.json() == ["user"] * 6
+    assert response.headers[QUERY_COUNT_HEADER] == "7"
+    assert response.headers[REPEATED_HEADER] == "1"
+    lookup = fingerprint(str(select(USERS.c.role).where(USERS.c.id == 1).compile(engine)))
+    assert [record.getMessage() for record in caplog.records if "N+1" in record.getMessage()] == [
+        f"possible N+1 in GET {per_user_lookups}: 6 x {lookup}"
+    ]
@@ -0,0 +1,81 @@
+import os
+import subprocess
+import sys
+
+from fastapi import APIRouter, FastAPI, Request
+from fastapi.testclient import TestClient
+
+from insurance_app.metrics import route_template
+from insurance_app_main import app
+
+ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+WORKER = """
+from insurance_app.metrics import observe_request
+for _ in range(3):
+    observe_request("GET", "/claims/claims/{claim_id}", 200, 0.02)
+"""
+
+SCRAPE = """
+from insurance_app.metrics import render_metrics
+print(render_metrics().decode())
+"""
+
+def _run(code: str, env: dict) -> str:
+    return subprocess.run([sys.executable, "-c", code], cwd=ROOT, env=env, capture_output=True, text=True, check=True).stdout
+
+def test_metrics_are_labelled_by_route_template():
+    client = TestClient(app)
+    client.get("/health")
+    client.get("/dashboard/dashboard/reports/abc123")
+    client.get("/no-such-page")
+    body = client.get("/metrics").text
+    assert 'http_requests_total{method="GET",route="/health",status="200"}' in body
+    assert 'route="/dashboard/dashboard/reports/{job_id}"' in body
+    assert "abc123" not in body
+    assert 'route="<unmatched>"' in body
+    assert "http_requests_in_flight" in body
+    assert 'db_pool_checked_out{pool="primary"}' in body
+    assert "report_jobs_pending" in body
+
+def test_route_template_comes_from_the_matched_route():
+    outer, inner, included = FastAPI(), FastAPI(), APIRouter()
+    templates = []
+
+    @outer.middleware("http")
+    async def record(request: Request, call_next):
+        response = await call_next(request)
+        templates.append(route_template(request.scope))
+        return response
+
+    @outer.get("/pairs/{left}/{right}")
+    def pair(left: str, right: str):
+        return {}
+
+    @outer.get("/files/{name:path}")
+    def file(name: str):
+        return {}
+
+    @inner.get("/items/{item_id}")
+    def item(item_id: int):
+        return {}
+
+    @included.get("/{rest:path}")
+    def anything(rest: str):
+        return {}
+
+    outer.mount("/inner", inner)
+    outer.include_router(included, prefix="/p/q")
+    client = TestClient(outer)
+    for url in ["/pairs/7/7", "/files/a/b.txt", "/inner/items/3", "/p/q/q/v", "/missing"]:
+        client.get(url)
+    assert templates == ["/pairs/{left}/{right}", "/files/{name}", "/inner/items/{item_id}", "/p/q/{rest}", "<unmatched>"]
+
+def test_counters_add_up_across_workers(tmp_path):
+    env = dict(os.environ, PROMETHEUS_MULTIPROC_DIR=str(tmp_path), DATABASE_URL=f"sqlite:///{tmp_path / 'metrics.db'}")
+    # Two worker processes record requests; a third serves the scrape
+    _run(WORKER, env)
+    _run(WORKER, env)
+    body = _run(SCRAPE, env)
+    assert 'http_requests_total{method="GET",route="/claims/claims/{claim_id}",status="200"} 6.0' in body
+    assert 'http_request_duration_seconds_count{method="GET",route="/claims/claims/{claim_id}"} 6.0' in body
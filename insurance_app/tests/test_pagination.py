@@ -0,0 +1,68 @@
+import uuid
+from datetime import datetime, timedelta
+
+import pytest
+from fastapi import HTTPException, Response
+from sqlalchemy import Column, DateTime, Integer, MetaData, String, Table, create_engine, select
+from sqlalchemy.types import Uuid
+
+from insurance_app.services.pagination import NEXT_CURSOR_HEADER, Page, decode_cursor, encode_cursor, paginate, page_rows, seek
+
+def _walk(conn, table, limit):
+    seen, cursor, pages = [], None, 0
+    while True:
+        page = Page(cursor=cursor, limit=limit)
+        response = Response()
+        rows = page_rows(conn.execute(paginate(select(table), table.c.id, page)).all(), page, response)
+        seen.extend(row.id for row in rows)
+        pages += 1
+        cursor = response.headers.get(NEXT_CURSOR_HEADER)
+        if cursor is None:
+            return seen, pages
+
+def test_cursor_walks_every_row_once_in_key_order():
+    engine = create_engine("sqlite://")
+    metadata = MetaData()
+    numbered = Table("numbered", metadata, Column("id", Integer, primary_key=True), Column("name", String))
+    keyed = Table("keyed", metadata, Column("id", Uuid, primary_key=True))
+    metadata.create_all(engine)
+    ids = [uuid.uuid4() for _ in range(25)]
+    with engine.begin() as conn:
+        conn.execute(numbered.insert(), [{"id": n, "name": str(n)} for n in range(1, 26)])
+        conn.execute(keyed.insert(), [{"id": ident} for ident in ids])
+
+        assert _walk(conn, numbered, 10) == (list(range(1, 26)), 3)
+        assert _walk(conn, keyed, 7) == (sorted(ids), 4)
+        # An exact multiple of the page size does not leave an empty trailing page
+        assert _walk(conn, numbered, 5)[1] == 5
+
+def test_seek_on_timestamp_and_id_keeps_rows_that_share_a_timestamp():
+    engine = create_engine("sqlite://")
+    metadata = MetaData()
+    entries = Table("entries", metadata, Column("id", Integer, primary_key=True), Column("timestamp", DateTime))
+    metadata.create_all(engine)
+    start = datetime(2024, 1, 1, 9, 30, 0, 250000)
+    # Three rows per timestamp, with ids out of time order, so pages split inside a tie
+    rows = [{"id": n, "timestamp": start + timedelta(seconds=(n * 7) % 10)} for n in range(1, 31)]
+    with engine.begin() as conn:
+        conn.execute(entries.insert(), rows)
+        for descending in (False, True):
+            seen, cursor = [], None
+            while True:
+                page = Page(cursor=cursor, limit=4)
+                response = Response()
+                statement = seek(select(entries), [entries.c.timestamp, entries.c.id], page, descending=descending)
+                seen.extend(page_rows(conn.execute(statement).all(), page, response, key=lambda row: [row.timestamp, row.id]))
+                cursor = response.headers.get(NEXT_CURSOR_HEADER)
+                if cursor is None:
+                    break
+            expected = sorted(rows, key=lambda row: (row["timestamp"], row["id"]), reverse=descending)
+            assert [(row.timestamp, row.id) for row in seen] == [(row["timestamp"], row["id"]) for row in expected]
+
+def test_tampered_cursor_is_rejected():
+    column = Column("id", Integer)
+    assert decode_cursor(encode_cursor([42]), [column]) == [42]
+    for cursor in ["not-base64!", encode_cursor(["x"]), encode_cursor([1, 2])]:
+        with pytest.raises(HTTPException) as error:
+            decode_cursor(cursor, [column])
+        assert error.value.status_code == 400
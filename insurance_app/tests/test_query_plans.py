@@ -0,0 +1,206 @@
+import os
+import sys
+from datetime import date, datetime
+
+import pytest
+from alembic import command
+from alembic.config import Config
+from sqlalchemy import Column, MetaData, Table, create_engine, event
+from sqlalchemy.orm import Session, registry
+
+from insurance_app.models.agent import Agent
+from insurance_app.models.audit import AuditLog
+from insurance_app.models.claim import Claim, ClaimStatus
+from insurance_app.models.claim_rollup import ClaimsMonthlyRollup
+from insurance_app.models.customer import Customer
+from insurance_app.models.document import Document
+from insurance_app.models.exchange_rate import ExchangeRate
+from insurance_app.models.ledger import LedgerEntry
+from insurance_app.models.loss_ratio_rollup import LossRatioMonthlyRollup
+from insurance_app.models.policy import Policy
+from insurance_app.models.premium import Premium
+from insurance_app.models.product import Product
+from insurance_app.services import (
+    agent_service,
+    audit_service,
+    claim_service,
+    customer_service,
+    dashboard_service,
+    document_service,
+    ledger_service,
+    loss_ratio_service,
+)
+from insurance_app.services.filtering import OPERATORS, listing_params
+from insurance_app.services.pagination import Page, encode_cursor
+from insurance_app.services.policy_service import PolicyService
+from insurance_app.services.premium_service import PremiumService
+
+ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+MODELS = [
+    Premium, Claim, Document, AuditLog, LedgerEntry, Policy, Customer, Agent,
+    Product, ExchangeRate, ClaimsMonthlyRollup, LossRatioMonthlyRollup,
+]
+
+# The app's models share one registry that cannot configure its mappers, so no statement built
+# from them compiles here. Each model is mapped again, in a private registry, onto a copy of its
+# table, and the stand-ins are swapped into the services: the SQL is still the services' own.
+stand_in_registry = registry()
+STAND_INS = {}
+for model in MODELS:
+    STAND_INS[model] = type(model.__name__, (), {})
+    stand_in_registry.map_imperatively(STAND_INS[model], model.__table__.to_metadata(stand_in_registry.metadata))
+
+@pytest.fixture(scope="module")
+def engine(tmp_path_factory):
+    url = f"sqlite:///{tmp_path_factory.mktemp('plans') / 'plans.db'}"
+    engine = create_engine(url)
+    # Bare tables with the model columns and primary keys; every other index comes from the migrations
+    metadata = MetaData()
+    for model in MODELS:
+        Table(model.__tablename__, metadata, *[Column(column.name, column.type, primary_key=column.primary_key) for column in model.__table__.columns])
+    metadata.create_all(engine)
+    # Drop the pooled connection: one opened before the migration can plan against the old schema
+    engine.dispose()
+    config = Config(os.path.join(ROOT, "alembic.ini"))
+    config.set_main_option("script_location", os.path.join(ROOT, "alembic"))
+    config.set_main_option("sqlalchemy.url", url)
+    command.upgrade(config, "head")
+    yield engine
+    engine.dispose()
+
+@pytest.fixture
+def db(engine, monkeypatch):
+    for module in list(sys.modules.values()):
+        if getattr(module, "__name__", "").startswith(("insurance_app.services.", "insurance_app.models.")):
+            for name, value in list(vars(module).items()):
+                if isinstance(value, type) and value in STAND_INS:
+                    monkeypatch.setattr(module, name, STAND_INS[value])
+    # Reports are cached; a hit would run no SQL at all
+    dashboard_service.invalidate_analytics()
+    with Session(engine) as session:
+        yield session
+
+def _listing(model, filters, sort=None):
+    # What the list routes' ?filter= and ?sort= dependency hands the service
+    names = {expression.split(":")[0]: tuple(OPERATORS) for expression in filters}
+    sorts = (sort.lstrip("-"),) if sort else ()
+    return listing_params(STAND_INS[model], names, sorts).dependency(filter=filters, sort=sort)
+
+def _page(*key):
+    # A page deep into the table, so a plan that reads the rows before the cursor shows up
+    return Page(cursor=encode_cursor(list(key)) if key else None, limit=50)
+
+DEEP = (datetime(2024, 6, 1), 5000)
+
+# (index the statement must use, table it reads, service call); the plans are taken from the SQL the call runs
+HOT_QUERIES = {
+    "documents by entity": (
+        "ix_documents_related_entity", "documents",
+        lambda db: document_service.get_documents_by_entity(db, "policy", 42),
+    ),
+    "claims by month, one status, mid-month range": (
+        "ix_claims_status_claim_date_id", "claims",
+        lambda db: dashboard_service.claims_by_month(db, date_from=date(2024, 1, 10), date_to=date(2024, 3, 20), status=ClaimStatus.PAID),
+    ),
+    "claims by month, mid-month range": (
+        "ix_claims_claim_date_id", "claims",
+        lambda db: dashboard_service.claims_by_month(db, date_from=date(2024, 1, 10)),
+    ),
+    "loss ratios, claims paid, mid-month range": (
+        "ix_claims_status_claim_date_id", "claims",
+        lambda db: loss_ratio_service.loss_ratios(db, date_from=date(2024, 1, 10), date_to=date(2024, 3, 20)),
+    ),
+    "claim list, one policy": (
+        "ix_claims_policy_id", "claims",
+        lambda db: claim_service.get_all_claims(db, _page(), listing=_listing(Claim, ["policy_id:eq:7"])),
+    ),
+    "premium list, one policy by due date": (
+        "ix_premiums_policy_id_due_date_id", "premiums",
+        lambda db: PremiumService(db).get_all_premiums(
+            _page(), listing=_listing(Premium, ["policy_id:eq:00000000-0000-0000-0000-000000000001"], "due_date")
+        ),
+    ),
+    "premium list, one status by due date": (
+        "ix_premiums_status_due_date_id", "premiums",
+        lambda db: PremiumService(db).get_all_premiums(_page(), listing=_listing(Premium, ["status:eq:Unpaid"], "due_date")),
+    ),
+    "premium list, due date range": (
+        "ix_premiums_due_date_id", "premiums",
+        lambda db: PremiumService(db).get_all_premiums(_page(), listing=_listing(Premium, ["due_date:gte:2024-01-01"], "due_date")),
+    ),
+    "policy list, one client": (
+        "ix_policies_client_id_id", "policies",
+        lambda db: PolicyService(db).get_all_policies(
+            _page(), listing=_listing(Policy, ["client_id:eq:00000000-0000-0000-0000-000000000002"])
+        ),
+    ),
+    "policy list, one product": (
+        "ix_policies_product_id_id", "policies",
+        lambda db: PolicyService(db).get_all_policies(
+            _page(), listing=_listing(Policy, ["product_id:eq:00000000-0000-0000-0000-000000000003"])
+        ),
+    ),
+    "policy list, one status, newest first": (
+        "ix_policies_status_issue_date_id", "policies",
+        lambda db: PolicyService(db).get_all_policies(_page(), listing=_listing(Policy, ["status:eq:Lapsed"], "-issue_date")),
+    ),
+    "policy list by issue date": (
+        "ix_policies_issue_date_id", "policies",
+        lambda db: PolicyService(db).get_all_policies(_page(), listing=_listing(Policy, [], "issue_date")),
+    ),
+    "customer list by last name": (
+        "ix_customers_last_name_id", "customers",
+        lambda db: customer_service.get_all_customers(db, _page(), listing=_listing(Customer, ["last_name:gt:Kamara"], "last_name")),
+    ),
+    "agent list, one status": (
+        "ix_agents_status", "agents",
+        lambda db: agent_service.get_all_agents(db, _page(), listing=_listing(Agent, ["status:eq:Suspended"])),
+    ),
+    "agent list by last name": (
+        "ix_agents_last_name_id", "agents",
+        lambda db: agent_service.get_all_agents(db, _page(), listing=_listing(Agent, [], "last_name")),
+    ),
+    "audit trail of one entity, deep page": (
+        "ix_audit_logs_entity_timestamp_id", "audit_logs",
+        lambda db: audit_service.get_audit_logs(db, _page(*DEEP), entity="claim", entity_id=9),
+    ),
+    "audit trail over a period, deep page": (
+        "ix_audit_logs_timestamp_id", "audit_logs",
+        lambda db: audit_service.get_audit_logs(db, _page(*DEEP), start=datetime(2024, 1, 1)),
+    ),
+    "ledger of one account, deep page": (
+        "ix_ledger_entries_account_timestamp_id", "ledger_entries",
+        lambda db: ledger_service.get_ledger_entries(db, _page(*DEEP), account="1000-cash", start=datetime(2024, 1, 1)),
+    ),
+    "whole ledger, deep page": (
+        "ix_ledger_entries_timestamp_id", "ledger_entries",
+        lambda db: ledger_service.get_ledger_entries(db, _page(*DEEP)),
+    ),
+}
+
+def executed(engine, call, db) -> list:
+    statements = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        statements.append((statement, parameters))
+
+    event.listen(engine, "before_cursor_execute", capture)
+    try:
+        call(db)
+    finally:
+        event.remove(engine, "before_cursor_execute", capture)
+    return statements
+
+def query_plan(engine, statement, parameters) -> str:
+    with engine.connect() as conn:
+        return "\n".join(row[-1] for row in conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters))
+
+@pytest.mark.parametrize("name", sorted(HOT_QUERIES))
+def test_hot_query_uses_index(engine, db, name):
+    index_name, table, call = HOT_QUERIES[name]
+    statements = [(sql, parameters) for sql, parameters in executed(engine, call, db) if f"FROM {table}" in sql]
+    assert statements, f"{name} ran no query on {table}"
+    plan = query_plan(engine, *statements[0])
+    assert f"INDEX {index_name}" in plan, plan
+    # Grouping needs a sort of its own; a page must come out of the index already in order
+    assert "TEMP B-TREE FOR ORDER BY" not in plan and "TEMP B-TREE FOR RIGHT PART OF ORDER BY" not in plan, plan
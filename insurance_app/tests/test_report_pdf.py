@@ -0,0 +1,48 @@
+import re
+
+import pytest
+
+from insurance_app.services.report_service import stream_claims_pdf
+
+def _rows(n):
+    return [{"month": f"M{i:03d}", "count": i, "total_value": i * 10.5} for i in range(n)]
+
+def _render(rows):
+    chunks = list(stream_claims_pdf(iter(rows), "USD", subtitle="Status: PAID"))
+    # The header goes out before the first row is read
+    assert chunks[0].startswith(b"%PDF-")
+    return b"".join(chunks)
+
+def _check_structure(data: bytes) -> int:
+    """Checks the header, xref table and trailer; returns the page count."""
+    assert data.startswith(b"%PDF-1.4\n")
+    assert data.endswith(b"%%EOF\n")
+
+    startxref = int(re.search(rb"startxref\n(\d+)\n%%EOF\n$", data).group(1))
+    assert data[startxref:].startswith(b"xref\n")
+    size = int(re.match(rb"xref\n0 (\d+)\n", data[startxref:]).group(1))
+    entries = re.findall(rb"(\d{10}) (\d{5}) ([fn]) \n", data[startxref:])
+    assert len(entries) == size and entries[0] == (b"0000000000", b"65535", b"f")
+    for obj_id, (offset, _, kind) in enumerate(entries[1:], start=1):
+        assert kind == b"n"
+        assert data[int(offset):].startswith(b"%d 0 obj\n" % obj_id)
+    assert re.search(rb"trailer\n<< /Size %d /Root 1 0 R >>" % size, data)
+
+    count = int(re.search(rb"/Type /Pages /Kids \[[^\]]*\] /Count (\d+)", data).group(1))
+    assert len(re.findall(rb"/Type /Page ", data)) == count
+    return count
+
+@pytest.mark.parametrize("rows, pages", [
+    (0, 1),
+    # A first page holds 31 rows; the next ones, without the title block, 34
+    (31, 1),
+    (32, 2),
+    (100, 4),
+])
+def test_streamed_pdf_is_well_formed(rows, pages):
+    data = _render(_rows(rows))
+    assert _check_structure(data) == pages
+    assert data.count(b"(Claims by Month Report)") == 1
+    assert data.count(b"(Status: PAID)") == 1
+    assert data.count(b"(Month)") == pages
+    assert re.findall(rb"\((M\d{3})\)", data) == [row["month"].encode() for row in _rows(rows)]
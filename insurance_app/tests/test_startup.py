@@ -0,0 +1,36 @@
+import json
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# About 1.3s on a developer laptop once pandas and reportlab stopped loading at import
+BUDGET_SECONDS = float(os.getenv("STARTUP_BUDGET_SECONDS", "2.0"))
+RUNS = 3
+
+PROBE = """
+import json, sys, time
+started = time.perf_counter()
+import insurance_app_main
+elapsed = time.perf_counter() - started
+print(json.dumps({"seconds": elapsed, "modules": sorted(sys.modules)}))
+"""
+
+def _import_app(tmp_path) -> dict:
+    env = dict(os.environ, DATABASE_URL=f"sqlite:///{tmp_path / 'startup.db'}")
+    result = subprocess.run(
+        [sys.executable, "-c", PROBE], cwd=ROOT, env=env, capture_output=True, text=True, check=True
+    )
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+def test_import_fits_startup_budget(tmp_path):
+    # A fresh interpreter each time so nothing is already cached in sys.modules; best of a few runs
+    runs = [_import_app(tmp_path) for _ in range(RUNS)]
+    fastest = min(run["seconds"] for run in runs)
+    assert fastest < BUDGET_SECONDS, f"import insurance_app_main took {fastest:.2f}s (budget {BUDGET_SECONDS}s)"
+
+    # Report libraries load on first export, and the schema is created by the lifespan, not the import
+    modules = runs[0]["modules"]
+    assert "pandas" not in modules
+    assert "reportlab" not in modules
+    assert not (tmp_path / "startup.db").exists()
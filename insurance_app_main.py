@@ -2,6 +2,8 @@ import os
 
 import time
 
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI, Request, Form, Depends, HTTPException, Cookie
 
 from fastapi.staticfiles import StaticFiles
@@ -12,6 +14,8 @@ from fastapi.responses import RedirectResponse, HTMLResponse
 
 from passlib.context import CryptContext
 
+from sqlalchemy import select
+
 from sqlalchemy.orm import Session  # <-- Import Session
 
 # --- Password hashing context ---
@@ -22,17 +26,47 @@ def verify_password(plain_password, hashed_password):
 
     return pwd_context.verify(plain_password, hashed_password)
 
+def authenticate_user(db: Session, username: str, password: str):
+
+    # Blocking: one query plus a bcrypt check, so callers run it through run_blocking()
+
+    # Read through the users table, so logging in does not have to configure every ORM mapper
+
+    users = User.__table__
+
+    user = db.execute(select(users).where(users.c.username == username)).first()
+
+    if user and verify_password(password, user.password_hash):
+
+        return user
+
+    return None
+
 # --- Import database setup from your shared database.py ---
 
-from insurance_app.database import engine, Base, get_db
+from insurance_app.database import CREATE_TABLES, create_schema, get_db, pool_stats, start_sqlite_maintenance, stop_sqlite_maintenance
+
+from insurance_app.database import READ_METHODS, pin_to_primary, replica_engine
+
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+
+from insurance_app.concurrency import configure_threadpool, run_blocking
+
+from insurance_app.deadlines import DASHBOARD_DEADLINE_SECONDS, DeadlineMiddleware, deadline, pool_timeout_handler
 
-# --- Import all models before table creation ---
+from insurance_app.instrumentation import annotate_response, track_queries
+
+from insurance_app.metrics import CONTENT_TYPE_LATEST, IN_FLIGHT, observe_request, refresh_process_metrics, render_metrics, route_template, worker_exit
+
+# --- Import all models; tables are created in the lifespan below, once every router has loaded its models ---
 
 from insurance_app.models.models import User, Client, Policy, Product, Premium, Commission, Claim, Customer, Agent, Document, Audit, Ledger, Reinsurance
 
-# --- Create tables (for development/SQLite only) ---
+from insurance_app.models.claim_rollup import ClaimsMonthlyRollup
+
+from insurance_app.models.loss_ratio_rollup import LossRatioMonthlyRollup
 
-Base.metadata.create_all(bind=engine)
+from insurance_app.models.exchange_rate import ExchangeRate
 
 # --- Import routers ---
 
@@ -64,7 +98,33 @@ from insurance_app.routers.routers_dashboard import router as dashboard_router
 
 from insurance_app.routers.routers_user import router as user_router
 
-app = FastAPI(title="Insurance Company of Africa Management System")
+from insurance_app.routers.routers_exchange_rate import router as exchange_rate_router
+
+# --- Startup and shutdown: nothing touches the database at import time ---
+
+@asynccontextmanager
+
+async def lifespan(app: FastAPI):
+
+    configure_threadpool()
+
+    if CREATE_TABLES:
+
+        # The supported way to make the tables: the Alembic revisions only change a schema that already exists.
+
+        # CREATE_TABLES=false skips it in workers started once it does
+
+        await run_blocking(create_schema)
+
+    start_sqlite_maintenance()
+
+    yield
+
+    stop_sqlite_maintenance()
+
+    worker_exit()
+
+app = FastAPI(title="Insurance Company of Africa Management System", lifespan=lifespan)
 
 from fastapi.responses import Response
 
@@ -74,7 +134,7 @@ async def head_root():
 
     return Response()
 
-app.include_router(dashboard_router, prefix="/dashboard", tags=["Dashboard"])
+app.include_router(dashboard_router, prefix="/dashboard", tags=["Dashboard"], dependencies=[deadline(DASHBOARD_DEADLINE_SECONDS)])
 
 # --- Optional: include views router if present ---
 
@@ -94,8 +154,6 @@ if os.path.isdir(static_dir):
 
     app.mount("/static", StaticFiles(directory=static_dir), name="static")
 
-    print(f"Mounted static directory: {static_dir}")
-
 else:
 
     print(f"Warning: Static directory '{static_dir}' does not exist. Static files will not be served.")
@@ -130,10 +188,76 @@ app.include_router(reinsurance_router, prefix="/reinsurance", tags=["Reinsurance
 
 app.include_router(user_router, prefix="/user", tags=["User"])
 
+app.include_router(exchange_rate_router, prefix="/exchange-rates", tags=["Exchange Rates"])
+
 if views_router:
 
     app.include_router(views_router)
 
+# --- Request deadlines: REQUEST_DEADLINE_SECONDS unless the router or route sets deadline(); added first, so it runs innermost ---
+
+app.add_middleware(DeadlineMiddleware)
+
+app.add_exception_handler(PoolTimeoutError, pool_timeout_handler)
+
+# --- Read-your-writes: after a successful write, this client's reads go to the primary for a while ---
+
+if replica_engine is not None:
+
+    @app.middleware("http")
+
+    async def read_your_writes(request: Request, call_next):
+
+        response = await call_next(request)
+
+        if request.method not in READ_METHODS and response.status_code < 400:
+
+            pin_to_primary(response)
+
+        return response
+
+# --- SQL instrumentation: query count and DB time on every response; SQL_DEBUG=true also flags N+1 patterns ---
+
+@app.middleware("http")
+
+async def sql_instrumentation(request: Request, call_next):
+
+    with track_queries() as queries:
+
+        response = await call_next(request)
+
+    annotate_response(request, response, queries)
+
+    return response
+
+# --- Prometheus metrics: latency and status per route template, in-flight requests, pool/cache/report-queue state ---
+
+@app.middleware("http")
+
+async def request_metrics(request: Request, call_next):
+
+    IN_FLIGHT.inc()
+
+    started = time.perf_counter()
+
+    status_code = 500
+
+    try:
+
+        response = await call_next(request)
+
+        status_code = response.status_code
+
+        return response
+
+    finally:
+
+        IN_FLIGHT.dec()
+
+        observe_request(request.method, route_template(request.scope), status_code, time.perf_counter() - started)
+
+        refresh_process_metrics()
+
 # --- Role-based access control dependency ---
 
 def require_role(required_roles):
@@ -176,7 +300,7 @@ def check_session(session: str = Cookie(None)):
 
 @app.get("/", response_class=HTMLResponse)
 
-async def read_root(request: Request, db: Session = Depends(get_db), role: str = Cookie(None), session: str = Cookie(None)):
+async def read_root(request: Request, role: str = Cookie(None), session: str = Cookie(None)):
 
     # If no session or role, redirect to login
 
@@ -210,7 +334,7 @@ async def read_root(request: Request, db: Session = Depends(get_db), role: str =
 
 @app.get("/agents", response_class=HTMLResponse)
 
-async def agents_page(request: Request, db: Session = Depends(get_db), role: str = Cookie(None), session: str = Depends(check_session)):
+async def agents_page(request: Request, role: str = Cookie(None), session: str = Depends(check_session)):
 
     response = templates.TemplateResponse("agents.html", {"request": request, "role": role})
 
@@ -220,7 +344,7 @@ async def agents_page(request: Request, db: Session = Depends(get_db), role: str
 
 @app.get("/claims", response_class=HTMLResponse)
 
-async def claims_page(request: Request, db: Session = Depends(get_db), role: str = Cookie(None), session: str = Depends(check_session)):
+async def claims_page(request: Request, role: str = Cookie(None), session: str = Depends(check_session)):
 
     response = templates.TemplateResponse("claims.html", {"request": request, "role": role})
 
@@ -230,7 +354,7 @@ async def claims_page(request: Request, db: Session = Depends(get_db), role: str
 
 @app.get("/audit", response_class=HTMLResponse, dependencies=[require_role(["admin"])])
 
-async def audit_page(request: Request, db: Session = Depends(get_db), role: str = Cookie(None), session: str = Depends(check_session)):
+async def audit_page(request: Request, role: str = Cookie(None), session: str = Depends(check_session)):
 
     response = templates.TemplateResponse("audit.html", {"request": request, "role": role})
 
@@ -240,7 +364,7 @@ async def audit_page(request: Request, db: Session = Depends(get_db), role: str
 
 @app.get("/commission", response_class=HTMLResponse)
 
-async def commission_page(request: Request, db: Session = Depends(get_db), role: str = Cookie(None), session: str = Depends(check_session)):
+async def commission_page(request: Request, role: str = Cookie(None), session: str = Depends(check_session)):
 
     response = templates.TemplateResponse("commission.html", {"request": request, "role": role})
 
@@ -250,7 +374,7 @@ async def commission_page(request: Request, db: Session = Depends(get_db), role:
 
 @app.get("/clients", response_class=HTMLResponse)
 
-async def clients_page(request: Request, db: Session = Depends(get_db), role: str = Cookie(None), session: str = Depends(check_session)):
+async def clients_page(request: Request, role: str = Cookie(None), session: str = Depends(check_session)):
 
     response = templates.TemplateResponse("clients.html", {"request": request, "role": role})
 
@@ -260,7 +384,7 @@ async def clients_page(request: Request, db: Session = Depends(get_db), role: st
 
 @app.get("/customers", response_class=HTMLResponse)
 
-async def customers_page(request: Request, db: Session = Depends(get_db), role: str = Cookie(None), session: str = Depends(check_session)):
+async def customers_page(request: Request, role: str = Cookie(None), session: str = Depends(check_session)):
 
     response = templates.TemplateResponse("customers.html", {"request": request, "role": role})
 
@@ -270,7 +394,7 @@ async def customers_page(request: Request, db: Session = Depends(get_db), role:
 
 @app.get("/documents", response_class=HTMLResponse)
 
-async def documents_page(request: Request, db: Session = Depends(get_db), role: str = Cookie(None), session: str = Depends(check_session)):
+async def documents_page(request: Request, role: str = Cookie(None), session: str = Depends(check_session)):
 
     response = templates.TemplateResponse("documents.html", {"request": request, "role": role})
 
@@ -280,7 +404,7 @@ async def documents_page(request: Request, db: Session = Depends(get_db), role:
 
 @app.get("/ledger", response_class=HTMLResponse)
 
-async def ledger_page(request: Request, db: Session = Depends(get_db), role: str = Cookie(None), session: str = Depends(check_session)):
+async def ledger_page(request: Request, role: str = Cookie(None), session: str = Depends(check_session)):
 
     response = templates.TemplateResponse("ledger.html", {"request": request, "role": role})
 
@@ -290,7 +414,7 @@ async def ledger_page(request: Request, db: Session = Depends(get_db), role: str
 
 @app.get("/policies", response_class=HTMLResponse)
 
-async def policies_page(request: Request, db: Session = Depends(get_db), role: str = Cookie(None), session: str = Depends(check_session)):
+async def policies_page(request: Request, role: str = Cookie(None), session: str = Depends(check_session)):
 
     response = templates.TemplateResponse("policies.html", {"request": request, "role": role})
 
@@ -300,7 +424,7 @@ async def policies_page(request: Request, db: Session = Depends(get_db), role: s
 
 @app.get("/premiums", response_class=HTMLResponse)
 
-async def premiums_page(request: Request, db: Session = Depends(get_db), role: str = Cookie(None), session: str = Depends(check_session)):
+async def premiums_page(request: Request, role: str = Cookie(None), session: str = Depends(check_session)):
 
     response = templates.TemplateResponse("premiums.html", {"request": request, "role": role})
 
@@ -310,7 +434,7 @@ async def premiums_page(request: Request, db: Session = Depends(get_db), role: s
 
 @app.get("/products", response_class=HTMLResponse)
 
-async def products_page(request: Request, db: Session = Depends(get_db), role: str = Cookie(None), session: str = Depends(check_session)):
+async def products_page(request: Request, role: str = Cookie(None), session: str = Depends(check_session)):
 
     response = templates.TemplateResponse("products.html", {"request": request, "role": role})
 
@@ -320,7 +444,7 @@ async def products_page(request: Request, db: Session = Depends(get_db), role: s
 
 @app.get("/reinsurance", response_class=HTMLResponse)
 
-async def reinsurance_page(request: Request, db: Session = Depends(get_db), role: str = Cookie(None), session: str = Depends(check_session)):
+async def reinsurance_page(request: Request, role: str = Cookie(None), session: str = Depends(check_session)):
 
     response = templates.TemplateResponse("reinsurance.html", {"request": request, "role": role})
 
@@ -332,7 +456,7 @@ async def reinsurance_page(request: Request, db: Session = Depends(get_db), role
 
 async def users_page(request: Request, db: Session = Depends(get_db), role: str = Cookie(None), session: str = Depends(check_session)):
 
-    users = db.query(User).all()
+    users = await run_blocking(db.query(User).all)
 
     response = templates.TemplateResponse("user.html", {"request": request, "role": role, "users": users})
 
@@ -366,9 +490,9 @@ async def login_post(
 
     now = str(int(time.time()))
 
-    user = db.query(User).filter(User.username == username).first()
+    user = await run_blocking(authenticate_user, db, username, password)
 
-    if user and verify_password(password, user.password_hash):
+    if user:
 
         response = RedirectResponse(url="/dashboard", status_code=302)
 
@@ -436,6 +560,22 @@ async def health_check():
 
     return {"status": "healthy", "message": "Insurance Management System is running"}
 
+@app.get("/health/pool")
+
+async def pool_health():
+
+    # Per worker process; add up across workers when sizing against Postgres max_connections
+
+    return pool_stats()
+
+@app.get("/metrics", include_in_schema=False)
+
+async def metrics():
+
+    # Prometheus text format; with PROMETHEUS_MULTIPROC_DIR set, the totals cover every worker
+
+    return Response(await run_blocking(render_metrics), media_type=CONTENT_TYPE_LATEST)
+
 # (All your other API endpoints remain unchanged)
 
  